@@ -3,7 +3,7 @@ import { GpsTracker } from "./gps.js";
 import { NaverMap } from "./naver-map.js";
 import { NaverRoadview } from "./naver-roadview.js";
 import { updateConnection, updateGauges, updateGps } from "./ui.js";
-import { JsonCodec, TelemetrySocket } from "./ws.js";
+import { JsonCodec, PackedCodec, TelemetrySocket, ValuesCodec } from "./ws.js";
 
 const els = {
   serverUrl: document.getElementById("serverUrl"),
@@ -323,6 +323,35 @@ function stopPing() {
   }
 }
 
+// `?codec=values|packed` on the page URL switches to schema-once streaming
+// (JSON value arrays or binary float32 frames).
+function createCodec() {
+  const requested = new URLSearchParams(window.location.search).get("codec");
+  if (requested === "packed") {
+    return new PackedCodec();
+  }
+  if (requested === "values") {
+    return new ValuesCodec();
+  }
+  return new JsonCodec();
+}
+
+// `?signals=ws_fl,yaw&hz=5&reduce=mean` subscribes to a decimated subset
+// (e.g. projection screens); without them the full stream is received.
+function createSubscription() {
+  const params = new URLSearchParams(window.location.search);
+  const signals = params.get("signals");
+  const hz = Number(params.get("hz"));
+  if (!signals && !Number.isFinite(hz)) {
+    return null;
+  }
+  return {
+    signals: signals ? signals.split(",").filter(Boolean) : null,
+    hz: Number.isFinite(hz) && hz > 0 ? hz : null,
+    reduce: params.get("reduce") || "last",
+  };
+}
+
 function connectSocket() {
   const base = normalizeHttpBase(els.serverUrl.value);
   const wsUrl = httpToWs(base);
@@ -333,7 +362,8 @@ function connectSocket() {
 
   socket = new TelemetrySocket({
     url: wsUrl,
-    codec: new JsonCodec(),
+    codec: createCodec(),
+    subscription: createSubscription(),
     onStatus: (status) => {
       socketState = status.state;
       const connected = status.state === "connected";
@@ -350,6 +380,12 @@ function connectSocket() {
     onMessage: (payload) => {
       if (payload?.type === "pong" && Number.isFinite(payload.t)) {
         rttMs = Math.max(0, Date.now() - payload.t * 1000);
+      } else if (payload?.type === "signals_config" && Array.isArray(payload.signals)) {
+        // Server hot-reloaded signals.json; positional codecs also get a new `schema`.
+        console.info(`signals config reloaded: ${payload.signals.join(", ")}`);
+      } else if (payload?.type === "backfill") {
+        // Charted like a batch; a gap means the outage outlasted the server buffer.
+        console.info(`backfill: ${payload.frames.length} samples${payload.gap ? " (gap)" : ""}`);
       }
     },
     onFrame: (frame) => {
@@ -370,6 +406,10 @@ function connectSocket() {
 
       lastCanFrame = frame;
       lastFrameRecvMs = performance.now();
+
+      // Chart every received sample (batches carry several per message).
+      speedChart.addSample(frame.recvT, frame.sig);
+      dynChart.addSample(frame.recvT, frame.sig);
     },
   });
 
@@ -523,7 +563,6 @@ els.startGpsBtn.addEventListener("click", () => {
 
 setInterval(() => {
   const nowMs = performance.now();
-  const nowSec = Date.now() / 1000;
 
   const connectionVisible = Boolean(socket && socket.isOpen()) || socketState === "reconnecting";
   const frameAgeMs = Number.isFinite(lastFrameRecvMs) ? nowMs - lastFrameRecvMs : null;
@@ -535,8 +574,6 @@ setInterval(() => {
 
   if (lastCanFrame?.sig) {
     updateGauges(els.gauge, lastCanFrame.sig);
-    speedChart.addSample(nowSec, lastCanFrame.sig);
-    dynChart.addSample(nowSec, lastCanFrame.sig);
   }
 
   const serverDrop = Number.isFinite(lastCanFrame?.status?.drop) ? lastCanFrame.status.drop : 0;
@@ -35,8 +35,15 @@ export class ScrollingChart {
       }
       const bucket = this.samples.get(line.key);
       bucket.push({ t: tSec, v: value });
-      while (bucket.length && bucket[0].t < cutoff) {
-        bucket.shift();
+      // Trim in chunks: per-sample shift() is O(n) and batched high-rate
+      // streams push hundreds of samples per message. render() skips the
+      // few stale points left in between.
+      let stale = 0;
+      while (stale < bucket.length && bucket[stale].t < cutoff) {
+        stale += 1;
+      }
+      if (stale > 64) {
+        bucket.splice(0, stale);
       }
     }
 
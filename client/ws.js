@@ -1,17 +1,246 @@
+// Status of one sample inside a batch message (server/codec.py batch layout).
+function sampleStatus(status, seq) {
+  return { seq, drop: status.drop, qdepth: status.qdepth, qdrop: status.qdrop };
+}
+
 export class JsonCodec {
   encode(payload) {
     return JSON.stringify(payload);
   }
 
   decode(raw) {
-    return JSON.parse(raw);
+    const payload = JSON.parse(raw);
+    if (payload?.type !== "batch" || !payload.sig) {
+      return payload;
+    }
+
+    // Columnar batch -> one frame per sample.
+    const names = Object.keys(payload.sig);
+    const frames = payload.t.map((t, i) => {
+      const sig = {};
+      for (const name of names) {
+        const value = payload.sig[name][i];
+        if (value !== null) {
+          sig[name] = value;
+        }
+      }
+      return { v: 1, t, sig, status: sampleStatus(payload.status, payload.seq[i]) };
+    });
+    return { type: "batch", frames };
+  }
+}
+
+// Packed binary frame header, see server/codec.py (little-endian).
+const PACKED_HEADER_BYTES = 28;
+const PACKED_KIND_FRAME = 1;
+const PACKED_KIND_BATCH = 2;
+
+// Shared by codecs that stream positional values after a `schema` message.
+// The decoded `sig` object is reused across frames of the same schema to
+// avoid per-frame allocation; consumers only read the latest frame.
+class PositionalCodec {
+  constructor(codecName) {
+    this.query = `codec=${codecName}`;
+    this.schema = null;
+    this.sig = {};
+    this.scales = [];
+  }
+
+  encode(payload) {
+    return JSON.stringify(payload);
+  }
+
+  _decodeText(raw) {
+    const payload = JSON.parse(raw);
+    if (payload?.type === "schema" && Array.isArray(payload.signals)) {
+      this.schema = payload;
+      this.sig = {};
+      const decimals = Array.isArray(payload.decimals) ? payload.decimals : [];
+      this.scales = payload.signals.map((_, i) =>
+        Number.isInteger(decimals[i]) ? 10 ** decimals[i] : null
+      );
+    }
+    return payload;
+  }
+
+  _fill(values, round, sig = this.sig) {
+    const names = this.schema.signals;
+    for (let i = 0; i < names.length; i += 1) {
+      let value = values[i];
+      if (value === null || Number.isNaN(value)) {
+        sig[names[i]] = undefined;
+        continue;
+      }
+      const scale = this.scales[i];
+      if (round && scale) {
+        value = Math.round(value * scale) / scale;
+      }
+      sig[names[i]] = value;
+    }
+    return sig;
   }
 }
 
+export class ValuesCodec extends PositionalCodec {
+  constructor() {
+    super("values");
+  }
+
+  decode(raw) {
+    const payload = this._decodeText(raw);
+    if (!Array.isArray(payload?.val)) {
+      return payload;
+    }
+    // Frames encoded against an older schema are skipped until they drain.
+    if (!this.schema || payload.sid !== this.schema.id) {
+      return null;
+    }
+    if (payload.type === "batch") {
+      const frames = payload.val.map((row, i) => ({
+        v: 1,
+        t: payload.t[i],
+        sig: this._fill(row, false, {}),
+        status: sampleStatus(payload.status, payload.seq[i]),
+      }));
+      return { type: "batch", frames };
+    }
+    return { v: 1, t: payload.t, sig: this._fill(payload.val, false), status: payload.status };
+  }
+}
+
+export class PackedCodec extends PositionalCodec {
+  constructor() {
+    super("packed");
+  }
+
+  decode(raw) {
+    if (typeof raw === "string") {
+      return this._decodeText(raw);
+    }
+
+    const view = new DataView(raw);
+    const kind = view.getUint8(1);
+    if (!this.schema || view.getUint16(2, true) !== this.schema.id) {
+      return null;
+    }
+
+    const width = this.schema.signals.length;
+    const status = {
+      seq: view.getUint32(4, true),
+      drop: view.getUint32(8, true),
+      qdepth: view.getUint32(20, true),
+      qdrop: view.getUint32(24, true),
+    };
+
+    if (kind === PACKED_KIND_FRAME) {
+      const values = new Float32Array(raw, PACKED_HEADER_BYTES, width);
+      // float32 -> schema decimals, so gauges match the JSON stream.
+      return { v: 1, t: view.getFloat64(12, true), sig: this._fill(values, true), status };
+    }
+    if (kind !== PACKED_KIND_BATCH) {
+      return null;
+    }
+
+    const count = view.getUint32(PACKED_HEADER_BYTES, true);
+    const seqOffset = PACKED_HEADER_BYTES + 4;
+    const tOffset = seqOffset + 4 * count;
+    const values = new Float32Array(raw, tOffset + 8 * count, count * width);
+    const frames = [];
+    for (let i = 0; i < count; i += 1) {
+      frames.push({
+        v: 1,
+        t: view.getFloat64(tOffset + 8 * i, true),
+        sig: this._fill(values.subarray(i * width, (i + 1) * width), true, {}),
+        status: sampleStatus(status, view.getUint32(seqOffset + 4 * i, true)),
+      });
+    }
+    return { type: "batch", frames };
+  }
+}
+
+// Backfill message, see server/backfill.py: 8-byte header (version, kind,
+// flags, inflated size) + zlib body. Sent once per connection before live frames.
+const BACKFILL_KIND = 3;
+const BACKFILL_HEADER_BYTES = 8;
+const BACKFILL_FLAG_GAP = 1;
+const BACKFILL_MISSING = -(2 ** 31);
+
+function isBackfill(raw) {
+  return (
+    raw instanceof ArrayBuffer &&
+    raw.byteLength >= BACKFILL_HEADER_BYTES &&
+    new DataView(raw).getUint8(1) === BACKFILL_KIND
+  );
+}
+
+async function inflate(bytes) {
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+  return new Response(stream).arrayBuffer();
+}
+
+export async function decodeBackfill(raw) {
+  const gap = (new DataView(raw).getUint16(2, true) & BACKFILL_FLAG_GAP) !== 0;
+  const body = await inflate(new Uint8Array(raw, BACKFILL_HEADER_BYTES));
+  const metaBytes = new DataView(body).getUint32(0, true);
+  const meta = JSON.parse(new TextDecoder().decode(new Uint8Array(body, 4, metaBytes)));
+  const count = meta.count;
+  const total = count * meta.signals.length;
+
+  // Arrays start 8-byte aligned (the server pads the meta JSON).
+  let offset = 4 + metaBytes;
+  const times = new Float64Array(body, offset, count);
+  offset += 8 * count;
+  const seqs = new Uint32Array(body, offset, count);
+  offset += 4 * count;
+
+  // Undo the byte shuffle: plane b holds byte b of every i32 value.
+  const planes = new Uint8Array(body, offset, 4 * total);
+  const bytes = new Uint8Array(4 * total);
+  for (let b = 0; b < 4; b += 1) {
+    for (let i = 0, j = b * total; i < total; i += 1, j += 1) {
+      bytes[4 * i + b] = planes[j];
+    }
+  }
+  const ints = new Int32Array(bytes.buffer);
+  const floats = new Float32Array(bytes.buffer);
+
+  const frames = [];
+  for (let i = 0; i < count; i += 1) {
+    frames.push({ v: 1, t: times[i], sig: {}, status: { seq: seqs[i] } });
+  }
+  meta.signals.forEach((name, column) => {
+    const scale = meta.scale[column];
+    const base = column * count;
+    let sum = 0;
+    for (let i = 0; i < count; i += 1) {
+      // Quantized columns carry deltas of value * scale; others float32 bits.
+      if (scale) {
+        const delta = ints[base + i];
+        if (delta === BACKFILL_MISSING) {
+          continue;
+        }
+        sum += delta;
+        frames[i].sig[name] = sum / scale;
+      } else if (!Number.isNaN(floats[base + i])) {
+        frames[i].sig[name] = floats[base + i];
+      }
+    }
+  });
+  return { type: "backfill", stream: meta.stream, gap, frames };
+}
+
+function withQuery(url, query) {
+  if (!query) {
+    return url;
+  }
+  return `${url}${url.includes("?") ? "&" : "?"}${query}`;
+}
+
 export class TelemetrySocket {
   constructor({
     url,
     codec = new JsonCodec(),
+    subscription = null,
     onStatus = () => {},
     onMessage = () => {},
     onFrame = () => {},
@@ -20,6 +249,8 @@ export class TelemetrySocket {
   }) {
     this.url = url;
     this.codec = codec;
+    // Optional `{ signals, hz, reduce }` sent as a `subscribe` message on every (re)connect.
+    this.subscription = subscription;
     this.onStatus = onStatus;
     this.onMessage = onMessage;
     this.onFrame = onFrame;
@@ -30,6 +261,12 @@ export class TelemetrySocket {
     this.manualClose = false;
     this.reconnectAttempt = 0;
     this.reconnectTimer = null;
+
+    // Resume point sent on reconnect so the server backfills only what was missed.
+    this.stream = null;
+    this.lastSeq = null;
+    // Set while a backfill inflates; later messages are dispatched after it.
+    this.pending = null;
   }
 
   connect() {
@@ -72,7 +309,9 @@ export class TelemetrySocket {
     }
 
     this._emitStatus("connecting");
-    const ws = new WebSocket(this.url);
+    const ws = new WebSocket(withQuery(withQuery(this.url, this.codec.query), this._resumeQuery()));
+    // Backfill messages are binary whatever the codec.
+    ws.binaryType = "arraybuffer";
     this.ws = ws;
 
     ws.addEventListener("open", () => {
@@ -80,6 +319,9 @@ export class TelemetrySocket {
         return;
       }
       this.reconnectAttempt = 0;
+      if (this.subscription) {
+        ws.send(this.codec.encode({ v: 1, type: "subscribe", ...this.subscription }));
+      }
       this._emitStatus("connected");
     });
 
@@ -87,12 +329,33 @@ export class TelemetrySocket {
       if (this.ws !== ws) {
         return;
       }
+      let payload;
       try {
-        const payload = this.codec.decode(event.data);
-        this.onMessage(payload);
-        if (payload && payload.sig && payload.status) {
-          this.onFrame(payload);
-        }
+        // Decode in arrival order (positional codecs track the schema).
+        payload = isBackfill(event.data) ? decodeBackfill(event.data) : this.codec.decode(event.data);
+      } catch {
+        // ignore malformed payloads
+        return;
+      }
+      if (payload instanceof Promise || this.pending) {
+        const queued = (this.pending ?? Promise.resolve())
+          .then(() => payload)
+          .then((ready) => {
+            if (this.ws === ws) {
+              this._dispatch(ready);
+            }
+          })
+          .catch(() => {})
+          .finally(() => {
+            if (this.pending === queued) {
+              this.pending = null;
+            }
+          });
+        this.pending = queued;
+        return;
+      }
+      try {
+        this._dispatch(payload);
       } catch {
         // ignore malformed payloads
       }
@@ -117,6 +380,43 @@ export class TelemetrySocket {
     });
   }
 
+  _resumeQuery() {
+    if (this.stream === null || this.lastSeq === null) {
+      return "";
+    }
+    return `since=${this.lastSeq}&stream=${encodeURIComponent(this.stream)}`;
+  }
+
+  _dispatch(payload) {
+    if (!payload) {
+      return;
+    }
+    if (payload.type === "backfill") {
+      this.stream = payload.stream;
+    }
+    this.onMessage(payload);
+    // `recvT` places each sample on the client clock: the newest sample of a
+    // message is "now", older batch/backfill samples keep their server-side spacing.
+    const recvT = Date.now() / 1000;
+    if (Array.isArray(payload.frames)) {
+      const lastT = payload.frames.at(-1)?.t;
+      for (const frame of payload.frames) {
+        frame.recvT = recvT - (lastT - frame.t);
+        this._frame(frame);
+      }
+    } else if (payload.sig && payload.status) {
+      payload.recvT = recvT;
+      this._frame(payload);
+    }
+  }
+
+  _frame(frame) {
+    if (Number.isFinite(frame.status?.seq)) {
+      this.lastSeq = frame.status.seq;
+    }
+    this.onFrame(frame);
+  }
+
   _scheduleReconnect() {
     const delay = Math.min(this.maxBackoffMs, this.baseBackoffMs * 2 ** this.reconnectAttempt);
     this.reconnectAttempt += 1;
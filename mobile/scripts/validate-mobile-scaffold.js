@@ -13,6 +13,7 @@ const requiredFiles = [
   "src/config.js",
   "src/telemetry/protocol.js",
   "src/telemetry/ws-client.js",
+  "src/telemetry/frames.js",
   "src/telemetry/gps-client.js",
   "src/telemetry/store-forward-queue.js",
   "scripts/init-native-project.sh",
@@ -11,7 +11,7 @@ import {
   View,
 } from "react-native";
 import { APP_VERSION, inferOsName, normalizeBaseUrl, toWsUrl } from "./config";
-import { createGpsPayload, createMarkPayload, stampQueued } from "./telemetry/protocol";
+import { createBatchPayload, createGpsPayload, createMarkPayload, stampQueued } from "./telemetry/protocol";
 import { requestLocationPermission, GpsClient } from "./telemetry/gps-client";
 import { StoreForwardQueue } from "./telemetry/store-forward-queue";
 import { TelemetryWsClient } from "./telemetry/ws-client";
@@ -86,8 +86,8 @@ export default function App() {
     }
     flushingRef.current = true;
     try {
-      const { remaining } = await queueRef.current.flush((payload) =>
-        wsClientRef.current.sendJson(payload)
+      const { remaining } = await queueRef.current.flushBatches((items) =>
+        wsClientRef.current.sendJson(createBatchPayload(items))
       );
       setQueueDepth(remaining);
     } finally {
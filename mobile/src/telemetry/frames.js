@@ -0,0 +1,31 @@
+/**
+ * Normalizes a CAN message from the server into one plain frame for display.
+ *
+ * When `CAN_HZ > BROADCAST_HZ` the server sends `type: "batch"` messages whose
+ * `sig` holds one column array per signal (see server/codec.py). The mobile
+ * UI only shows the latest values, so a batch collapses to its last sample.
+ *
+ * @param {object} payload - A parsed WS message with `sig` and `status`.
+ * @returns {object} `{ t, sig, status }` with numeric `sig` values.
+ */
+export function latestFrame(payload) {
+  if (payload?.type !== "batch") {
+    return payload;
+  }
+
+  const last = payload.t.length - 1;
+  const sig = {};
+  for (const [name, column] of Object.entries(payload.sig)) {
+    const value = column[last];
+    if (value !== null && value !== undefined) {
+      sig[name] = value;
+    }
+  }
+  return {
+    v: 1,
+    t: payload.t[last],
+    sig,
+    // A batch's status.seq is already its last sample's seq.
+    status: { seq: payload.seq[last], drop: payload.status?.drop ?? 0 },
+  };
+}
@@ -8,10 +8,15 @@ export function createPingPayload() {
   };
 }
 
+// Per-launch fix counter; with `t` and `meta.device` it keys server-side dedupe.
+let gpsSeq = 0;
+
 export function createGpsPayload(fix, meta) {
+  gpsSeq += 1;
   return {
     v: 1,
     t: Date.now() / 1000,
+    seq: gpsSeq,
     gps: {
       lat: fix.lat,
       lon: fix.lon,
@@ -52,3 +57,20 @@ export function createMarkPayload(note = "") {
 export function stampQueued(payload, nowSec = Date.now() / 1000) {
   return { ...payload, queued_at: nowSec };
 }
+
+/**
+ * Wraps queued payloads into one `batch` message for replay after an outage.
+ * The server validates every item and answers with a `batch_ack` carrying
+ * the same `id` and one result per item.
+ *
+ * @param {object[]} items - Payloads as built above (usually stamped queued).
+ * @param {number|string} [id] - Echoed back in the ack.
+ */
+export function createBatchPayload(items, id = Date.now()) {
+  return {
+    v: 1,
+    type: "batch",
+    id,
+    items,
+  };
+}
@@ -81,6 +81,38 @@ export class StoreForwardQueue {
     return { sent, remaining: this.items.length };
   }
 
+  /**
+   * Sends up to `limit` queued items at a time as one message through
+   * `sendBatchFn(items)` until the queue is empty or a send fails.
+   */
+  async flushBatches(sendBatchFn, limit = 500) {
+    if (this._flushing) {
+      return { sent: 0, remaining: this.items.length };
+    }
+    if (!this.loaded) {
+      await this.init();
+    }
+
+    this._flushing = true;
+    let sent = 0;
+    try {
+      while (this.items.length > 0) {
+        const batch = this.items.slice(0, limit);
+        const ok = !!sendBatchFn(batch);
+        if (!ok) {
+          break;
+        }
+        this.items = this.items.slice(batch.length);
+        sent += batch.length;
+      }
+    } finally {
+      this._flushing = false;
+    }
+
+    await this._persist();
+    return { sent, remaining: this.items.length };
+  }
+
   async _persist() {
     try {
       await this.storage.setItem(this.storageKey, JSON.stringify(this.items));
@@ -1,3 +1,4 @@
+import { latestFrame } from "./frames";
 import { createPingPayload } from "./protocol";
 
 const MAX_BACKOFF_MS = 15000;
@@ -84,7 +85,7 @@ export class TelemetryWsClient {
       }
 
       if (payload.sig && payload.status && this.onFrame) {
-        this.onFrame(payload);
+        this.onFrame(latestFrame(payload));
       }
     };
 
@@ -0,0 +1,25 @@
+import { latestFrame } from "../src/telemetry/frames";
+
+describe("latestFrame", () => {
+  it("passes plain frames through", () => {
+    const frame = { v: 1, t: 1.0, sig: { ws_fl: 12.5 }, status: { seq: 7, drop: 0 } };
+    expect(latestFrame(frame)).toBe(frame);
+  });
+
+  it("collapses a columnar batch to its last sample", () => {
+    const batch = {
+      v: 1,
+      type: "batch",
+      seq: [10, 11, 12],
+      t: [1.0, 1.01, 1.02],
+      sig: { ws_fl: [1, 2, 3], yaw: [0.5, 0.25, null] },
+      status: { seq: 12, seq0: 10, n: 3, drop: 2 },
+    };
+    expect(latestFrame(batch)).toEqual({
+      v: 1,
+      t: 1.02,
+      sig: { ws_fl: 3 },
+      status: { seq: 12, drop: 2 },
+    });
+  });
+});
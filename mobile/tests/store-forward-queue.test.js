@@ -110,6 +110,27 @@ describe("StoreForwardQueue", () => {
     });
   });
 
+  describe("flushBatches", () => {
+    it("sends the backlog in chunks of `limit` and keeps unsent chunks", async () => {
+      const q = new StoreForwardQueue({ storage: makeStorage() });
+      for (let i = 1; i <= 5; i++) {
+        await q.enqueue({ id: i });
+      }
+
+      const batches = [];
+      const { sent, remaining } = await q.flushBatches((items) => {
+        batches.push(items.map((x) => x.id));
+        // The socket drops after two batches
+        return batches.length < 3;
+      }, 2);
+
+      expect(batches).toEqual([[1, 2], [3, 4], [5]]);
+      expect(sent).toBe(4);
+      expect(remaining).toBe(1);
+      expect(q.items).toEqual([{ id: 5 }]);
+    });
+  });
+
   describe("init", () => {
     it("loads persisted items from storage on first init", async () => {
       const stored = [{ id: 10 }, { id: 20 }];
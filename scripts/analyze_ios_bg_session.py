@@ -71,6 +71,15 @@ def analyze_gps(rows: list[dict[str, str]], gap_threshold_sec: float, csv_path:
     else:
         print("bg_state distribution: column not present (skipped)")
 
+    # Logs written before server-side dedupe may hold replayed copies of a fix.
+    keys = {(r.get("device", ""), r["client_t"], r.get("seq", "")) for r in rows}
+    if len(keys) < n:
+        print(f"Duplicate rows (device, client_t, seq): {n - len(keys)} (ignored for gaps)")
+        timestamps = sorted(float(client_t) for _, client_t, _ in keys)
+    if "out_of_order" in rows[0]:
+        late = sum(1 for r in rows if r.get("out_of_order") == "1")
+        print(f"Out-of-order (replayed) rows: {late}")
+
     gaps: list[tuple[float, float, float]] = []
     for i in range(1, len(timestamps)):
         delta = timestamps[i] - timestamps[i - 1]
@@ -0,0 +1,196 @@
+"""Acquisition on a dedicated producer thread, handed to the event loop by a ring.
+
+`AcquisitionThread` wakes `hz / samples_per_wake` times per second on its
+own `TickScheduler` (blocking wait) and calls `acquire(t)` for
+`samples_per_wake` samples per wake, each stamped with the time it was
+read. Adapter reads, signal mapping and logging therefore never run on the
+asyncio loop: an adapter that blocks on hardware holds up this thread
+only, not HTTP, WS receive or sends.
+
+A read that overruns follows the scheduler's policy (TICK_POLICY): `skip`
+and `stretch` drop the samples of the missed wakes, `catchup` reads them
+late, one wake's worth at a time and at most `MAX_CATCHUP_S` behind.
+`prepare()` runs before every sample, so a hot reload is picked up even
+while catching up.
+
+Samples are published into a `SampleRing`, a fixed-size single-producer /
+single-consumer ring. The producer only advances `_head`, the consumer
+only advances `_tail`, and each is written after the slots it covers, so
+neither side takes a lock (CPython makes each list/attribute store
+atomic). A full ring never blocks the producer: the sample is dropped
+from the live stream and counted in `overflows` (it was already logged).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from scheduler import LatencyHistogram, TickScheduler
+
+log = logging.getLogger("telemetry-server")
+
+# Longest backlog the `catchup` policy reads late; older wakes are dropped.
+MAX_CATCHUP_S = 1.0
+
+
+class SampleRing:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, capacity)
+        self._slots: list[Any] = [None] * self.capacity
+        # Next slot to write (producer) and to read (consumer); both only grow.
+        self._head = 0
+        self._tail = 0
+        self.overflows = 0
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def push(self, item: Any) -> bool:
+        """Producer side. False if the ring is full and `item` was dropped."""
+        head = self._head
+        depth = head - self._tail
+        if depth >= self.capacity:
+            self.overflows += 1
+            return False
+        self._slots[head % self.capacity] = item
+        # Publish only after the slot is written.
+        self._head = head + 1
+        if depth + 1 > self.high_water:
+            self.high_water = depth + 1
+        return True
+
+    def drain(self) -> list[Any]:
+        """Consumer side: every item published so far, oldest first."""
+        tail, head = self._tail, self._head
+        slots, capacity = self._slots, self.capacity
+        items = []
+        for index in range(tail, head):
+            slot = index % capacity
+            items.append(slots[slot])
+            slots[slot] = None
+        # Hand the slots back only after they are read.
+        self._tail = head
+        return items
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "depth": len(self),
+            "high_water": self.high_water,
+            "pushed": self._head,
+            "overflows": self.overflows,
+        }
+
+
+class AcquisitionThread:
+    def __init__(
+        self,
+        acquire: Callable[[float], Any | None],
+        hz: float,
+        ring: SampleRing,
+        samples_per_wake: int = 1,
+        policy: str = "skip",
+        prepare: Callable[[], None] | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+        name: str = "acquisition",
+    ) -> None:
+        self.acquire = acquire
+        self.hz = hz
+        self.ring = ring
+        self.samples_per_wake = max(1, samples_per_wake)
+        # Runs before every sample (e.g. installing new rules).
+        self.prepare = prepare
+        self.name = name
+        self.samples = 0
+        self.read_time = LatencyHistogram()
+        self.error: str | None = None
+        self._stopping = threading.Event()
+        wake_period = self.samples_per_wake / hz
+        self.scheduler = TickScheduler(
+            wake_period,
+            policy,
+            clock=clock,
+            # Stopping interrupts the wait for the next wake.
+            sleep=self._stopping.wait,
+            max_catchup=math.ceil(MAX_CATCHUP_S / wake_period),
+        )
+        self._thread: threading.Thread | None = None
+        self._event_loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        """Start producing; call on the event loop that `post()` should hand work to."""
+        self._event_loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                log.warning("%s thread still busy after %.1fs; left as daemon", self.name, timeout)
+            self._thread = None
+
+    def post(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Run `callback(*args)` on the event loop, from the producer thread."""
+        if self._event_loop is not None:
+            self._event_loop.call_soon_threadsafe(callback, *args)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def skipped(self) -> int:
+        """Samples never read because their wake was dropped by the policy."""
+        return self.scheduler.dropped * self.samples_per_wake
+
+    def _run(self) -> None:
+        try:
+            self._produce()
+        except Exception as exc:
+            self.error = repr(exc)
+            log.exception("%s thread stopped", self.name)
+
+    def _produce(self) -> None:
+        scheduler = self.scheduler
+        clock = scheduler.clock
+        stopping = self._stopping
+
+        scheduler.wait_blocking()
+        # Wall-clock time at the scheduler clock's zero; samples are stamped when read.
+        offset = time.time() - clock()
+
+        while not stopping.is_set():
+            for _ in range(self.samples_per_wake):
+                if stopping.is_set():
+                    return
+                if self.prepare is not None:
+                    self.prepare()
+                read_at = clock()
+                item = self.acquire(offset + read_at)
+                self.read_time.add(clock() - read_at)
+                self.samples += 1
+                if item is not None:
+                    self.ring.push(item)
+
+            scheduler.wait_blocking()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "hz": self.hz,
+            "samples": self.samples,
+            "skipped": self.skipped,
+            "acquire_ms": self.read_time.summary_ms(),
+            "error": self.error,
+            "ring": self.ring.stats(),
+        }
@@ -3,114 +3,303 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import math
 import time
 from contextlib import asynccontextmanager, suppress
+from datetime import datetime
 from typing import Any
 
-import httpx
 import uvicorn
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from can_source import create_can_source
+from acquisition import AcquisitionThread, SampleRing
+from backfill import FrameRing, encode_backfill
+from broadcast import OVERFLOW_POLICIES, ClientOutbox, close_quietly
+from can_source import ReplayCANSource, create_can_source
+from catalog import SessionCatalog
+from codec import CODECS, SCHEMA_CODECS, FrameSchema, JsonFrame, PackedFrame, SchemaField, encode_batch
 from config import CLIENT_DIR, settings
-from gps_sink import extract_event_row, extract_gps_row
+from dedupe import UplinkIndex
+from downsample import METHODS
+from geocode import GeocodeError, ReverseGeocoder
+from gps_sink import extract_event_row, extract_gps_row, parse_batch
+from history import query_can
 from logger import SessionCsvLogger
-from signal_mapper import SignalMapper
+from scheduler import TickScheduler
+from signal_mapper import CompiledRules, SignalMapper, SignalsConfigError
+from subscription import (
+    DEFAULT_SUBSCRIPTION,
+    SubscriptionGroup,
+    SubscriptionRegistry,
+    parse_subscription,
+)
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(message)s")
 log = logging.getLogger("telemetry-server")
 
-can_source = create_can_source(settings.can_source)
+can_source = create_can_source(settings.can_source, settings)
 signal_mapper = SignalMapper(settings.signals_config)
-logger = SessionCsvLogger(settings.log_dir)
+geocoder = ReverseGeocoder(
+    settings.naver_maps_client_id,
+    settings.naver_maps_client_secret,
+    settings.naver_geocode_hosts,
+    cell_m=settings.geocode_cell_m,
+    cache_size=settings.geocode_cache_size,
+    ttl=settings.geocode_cache_ttl,
+    min_move_m=settings.geocode_min_move_m,
+    rate=settings.geocode_rate,
+    burst=settings.geocode_burst,
+    hedge_after=settings.geocode_hedge_after,
+    breaker_cooldown=settings.geocode_breaker_cooldown,
+)
+session_catalog = SessionCatalog(settings.log_dir / "sessions.sqlite3")
+logger = SessionCsvLogger(
+    settings.log_dir,
+    flush_interval=settings.log_flush_interval,
+    flush_bytes=settings.log_flush_bytes,
+    can_dtype=settings.can_log_dtype,
+    can_compress=settings.log_compress,
+    rotate_bytes=settings.log_rotate_bytes,
+    rotate_seconds=settings.log_rotate_seconds,
+    catalog=session_catalog,
+)
 
-clients: set[WebSocket] = set()
+clients: dict[WebSocket, ClientOutbox] = {}
 clients_lock = asyncio.Lock()
 
 broadcast_task: asyncio.Task[None] | None = None
-http_client: httpx.AsyncClient | None = None
+reload_task: asyncio.Task[None] | None = None
 stream_state = {"seq": 0, "drop": 0}
+# Upper bound on acquisition wakeups (200 Hz); higher CAN_HZ acquires
+# several samples per wake.
+MIN_WAKE_PERIOD = 0.005
+# Acquired samples the live stream holds while the event loop is busy.
+RING_SECONDS = 2.0
+tick_scheduler = TickScheduler(1.0 / settings.broadcast_hz, settings.tick_policy)
+sample_ring = SampleRing(math.ceil(max(RING_SECONDS, 2.0 / settings.broadcast_hz) * settings.can_hz))
+frame_schema = FrameSchema()
+# Schema id last propagated to subscription groups (0 = none yet).
+published_schema = {"id": 0}
+# Signals config rebuilt by `signals_reload_loop`, installed by the acquisition thread between wakes.
+pending_rules: dict[str, CompiledRules] = {}
+# CAN columns last handed to the logger; owned by the acquisition thread.
+logged_schema: dict[str, tuple[SchemaField, ...]] = {"fields": ()}
+subscriptions = SubscriptionRegistry()
+# Last BACKFILL_S seconds of broadcast samples for joining/resuming clients.
+frame_ring = (
+    FrameRing(math.ceil(settings.backfill_seconds * settings.can_hz)) if settings.backfill_seconds > 0 else None
+)
+# GPS fixes already logged, so store-and-forward replays are not written twice.
+uplink_index = UplinkIndex(settings.dedupe_window, settings.dedupe_max_keys)
 
 
-async def _sleep_until(target: float) -> None:
-    delay = target - time.perf_counter()
-    if delay > 0:
-        await asyncio.sleep(delay)
-    else:
-        await asyncio.sleep(0)
+async def _evict(outbox: ClientOutbox) -> None:
+    await outbox.aclose()
+    await close_quietly(outbox.ws)
 
 
-async def _broadcast(message: dict[str, Any]) -> None:
+async def _broadcast(frames: list[dict[str, Any]]) -> None:
     async with clients_lock:
-        sockets = list(clients)
+        outboxes = list(clients.values())
+        # Same critical section as a client joining: each sample reaches it
+        # either in its backfill or live, never both or neither.
+        if frame_ring is not None:
+            frame_ring.extend(frames, frame_schema.fields)
 
-    if not sockets:
+    if not outboxes:
         return
 
-    dead: list[WebSocket] = []
-    for ws in sockets:
-        try:
-            await ws.send_json(message)
-        except Exception:
-            dead.append(ws)
+    members: dict[SubscriptionGroup, list[ClientOutbox]] = {}
+    for outbox in outboxes:
+        group = subscriptions.group_of(outbox)
+        if group is not None:
+            members.setdefault(group, []).append(outbox)
+
+    # Reduce once per subscription group and encode once per codec in use;
+    # each client's writer task drains its own bounded outbox, so the
+    # producer never waits on a socket.
+    dead: list[ClientOutbox] = []
+    for group, group_outboxes in members.items():
+        group_frames = group.feed(frames)
+        if not group_frames:
+            continue
+
+        encoded: dict[str, JsonFrame | PackedFrame] = {}
+        for outbox in group_outboxes:
+            shared = encoded.get(outbox.codec)
+            if shared is None:
+                shared = encoded[outbox.codec] = encode_batch(outbox.codec, group_frames, group.schema)
+            if not outbox.offer(shared):
+                dead.append(outbox)
 
     if dead:
         async with clients_lock:
-            for ws in dead:
-                clients.discard(ws)
+            for outbox in dead:
+                clients.pop(outbox.ws, None)
+                subscriptions.remove(outbox)
+        log.warning("evicted %d slow ws client(s)", len(dead))
+        for outbox in dead:
+            asyncio.create_task(_evict(outbox))
+
+
+def _schema_fields(sig: dict[str, float]) -> tuple[SchemaField, ...]:
+    # Mapper fields only change on reload; passthrough mode follows the raw keys.
+    # The logger gets the change in order with the rows that use it.
+    fields = signal_mapper.fields or tuple((key, None, None) for key in sig)
+    if fields != logged_schema["fields"]:
+        logged_schema["fields"] = fields
+        logger.set_can_schema(fields)
+    return fields
+
+
+def _install_pending_rules() -> None:
+    # Runs on the acquisition thread between samples; clients hear about it
+    # from the event loop.
+    compiled = pending_rules.pop("rules", None)
+    if compiled is None:
+        return
+    signal_mapper.install(compiled)
+    producer.post(_announce_rules, compiled)
 
 
-async def can_broadcast_loop() -> None:
-    period = 1.0 / settings.can_hz
-    next_tick = time.perf_counter()
+def _announce_rules(compiled: CompiledRules) -> None:
+    notice = {
+        "v": 1,
+        "type": "signals_config",
+        "signals": [field[0] for field in compiled.fields],
+        "units": [field[1] for field in compiled.fields],
+        "decimals": [field[2] for field in compiled.fields],
+    }
+    for outbox in list(clients.values()):
+        outbox.send_control(notice)
+    log.info("signals config reloaded: %d signals", len(compiled.fields))
+
+
+async def signals_reload_loop() -> None:
+    """Poll SIGNALS_CONFIG's mtime and rebuild the mapper rules when it changes.
 
+    Parsing and compiling run in a worker thread; the result is only handed
+    to the acquisition thread, which installs it at the start of a wake, so
+    a reload never runs inside (or stalls) an acquisition tick. Field changes
+    then reach the logger through `_schema_fields` and the schema codecs
+    through the broadcast loop.
+
+    A config that cannot be read or parsed (e.g. caught half-saved) keeps
+    the installed rules; `stamp` stays put, so the next save is retried.
+    """
+    stamp = signal_mapper.config_stamp()
+    rejected = None
     while True:
-        next_tick += period
-
-        seq = stream_state["seq"]
-        should_sim_drop = (
-            settings.simulate_drop_every > 0
-            and seq > 0
-            and seq % settings.simulate_drop_every == 0
-        )
-
-        if should_sim_drop:
-            stream_state["drop"] += 1
-            stream_state["seq"] += 1
-            await _sleep_until(next_tick)
+        await asyncio.sleep(settings.signals_reload_interval)
+        current = signal_mapper.config_stamp()
+        if current == stamp or current == rejected:
+            continue
+        try:
+            compiled = await asyncio.to_thread(signal_mapper.build, True)
+        except SignalsConfigError as exc:
+            rejected = current
+            log.warning("signals config not reloaded, keeping current rules: %s", exc)
             continue
+        stamp = compiled.stamp
+        rejected = None
+        pending_rules["rules"] = compiled
 
-        raw_sig = can_source.next_frame()
-        sig = signal_mapper.apply(raw_sig)
 
-        frame = {
-            "v": 1,
-            "t": time.time(),
-            "sig": sig,
-            "status": {
-                "seq": seq,
-                "drop": stream_state["drop"],
-            },
-        }
+async def _sync_schema() -> None:
+    if published_schema["id"] == frame_schema.id:
+        return
+    published_schema["id"] = frame_schema.id
 
-        logger.log_can(frame)
-        await _broadcast(frame)
+    changed = subscriptions.update_schema(frame_schema.fields)
+    if not changed:
+        return
 
-        stream_state["seq"] += 1
-        await _sleep_until(next_tick)
+    async with clients_lock:
+        outboxes = list(clients.values())
+    for outbox in outboxes:
+        group = subscriptions.group_of(outbox)
+        if group in changed and outbox.codec in SCHEMA_CODECS:
+            outbox.send_control(group.schema.message())
+
+
+def _acquire(t: float) -> tuple[dict[str, Any], tuple[SchemaField, ...]] | None:
+    # Acquisition thread: read, map and log one sample; the frame is never
+    # mutated afterwards, so the event loop can encode it without a copy.
+    seq = stream_state["seq"]
+    stream_state["seq"] += 1
+
+    should_sim_drop = (
+        settings.simulate_drop_every > 0
+        and seq > 0
+        and seq % settings.simulate_drop_every == 0
+    )
+    if should_sim_drop:
+        stream_state["drop"] += 1
+        return None
+
+    raw_sig = can_source.next_frame()
+    sig = signal_mapper.derive(signal_mapper.apply(raw_sig), t)
+    fields = _schema_fields(sig)
+
+    frame = {
+        "v": 1,
+        "t": t,
+        "sig": sig,
+        "status": {
+            "seq": seq,
+            "drop": stream_state["drop"],
+        },
+    }
+    logger.log_can(frame)
+    return frame, fields
+
+
+producer = AcquisitionThread(
+    _acquire,
+    settings.can_hz,
+    sample_ring,
+    samples_per_wake=max(1, math.ceil(MIN_WAKE_PERIOD * settings.can_hz)),
+    policy=settings.tick_policy,
+    prepare=_install_pending_rules,
+)
+
+
+async def can_broadcast_loop() -> None:
+    """Publish the samples acquired since the last tick, at BROADCAST_HZ.
+
+    Reading the CAN source, mapping and logging happen on `producer`'s
+    thread (so a blocking adapter cannot stall HTTP or WS); this loop only
+    drains `sample_ring`, follows schema changes, encodes and sends.
+    """
+    while True:
+        await tick_scheduler.wait()
+        items = sample_ring.drain()
+        if not items:
+            continue
+
+        batch = []
+        for frame, fields in items:
+            frame_schema.update(fields)
+            batch.append(frame)
+        await _sync_schema()
+        await _broadcast(batch)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    global broadcast_task, http_client
+    global broadcast_task, reload_task
 
     if not CLIENT_DIR.exists():
         raise RuntimeError(f"client directory not found: {CLIENT_DIR}")
 
+    await can_source.start()
+    producer.start()
     broadcast_task = asyncio.create_task(can_broadcast_loop())
-    http_client = httpx.AsyncClient(timeout=httpx.Timeout(4.0))
+    if settings.signals_reload_interval > 0:
+        reload_task = asyncio.create_task(signals_reload_loop())
+    await geocoder.start()
     log.info("session=%s", logger.session_id)
     log.info("logs: %s", settings.log_dir)
     log.info("signals config: %s", settings.signals_config)
@@ -119,17 +308,24 @@ async def lifespan(_: FastAPI):
     try:
         yield
     finally:
+        if reload_task:
+            reload_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await reload_task
+            reload_task = None
+
         if broadcast_task:
             broadcast_task.cancel()
             with suppress(asyncio.CancelledError):
                 await broadcast_task
             broadcast_task = None
 
-        if http_client:
-            await http_client.aclose()
-            http_client = None
+        await asyncio.to_thread(producer.stop)
+        await geocoder.stop()
 
+        await can_source.stop()
         logger.close()
+        session_catalog.close()
 
 
 app = FastAPI(title="Telemetry Dashboard", version="0.1.0", lifespan=lifespan)
@@ -147,192 +343,170 @@ async def api_ping() -> dict[str, Any]:
     return {"ok": True, "t": time.time(), "session": logger.session_id}
 
 
-@app.get("/api/public-config")
-async def api_public_config() -> dict[str, Any]:
-    return {
-        "ok": True,
-        "naver": {
-            "clientId": settings.naver_maps_client_id,
-            "enabled": bool(settings.naver_maps_client_id),
-        },
-    }
+@app.get("/api/stats/logger")
+async def api_stats_logger() -> dict[str, Any]:
+    return {"ok": True, "session": logger.session_id, **logger.stats()}
 
 
-def _format_naver_address(payload: dict[str, Any]) -> str | None:
-    results = payload.get("results")
-    if not isinstance(results, list) or not results:
-        return None
+@app.get("/api/stats/backfill")
+async def api_stats_backfill() -> dict[str, Any]:
+    if frame_ring is None:
+        return {"enabled": False}
+    return {"enabled": True, "stream": logger.session_id, **frame_ring.stats()}
 
-    for item in results:
-        if not isinstance(item, dict):
-            continue
 
-        region = item.get("region") if isinstance(item.get("region"), dict) else {}
-        land = item.get("land") if isinstance(item.get("land"), dict) else {}
+@app.get("/api/stats/uplink")
+async def api_stats_uplink() -> dict[str, Any]:
+    return uplink_index.stats()
 
-        region_names: list[str] = []
-        for area in ("area1", "area2", "area3", "area4"):
-            node = region.get(area)
-            if isinstance(node, dict):
-                name = node.get("name")
-                if name:
-                    region_names.append(str(name))
 
-        land_name = land.get("name")
-        number1 = land.get("number1")
-        number2 = land.get("number2")
+@app.get("/api/stats/ticks")
+async def api_stats_ticks() -> dict[str, Any]:
+    return {
+        "can_hz": settings.can_hz,
+        "broadcast_hz": settings.broadcast_hz,
+        **tick_scheduler.stats(),
+        "acquisition": producer.scheduler.stats(),
+    }
 
-        number = ""
-        if number1:
-            number = str(number1)
-        if number2:
-            number = f"{number}-{number2}" if number else str(number2)
 
-        parts = region_names
-        if land_name:
-            parts.append(str(land_name))
-        if number:
-            parts.append(str(number))
+@app.post("/api/stats/ticks/reset")
+async def api_stats_ticks_reset() -> dict[str, Any]:
+    tick_scheduler.reset_stats()
+    producer.scheduler.reset_stats()
+    return {"ok": True}
 
-        address = " ".join([p for p in parts if p]).strip()
-        if address:
-            return address
 
-    return None
+@app.get("/api/stats/acquisition")
+async def api_stats_acquisition() -> dict[str, Any]:
+    return producer.stats()
 
 
-def _safe_json(response: httpx.Response) -> dict[str, Any] | None:
-    try:
-        payload = response.json()
-    except ValueError:
-        return None
-    return payload if isinstance(payload, dict) else None
+@app.get("/api/stats/source")
+async def api_stats_source() -> dict[str, Any]:
+    return {"ok": True, "source": settings.can_source, **can_source.stats()}
 
 
-def _extract_naver_error(payload: dict[str, Any] | None) -> str | None:
-    if not isinstance(payload, dict):
-        return None
+def _replay_source() -> ReplayCANSource:
+    if not isinstance(can_source, ReplayCANSource):
+        raise HTTPException(status_code=409, detail="CAN_SOURCE is not 'replay'")
+    return can_source
+
 
-    status = payload.get("status")
-    if isinstance(status, dict):
-        code = status.get("code")
-        if code not in (None, 0, "0"):
-            name = status.get("name")
-            message = status.get("message")
-            parts = [p for p in [name, f"code={code}", message] if p]
-            if parts:
-                return ", ".join(str(p) for p in parts)
-            return f"code={code}"
+@app.get("/api/replay")
+async def api_replay() -> dict[str, Any]:
+    return {"ok": True, **_replay_source().stats()}
 
-    error = payload.get("error")
-    if isinstance(error, dict):
-        code = error.get("errorCode") or error.get("code")
-        message = error.get("message")
-        if code or message:
-            return f"{code or 'error'}: {message or ''}".strip()
 
-    return None
+@app.post("/api/replay/seek")
+async def api_replay_seek(t: str | None = None, offset: float | None = None) -> dict[str, Any]:
+    """Jump playback to `t` (epoch seconds or ISO 8601) or `offset` seconds into the session."""
+    source = _replay_source()
+    target = _parse_time(t, "t")
+    if target is None:
+        if offset is None:
+            raise HTTPException(status_code=422, detail="t or offset is required")
+        target = source.t_min + offset
+    source.seek(target)
+    return {"ok": True, **source.stats(), "seek": target}
 
 
-def _short_error_detail(payload: dict[str, Any] | None, response: httpx.Response) -> str:
-    from_payload = _extract_naver_error(payload)
-    if from_payload:
-        return from_payload
+def _parse_time(value: str | None, name: str) -> float | None:
+    """Epoch seconds or an ISO 8601 date/time (local time when no offset is given)."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid {name}: expected epoch seconds or ISO 8601") from None
+
+
+@app.get("/api/sessions")
+async def api_sessions(
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    min_duration: float | None = None,
+    max_duration: float | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+) -> dict[str, Any]:
+    sessions, total = session_catalog.list(
+        since=_parse_time(from_, "from"),
+        until=_parse_time(to, "to"),
+        min_duration=min_duration,
+        max_duration=max_duration,
+        limit=limit,
+        offset=offset,
+    )
+    return {"ok": True, "total": total, "sessions": sessions}
+
+
+@app.get("/api/sessions/{session_id}")
+async def api_session(session_id: str) -> dict[str, Any]:
+    session = session_catalog.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return {"ok": True, "session": session}
+
+
+@app.get("/api/sessions/{session_id}/can")
+async def api_session_can(
+    session_id: str,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    signals: str | None = None,
+    max_points: int = Query(1000, ge=10, le=20000),
+    method: str = "minmax",
+) -> dict[str, Any]:
+    session = session_catalog.get(session_id)
+    manifest = session and session["files"].get("can_manifest")
+    if not manifest or not (settings.log_dir / manifest).exists():
+        raise HTTPException(status_code=404, detail="Unknown session")
+    if method not in METHODS:
+        raise HTTPException(status_code=422, detail=f"method must be one of: {', '.join(METHODS)}")
+
+    t_from = _parse_time(from_, "from")
+    t_to = _parse_time(to, "to")
+    names = [name.strip() for name in signals.split(",") if name.strip()] if signals else None
+    # Inflating and downsampling are CPU work; keep them off the event loop.
+    result = await asyncio.to_thread(
+        query_can, settings.log_dir / manifest, names, t_from, t_to, max_points, method
+    )
+    return {"ok": True, "session": session_id, "from": t_from, "to": t_to, "method": method, **result}
+
 
-    text = response.text.strip().replace("\n", " ")
-    if text:
-        return text[:220]
-    return "no detail"
+@app.get("/api/public-config")
+async def api_public_config() -> dict[str, Any]:
+    return {
+        "ok": True,
+        "naver": {
+            "clientId": settings.naver_maps_client_id,
+            "enabled": bool(settings.naver_maps_client_id),
+        },
+    }
 
 
 @app.get("/api/naver/reverse-geocode")
 async def api_naver_reverse_geocode(lat: float, lon: float) -> dict[str, Any]:
-    if not settings.naver_maps_client_id or not settings.naver_maps_client_secret:
+    if not geocoder.configured:
         raise HTTPException(status_code=503, detail="NAVER_MAPS_CLIENT_ID/SECRET not configured")
 
-    if http_client is None:
-        raise HTTPException(status_code=503, detail="HTTP client not initialized")
-
     if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
         raise HTTPException(status_code=422, detail="Invalid lat/lon range")
 
-    params = {
-        "request": "coordsToaddr",
-        "coords": f"{lon},{lat}",
-        "sourcecrs": "epsg:4326",
-        "output": "json",
-        "orders": "roadaddr,addr",
-    }
-    headers = {
-        "X-NCP-APIGW-API-KEY-ID": settings.naver_maps_client_id,
-        "X-NCP-APIGW-API-KEY": settings.naver_maps_client_secret,
-    }
-
-    hosts = [
-        "https://maps.apigw.ntruss.com/map-reversegeocode/v2/gc",
-        "https://naveropenapi.apigw.ntruss.com/map-reversegeocode/v2/gc",
-    ]
-
-    last_error: str | None = None
-    auth_error: HTTPException | None = None
-    rate_limit_error: HTTPException | None = None
-    for url in hosts:
-        try:
-            response = await http_client.get(url, params=params, headers=headers)
-            payload = _safe_json(response)
-            status_code = response.status_code
-
-            if status_code in (401, 403):
-                detail = _short_error_detail(payload, response)
-                auth_error = HTTPException(
-                    status_code=status_code,
-                    detail=f"Naver reverse-geocode auth failed ({url}): {detail}",
-                )
-                last_error = f"{url} -> HTTP {status_code} ({detail})"
-                continue
-
-            if status_code == 429:
-                detail = _short_error_detail(payload, response)
-                rate_limit_error = HTTPException(
-                    status_code=429,
-                    detail=f"Naver reverse-geocode rate limited ({url}): {detail}",
-                )
-                last_error = f"{url} -> HTTP 429 ({detail})"
-                continue
-
-            if status_code != 200:
-                detail = _short_error_detail(payload, response)
-                last_error = f"{url} -> HTTP {status_code} ({detail})"
-                log.warning("reverse-geocode fallback: %s", last_error)
-                continue
-
-            if not payload:
-                last_error = f"{url} -> invalid JSON payload"
-                log.warning("reverse-geocode invalid payload: %s", last_error)
-                continue
-
-            api_error = _extract_naver_error(payload)
-            if api_error:
-                last_error = f"{url} -> API error ({api_error})"
-                log.warning("reverse-geocode API error: %s", last_error)
-                continue
-
-            address = _format_naver_address(payload)
-            return {
-                "ok": True,
-                "address": address,
-                "raw": payload if address is None else None,
-            }
-        except Exception as exc:
-            last_error = str(exc)
-            log.warning("reverse-geocode exception (%s): %s", url, exc)
+    try:
+        return await geocoder.reverse(lat, lon)
+    except GeocodeError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
-    if auth_error:
-        raise auth_error
-    if rate_limit_error:
-        raise rate_limit_error
 
-    raise HTTPException(status_code=502, detail=f"Naver reverse-geocode failed: {last_error}")
+@app.get("/api/stats/geocode")
+async def api_stats_geocode() -> dict[str, Any]:
+    return geocoder.stats()
 
 
 @app.post("/api/gps")
@@ -340,6 +514,8 @@ async def api_gps(payload: dict[str, Any]) -> dict[str, bool]:
     row = extract_gps_row(payload)
     if not row:
         raise HTTPException(status_code=400, detail="Invalid GPS payload")
+    if not uplink_index.admit(row):
+        return {"ok": True, "duplicate": True}
     logger.log_gps(row)
     return {"ok": True}
 
@@ -353,14 +529,91 @@ async def api_event(payload: dict[str, Any]) -> dict[str, bool]:
     return {"ok": True}
 
 
+def _ingest_batch(items: Any) -> dict[str, Any]:
+    """Validate a store-and-forward batch and log its valid rows with one enqueue."""
+    gps_rows, event_rows, results = parse_batch(items, uplink_index)
+    logger.log_batch(gps_rows, event_rows)
+    accepted = len(gps_rows) + len(event_rows)
+    rejected = sum(1 for result in results if not result["ok"])
+    return {
+        "ok": rejected == 0,
+        "accepted": accepted,
+        "duplicates": len(results) - accepted - rejected,
+        "rejected": rejected,
+        "results": results,
+    }
+
+
+@app.post("/api/gps/batch")
+async def api_gps_batch(payload: dict[str, Any]) -> dict[str, Any]:
+    try:
+        return _ingest_batch(payload.get("items"))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid batch payload: {exc}") from exc
+
+
+def _subscribe(outbox: ClientOutbox, payload: dict[str, Any]) -> None:
+    try:
+        subscription = parse_subscription(payload)
+    except ValueError as exc:
+        outbox.send_control({"v": 1, "type": "error", "error": "subscribe", "detail": str(exc)})
+        return
+
+    group = subscriptions.assign(outbox, subscription, frame_schema.fields)
+    outbox.send_control(
+        {
+            "v": 1,
+            "type": "subscribed",
+            **subscription.describe(),
+            "available": list(group.schema.names),
+        }
+    )
+    if outbox.codec in SCHEMA_CODECS:
+        outbox.send_control(group.schema.message())
+
+
+def _resume_point(params: Any) -> tuple[int | None, bool]:
+    """(`since` seq, whether it belongs to this server's stream) from the WS query."""
+    try:
+        since = int(params.get("since", ""))
+    except ValueError:
+        return None, True
+    if params.get("stream") != logger.session_id:
+        # Seq numbers restart with the server: a seq from another stream means nothing here.
+        return None, False
+    return since, True
+
+
 @app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket) -> None:
     await ws.accept()
 
+    policy = ws.query_params.get("overflow", settings.ws_overflow_policy).strip().lower()
+    if policy not in OVERFLOW_POLICIES:
+        policy = settings.ws_overflow_policy
+    codec = ws.query_params.get("codec", "json").strip().lower()
+    if codec not in CODECS:
+        codec = "json"
+    outbox = ClientOutbox(ws, settings.ws_outbox_size, policy, settings.ws_send_timeout, codec)
+    snapshot = None
+
     async with clients_lock:
-        clients.add(ws)
+        group = subscriptions.assign(outbox, DEFAULT_SUBSCRIPTION, frame_schema.fields)
+        if codec in SCHEMA_CODECS and group.schema.fields:
+            outbox.send_control(group.schema.message())
+        clients[ws] = outbox
+        if frame_ring is not None and ws.query_params.get("backfill", "1") != "0":
+            outbox.hold()
+            since, same_stream = _resume_point(ws.query_params)
+            t, seq, values, gap = frame_ring.snapshot(since)
+            snapshot = (t, seq, values, gap or not same_stream), frame_ring.fields
 
     try:
+        if snapshot is not None:
+            # Compress off the event loop; live frames wait in the held outbox.
+            outbox.send_control(await asyncio.to_thread(encode_backfill, *snapshot, logger.session_id))
+        outbox.start()
+
         while True:
             raw = await ws.receive_text()
 
@@ -372,7 +625,7 @@ async def ws_endpoint(ws: WebSocket) -> None:
             msg_type = payload.get("type")
 
             if msg_type == "ping":
-                await ws.send_json(
+                outbox.send_control(
                     {
                         "v": 1,
                         "type": "pong",
@@ -382,9 +635,25 @@ async def ws_endpoint(ws: WebSocket) -> None:
                 )
                 continue
 
+            if msg_type == "subscribe":
+                _subscribe(outbox, payload)
+                continue
+
+            if msg_type == "batch":
+                try:
+                    ack = _ingest_batch(payload.get("items"))
+                except ValueError as exc:
+                    outbox.send_control(
+                        {"v": 1, "type": "error", "error": "batch", "id": payload.get("id"), "detail": str(exc)}
+                    )
+                    continue
+                outbox.send_control({"v": 1, "type": "batch_ack", "id": payload.get("id"), **ack})
+                continue
+
             gps_row = extract_gps_row(payload)
             if gps_row:
-                logger.log_gps(gps_row)
+                if uplink_index.admit(gps_row):
+                    logger.log_gps(gps_row)
                 continue
 
             event_row = extract_event_row(payload)
@@ -395,7 +664,9 @@ async def ws_endpoint(ws: WebSocket) -> None:
         pass
     finally:
         async with clients_lock:
-            clients.discard(ws)
+            clients.pop(ws, None)
+            subscriptions.remove(outbox)
+        await outbox.aclose()
 
 
 app.mount("/", StaticFiles(directory=str(CLIENT_DIR), html=True), name="client")
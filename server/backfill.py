@@ -0,0 +1,229 @@
+"""Recent mapped frames kept for late-join backfill and seq-based resume.
+
+`FrameRing` holds the last `capacity` samples in preallocated arrays
+(f64 t, i64 seq, f32 values per schema field), so memory is fixed by
+capacity x signal count: 5 min at 100 Hz x 100 signals is ~12.5 MB.
+
+A joining client gets everything in the ring as one binary WS message; a
+reconnecting client that passes its last `seq` (and the `stream` id it was
+on) gets only the samples after it. Layout (little-endian):
+
+    u8  version (1)
+    u8  kind (3 = backfill; 1/2 are packed frame/batch, see codec.py)
+    u16 flags (bit 0 = gap: samples after the client's seq were already evicted)
+    u32 size of the body once inflated
+    zlib-deflated body:
+        u32 meta length, meta JSON {"stream","count","signals","units","decimals","scale"}
+            padded with spaces so the arrays below start 8-byte aligned
+        f64 t[count]
+        u32 seq[count]
+        i32 values[signals][count], byte-shuffled (all byte 0s, then byte 1s, ...)
+
+Each signal is one column of `count` i32. When `scale[i]` is a number the
+column holds deltas of round(value * scale) (value = running sum / scale,
+MISSING = no sample, the sum is unchanged); otherwise it holds float32
+bits (NaN = missing). Signals with schema decimals are quantized, which
+with the byte shuffle compresses several times better than raw floats.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import struct
+import zlib
+from typing import Any
+
+import numpy as np
+
+BACKFILL_VERSION = 1
+BACKFILL_KIND = 3
+BACKFILL_HEADER = struct.Struct("<BBHI")
+FLAG_GAP = 1
+MISSING = -(2**31)
+# Quantized values must stay clear of MISSING and of i32 overflow in deltas.
+QUANT_LIMIT = 2**30
+# zlib level 1: a full 5-minute ring compresses in tens of ms, most of level 6's ratio.
+COMPRESS_LEVEL = 1
+
+SchemaField = tuple[str, str | None, int | None]
+
+
+class FrameRing:
+    """Fixed-capacity ring of mapped frames in schema column order.
+
+    `extend()` reads each frame's `sig` by schema name; a schema change
+    remaps the stored columns by name, so history survives a signals reload.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self.fields: tuple[SchemaField, ...] = ()
+        self.names: tuple[str, ...] = ()
+        self._t = np.zeros(self.capacity, dtype=np.float64)
+        self._seq = np.zeros(self.capacity, dtype=np.int64)
+        self._values = np.empty((0, self.capacity), dtype=np.float32)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._t.nbytes + self._seq.nbytes + self._values.nbytes
+
+    def set_fields(self, fields: tuple[SchemaField, ...]) -> None:
+        names = tuple(field[0] for field in fields)
+        self.fields = fields
+        if names == self.names:
+            return
+        old = {name: row for row, name in enumerate(self.names)}
+        values = np.full((len(names), self.capacity), np.nan, dtype=np.float32)
+        for row, name in enumerate(names):
+            if name in old:
+                values[row] = self._values[old[name]]
+        self._values = values
+        self.names = names
+
+    def extend(self, frames: list[dict[str, Any]], fields: tuple[SchemaField, ...]) -> None:
+        if fields is not self.fields:
+            self.set_fields(fields)
+        if not frames:
+            return
+        frames = frames[-self.capacity :]
+        count = len(frames)
+        nan = math.nan
+        names = self.names
+        slots = (self._head + np.arange(count)) % self.capacity
+        self._t[slots] = [frame["t"] for frame in frames]
+        self._seq[slots] = [frame["status"]["seq"] for frame in frames]
+        if names:
+            rows = [[sig.get(name, nan) for name in names] for sig in (frame["sig"] for frame in frames)]
+            self._values[:, slots] = np.array(rows, dtype=np.float32).T
+        self._head = (self._head + count) % self.capacity
+        self._count = min(self.capacity, self._count + count)
+
+    def snapshot(self, since: int | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+        """Copy out (t, seq, values[signals, rows], gap), oldest first.
+
+        With `since`, only samples with a larger seq; `gap` is True when the
+        ring no longer reaches back to `since + 1` (everything is returned).
+        """
+        order = (self._head - self._count + np.arange(self._count)) % self.capacity
+        seq = self._seq[order]
+        gap = False
+        if since is not None and self._count:
+            if seq[0] <= since + 1 and since <= seq[-1]:
+                order = order[int(np.searchsorted(seq, since, side="right")) :]
+                seq = self._seq[order]
+            else:
+                gap = True
+        return self._t[order], seq, self._values[:, order], gap
+
+    def stats(self) -> dict[str, Any]:
+        if not self._count:
+            return {"capacity": self.capacity, "rows": 0, "signals": len(self.names), "bytes": self.nbytes}
+        oldest = (self._head - self._count) % self.capacity
+        newest = (self._head - 1) % self.capacity
+        return {
+            "capacity": self.capacity,
+            "rows": self._count,
+            "signals": len(self.names),
+            "bytes": self.nbytes,
+            "seconds": float(self._t[newest] - self._t[oldest]),
+            "seq_min": int(self._seq[oldest]),
+            "seq_max": int(self._seq[newest]),
+        }
+
+
+def _quantize(values: np.ndarray, fields: tuple[SchemaField, ...]) -> tuple[np.ndarray, list[float | None]]:
+    columns = np.empty(values.shape, dtype="<i4")
+    scales: list[float | None] = []
+    for row, field in enumerate(fields):
+        column = values[row].astype(np.float64)
+        scale = 10.0 ** field[2] if field[2] is not None else None
+        if scale is not None:
+            quantized = np.round(column * scale)
+            missing = np.isnan(quantized)
+            if np.all(np.abs(quantized[~missing]) < QUANT_LIMIT):
+                if missing.any():
+                    # Hold the last value across gaps so deltas stay small.
+                    last = np.maximum.accumulate(np.where(missing, 0, np.arange(len(column))))
+                    quantized = np.nan_to_num(quantized[last])
+                deltas = np.diff(quantized, prepend=0.0).astype(np.int64)
+                deltas[missing] = MISSING
+                columns[row] = deltas
+                scales.append(scale)
+                continue
+        columns[row] = column.astype("<f4").view("<i4")
+        scales.append(None)
+    return columns, scales
+
+
+def encode_backfill(
+    snapshot: tuple[np.ndarray, np.ndarray, np.ndarray, bool],
+    fields: tuple[SchemaField, ...],
+    stream: str,
+    level: int = COMPRESS_LEVEL,
+) -> bytes:
+    """Build the binary backfill message for a `FrameRing.snapshot()` taken with `fields`."""
+    t, seq, values, gap = snapshot
+    columns, scales = _quantize(values, fields)
+    meta = json.dumps(
+        {
+            "stream": stream,
+            "count": len(t),
+            "signals": [field[0] for field in fields],
+            "units": [field[1] for field in fields],
+            "decimals": [field[2] for field in fields],
+            "scale": scales,
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    meta += b" " * (-(4 + len(meta)) % 8)
+    words = columns.view("<u4").ravel()
+    body = b"".join(
+        (
+            struct.pack("<I", len(meta)),
+            meta,
+            t.astype("<f8").tobytes(),
+            (seq & 0xFFFFFFFF).astype("<u4").tobytes(),
+            *((words >> shift).astype(np.uint8).tobytes() for shift in (0, 8, 16, 24)),
+        )
+    )
+    header = BACKFILL_HEADER.pack(BACKFILL_VERSION, BACKFILL_KIND, FLAG_GAP if gap else 0, len(body))
+    return header + zlib.compress(body, level)
+
+
+def decode_backfill(data: bytes) -> dict[str, Any]:
+    """Inverse of `encode_backfill` (tests and tooling; the web client has its own)."""
+    version, kind, flags, size = BACKFILL_HEADER.unpack_from(data)
+    if version != BACKFILL_VERSION or kind != BACKFILL_KIND:
+        raise ValueError("not a backfill message")
+    body = zlib.decompress(data[BACKFILL_HEADER.size :])
+    if len(body) != size:
+        raise ValueError("backfill body size mismatch")
+    (meta_size,) = struct.unpack_from("<I", body)
+    meta = json.loads(body[4 : 4 + meta_size])
+    count = meta["count"]
+    width = len(meta["signals"])
+    offset = 4 + meta_size
+    t = np.frombuffer(body, dtype="<f8", count=count, offset=offset)
+    offset += 8 * count
+    seq = np.frombuffer(body, dtype="<u4", count=count, offset=offset)
+    offset += 4 * count
+    shuffled = np.frombuffer(body, dtype=np.uint8, count=4 * count * width, offset=offset)
+    columns = shuffled.reshape(4, -1).T.copy().view("<i4").reshape(width, count)
+
+    values = np.empty((width, count), dtype=np.float64)
+    for row, scale in enumerate(meta["scale"]):
+        column = columns[row]
+        if scale is None:
+            values[row] = column.view("<f4")
+            continue
+        missing = column == MISSING
+        values[row] = np.cumsum(np.where(missing, 0, column).astype(np.int64)) / scale
+        values[row][missing] = np.nan
+    return {**meta, "gap": bool(flags & FLAG_GAP), "t": t, "seq": seq, "values": values}
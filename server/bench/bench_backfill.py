@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Measure the backfill ring: memory, append cost and backfill payload size.
+
+Fills a `FrameRing` sized for `--seconds` at `--hz` with smooth, rounded
+signals (like mapped CAN data), then reports ring memory, append cost per
+broadcast batch, and time/size of a full late-join backfill and of a resume
+covering the last few seconds, next to the same frames as a JSON batch.
+
+Usage:
+    python3 bench/bench_backfill.py
+    python3 bench/bench_backfill.py --seconds 300 --hz 100 --signals 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backfill import FrameRing, encode_backfill  # noqa: E402
+from codec import json_batch  # noqa: E402
+
+
+def make_frames(count: int, hz: float, signals: int) -> list[dict]:
+    rng = random.Random(4)
+    phases = [rng.uniform(0, 6.28) for _ in range(signals)]
+    rates = [rng.uniform(0.05, 2.0) for _ in range(signals)]
+    frames = []
+    for i in range(count):
+        t = 1_700_000_000.0 + i / hz
+        sig = {
+            f"sig_{k}": round(50 * math.sin(rates[k] * t + phases[k]) + rng.gauss(0, 0.2), 2)
+            for k in range(signals)
+        }
+        frames.append({"v": 1, "t": t, "sig": sig, "status": {"seq": i, "drop": 0}})
+    return frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=300.0)
+    parser.add_argument("--hz", type=float, default=100.0)
+    parser.add_argument("--signals", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=5, help="frames per broadcast tick")
+    parser.add_argument("--resume", type=float, default=5.0, help="seconds missed by a reconnecting client")
+    args = parser.parse_args()
+
+    capacity = math.ceil(args.seconds * args.hz)
+    fields = tuple((f"sig_{k}", "x", 2) for k in range(args.signals))
+    frames = make_frames(capacity, args.hz, args.signals)
+    ring = FrameRing(capacity)
+
+    started = time.perf_counter()
+    for i in range(0, len(frames), args.batch):
+        ring.extend(frames[i : i + args.batch], fields)
+    append_us = (time.perf_counter() - started) / len(frames) * 1e6
+
+    print(f"ring: {capacity} rows x {args.signals} signals = {ring.nbytes / 1e6:.1f} MB")
+    print(f"append: {append_us:.1f} us/frame (batches of {args.batch})")
+
+    for label, since in (("full backfill", None), (f"resume {args.resume:g}s", capacity - 1 - int(args.resume * args.hz))):
+        started = time.perf_counter()
+        snapshot = ring.snapshot(since)
+        snap_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        payload = encode_backfill(snapshot, ring.fields, "bench")
+        encode_ms = (time.perf_counter() - started) * 1000
+        rows = len(snapshot[0])
+        json_bytes = len(json_batch(frames[-rows:]).render(0, 0).encode("utf-8"))
+        print(
+            f"{label:>14}: {rows} rows, snapshot {snap_ms:.1f} ms, encode {encode_ms:.1f} ms, "
+            f"{len(payload) / 1e6:.2f} MB (JSON batch {json_bytes / 1e6:.2f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Measure high-rate acquisition with batched broadcast messages.
+
+Runs the same acquire -> map -> encode path as `app.can_broadcast_loop`
+(DummyCANSource, SignalMapper with server/signals.json, `codec.encode_batch`)
+in real time for each acquisition rate, and reports achieved sample rate,
+message rate, batch size, wire bytes per codec and event-loop busy time.
+
+Usage:
+    python3 bench/bench_batching.py
+    python3 bench/bench_batching.py --rates 100,500,1000 --broadcast-hz 10 --seconds 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from can_source import DummyCANSource  # noqa: E402
+from codec import CODECS, FrameSchema, encode_batch  # noqa: E402
+from signal_mapper import SignalMapper  # noqa: E402
+
+MIN_WAKE_PERIOD = 0.005
+SIGNALS_CONFIG = Path(__file__).resolve().parents[1] / "signals.json"
+
+
+async def run(can_hz: float, broadcast_hz: float, seconds: float) -> dict[str, float]:
+    source = DummyCANSource()
+    mapper = SignalMapper(SIGNALS_CONFIG)
+    schema = FrameSchema()
+    schema.update(mapper.fields)
+
+    sample_period = 1.0 / can_hz
+    batch_period = 1.0 / broadcast_hz
+    wakes_per_batch = max(1, math.ceil(batch_period / max(sample_period, MIN_WAKE_PERIOD)))
+    wake_period = batch_period / wakes_per_batch
+
+    started = time.perf_counter()
+    epoch = time.time()
+    acquired = wakes = messages = 0
+    busy = 0.0
+    wire = dict.fromkeys(CODECS, 0)
+    batch: list[dict] = []
+    next_tick = started
+
+    while time.perf_counter() - started < seconds:
+        next_tick += wake_period
+        wakes += 1
+        work_started = time.perf_counter()
+
+        due = int((work_started - started) / sample_period) + 1
+        while acquired < due:
+            sig = mapper.apply(source.next_frame())
+            batch.append(
+                {
+                    "v": 1,
+                    "t": epoch + acquired * sample_period,
+                    "sig": sig,
+                    "status": {"seq": acquired, "drop": 0},
+                }
+            )
+            acquired += 1
+
+        if wakes % wakes_per_batch == 0 and batch:
+            for codec in CODECS:
+                data = encode_batch(codec, batch, schema).render(0, 0)
+                wire[codec] += len(data.encode("utf-8") if isinstance(data, str) else data)
+            messages += 1
+            batch = []
+
+        busy += time.perf_counter() - work_started
+        delay = next_tick - time.perf_counter()
+        await asyncio.sleep(max(0.0, delay))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "samples_per_s": acquired / elapsed,
+        "messages_per_s": messages / elapsed,
+        "batch": acquired / max(1, messages),
+        "busy_pct": busy / elapsed * 100.0,
+        **{f"{codec}_kBps": wire[codec] / elapsed / 1024.0 for codec in CODECS},
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="100,500,1000")
+    parser.add_argument("--broadcast-hz", type=float, default=10.0)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"broadcast={args.broadcast_hz}Hz seconds={args.seconds} signals=7 (one consumer per codec)")
+    print(
+        f"{'CAN_HZ':>7} {'samples/s':>10} {'msgs/s':>7} {'batch':>6} {'busy':>6} "
+        + " ".join(f"{codec + ' kB/s':>12}" for codec in CODECS)
+    )
+    for rate in (float(r) for r in args.rates.split(",")):
+        result = await run(rate, args.broadcast_hz, args.seconds)
+        print(
+            f"{rate:>7.0f} {result['samples_per_s']:>10.1f} {result['messages_per_s']:>7.1f} "
+            f"{result['batch']:>6.1f} {result['busy_pct']:>5.1f}% "
+            + " ".join(f"{result[f'{codec}_kBps']:>12.1f}" for codec in CODECS)
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
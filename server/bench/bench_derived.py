@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Measure derived-signal cost per frame against recomputing each window.
+
+Configures one expression plus mean/rms/peak windows of 1, 5 and 10 s over
+the wheel speeds and times `SignalMapper.derive` per frame at the given
+acquisition rate. The baseline recomputes the same statistics from the raw
+window samples every frame, as a naive implementation would.
+
+Usage:
+    python3 bench/bench_derived.py
+    python3 bench/bench_derived.py --hz 1000 --frames 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from signal_mapper import SignalMapper  # noqa: E402
+
+SOURCES = ("ws_fl", "ws_fr", "ws_rl", "ws_rr")
+OPS = ("mean", "rms", "peak")
+WINDOWS = (1, 5, 10)
+
+
+def write_config(path: Path) -> None:
+    derived = {"v_avg": {"expr": "(ws_fl + ws_fr + ws_rl + ws_rr) / 4", "decimals": 1}}
+    for source in SOURCES:
+        for op in OPS:
+            for window in WINDOWS:
+                derived[f"{source}_{op}_{window}s"] = {"op": op, "of": source, "window": window}
+    signals = {source: {"unit": "km/h"} for source in SOURCES}
+    path.write_text(json.dumps({"version": 1, "signals": signals, "derived": derived}), encoding="utf-8")
+
+
+def recompute(frames: list[dict[str, float]], hz: float) -> float:
+    buffers = {(source, window): deque() for source in SOURCES for window in WINDOWS}
+    started = time.perf_counter()
+    for i, frame in enumerate(frames):
+        t = i / hz
+        for (source, window), buf in buffers.items():
+            buf.append((t, frame[source]))
+            while buf[0][0] <= t - window:
+                buf.popleft()
+            values = [value for _, value in buf]
+            sum(values) / len(values)
+            math.sqrt(sum(value * value for value in values) / len(values))
+            max(abs(value) for value in values)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hz", type=float, default=100.0)
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    frames = [{source: rng.uniform(0, 120) for source in SOURCES} for _ in range(args.frames)]
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Path(tmp) / "signals.json"
+        write_config(config)
+        mapper = SignalMapper(config)
+        outputs = len(mapper.fields) - len(SOURCES)
+        started = time.perf_counter()
+        for i, frame in enumerate(frames):
+            mapper.derive(mapper.apply(frame), i / args.hz)
+        incremental = time.perf_counter() - started
+
+    naive = recompute(frames, args.hz)
+    print(f"{outputs} derived outputs at {args.hz:g} Hz, windows {WINDOWS} s, {args.frames} frames")
+    print(f"  apply + derive (incremental): {incremental / args.frames * 1e6:9.1f} us/frame")
+    print(f"  recompute windows (naive):    {naive / args.frames * 1e6:9.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
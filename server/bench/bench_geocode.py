@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Measure reverse-geocode latency and upstream calls with the cell cache.
+
+Starts a local stub of the NAVER reverse-geocode API with a fixed latency
+and drives `ReverseGeocoder` with several clients that each poll the
+address of one simulated car once per second: parked for the first part,
+then driving at `--speed` m/s with GPS jitter. Compares against calling
+the upstream for every request (no cache), and the cell cache with and
+without the outbound budget (movement threshold + token bucket). A second
+run polls one car at 1/5/10 Hz to show upstream calls follow the distance
+driven, not the poll rate. Time is simulated for the cache and budget.
+
+Then measures the uncached host chain when the first host degrades
+(`--spike-every`-th request takes `--spike-ms`): plain in-order fallback
+versus health-ranked hosts with a hedged second request.
+
+Usage:
+    python3 bench/bench_geocode.py
+    python3 bench/bench_geocode.py --clients 4 --seconds 120 --latency-ms 80
+    python3 bench/bench_geocode.py --spike-every 3 --spike-ms 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from geocode import METERS_PER_DEGREE, ReverseGeocoder  # noqa: E402
+
+BODY = json.dumps(
+    {
+        "status": {"code": 0, "name": "ok"},
+        "results": [{"region": {"area1": {"name": "서울특별시"}}, "land": {"name": "세종대로", "number1": "110"}}],
+    }
+).encode("utf-8")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, spike_every: int = 0, spike: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), Stub)
+        self.latency = latency
+        self.spike_every = spike_every
+        self.spike = spike
+        self.calls = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/gc"
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        pass
+
+
+class Stub(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        server = self.server
+        server.calls += 1
+        spiked = server.spike_every and server.calls % server.spike_every == 0
+        time.sleep(server.spike if spiked else server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+def track(seconds: int, parked: int, speed: float, hz: float = 1.0) -> list[tuple[float, float]]:
+    rng = random.Random(2)
+    lat, lon = 37.5665, 126.9780
+    points = []
+    for tick in range(int(seconds * hz)):
+        if tick / hz >= parked:
+            lat += speed / hz / METERS_PER_DEGREE
+        jitter = rng.gauss(0, 2.0) / METERS_PER_DEGREE
+        points.append((lat + jitter, lon + jitter / math.cos(math.radians(lat))))
+    return points
+
+
+async def drive(
+    geocoder: ReverseGeocoder, points, clients: int, cached: bool, now: list[float], hz: float = 1.0
+) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = {"all": []}
+    for lat, lon in points:
+        now[0] += 1.0 / hz
+
+        # Every client asks about the same car within the same tick.
+        async def one() -> None:
+            started = time.perf_counter()
+            if cached:
+                source = (await geocoder.reverse(lat, lon))["cache"]
+            else:
+                await geocoder._fetch(lat, lon)
+                source = "miss"
+            elapsed = (time.perf_counter() - started) * 1000.0
+            latencies["all"].append(elapsed)
+            latencies.setdefault(source, []).append(elapsed)
+
+        await asyncio.gather(*(one() for _ in range(clients)))
+    return latencies
+
+
+def summary(values: list[float]) -> str:
+    ordered = sorted(values)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):8.3f} ms  p99 {p99:8.3f} ms"
+
+
+async def run_cache(args: argparse.Namespace) -> None:
+    points = track(args.seconds, args.seconds // 2, args.speed)
+    modes = (("no cache", False, False), ("cell cache", True, False), ("cell cache + budget", True, True))
+    for label, cached, budget in modes:
+        stub = StubServer(args.latency_ms / 1000.0)
+        now = [0.0]
+        geocoder = ReverseGeocoder(
+            "id",
+            "secret",
+            [stub.url],
+            cell_m=args.cell_m,
+            min_move_m=args.min_move_m if budget else 0.0,
+            rate=args.rate if budget else 0.0,
+            clock=lambda: now[0],
+        )
+        await geocoder.start()
+        latencies = await drive(geocoder, points, args.clients, cached, now)
+        await geocoder.stop()
+        stub.shutdown()
+        print(f"{label}: {len(latencies['all'])} requests -> {stub.calls} upstream calls")
+        for source, values in latencies.items():
+            print(f"  {source:>10} x{len(values):<4} {summary(values)}")
+
+
+async def run_budget(args: argparse.Namespace) -> None:
+    driven_km = args.speed * (args.seconds - args.seconds // 2) / 1000.0
+    for hz in (1.0, 5.0, 10.0):
+        stub = StubServer(0.0)
+        now = [0.0]
+        geocoder = ReverseGeocoder(
+            "id", "secret", [stub.url], cell_m=args.cell_m, min_move_m=args.min_move_m, rate=args.rate,
+            clock=lambda: now[0],
+        )
+        await geocoder.start()
+        points = track(args.seconds, args.seconds // 2, args.speed, hz)
+        latencies = await drive(geocoder, points, 1, True, now, hz)
+        await geocoder.stop()
+        stub.shutdown()
+        sources = {source: len(values) for source, values in latencies.items() if source != "all"}
+        print(
+            f"{hz:4.0f} Hz: {len(points):4d} requests -> {stub.calls:3d} upstream calls "
+            f"({stub.calls / driven_km:5.1f} per km driven)  {sources}"
+        )
+
+
+async def run_hosts(args: argparse.Namespace) -> None:
+    modes = (("in order", False, False), ("ranked", True, False), ("ranked + hedged", True, True))
+    for label, ranked, hedge in modes:
+        latency = args.latency_ms / 1000.0
+        degraded = StubServer(latency, args.spike_every, args.spike_ms / 1000.0)
+        healthy = StubServer(latency * 1.5)
+        geocoder = ReverseGeocoder("id", "secret", [degraded.url, healthy.url], hedge_after=1.0 if hedge else 0.0)
+        if not ranked:
+            # The previous behaviour: always the configured order.
+            geocoder._plan = lambda: list(geocoder._health)  # type: ignore[method-assign]
+        await geocoder.start()
+        latencies = []
+        for step in range(args.requests):
+            started = time.perf_counter()
+            await geocoder._fetch(37.5665 + step * 0.001, 126.9780)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        await geocoder.stop()
+        for stub in (degraded, healthy):
+            stub.shutdown()
+        print(
+            f"{label:>16}: {summary(latencies)}  max {max(latencies):8.1f} ms  "
+            f"upstream {degraded.calls}+{healthy.calls}  hedged {geocoder.hedged}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--seconds", type=int, default=60, help="simulated seconds, half parked")
+    parser.add_argument("--speed", type=float, default=15.0, help="m/s while driving")
+    parser.add_argument("--cell-m", type=float, default=15.0)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--min-move-m", type=float, default=30.0)
+    parser.add_argument("--rate", type=float, default=2.0, help="upstream calls per second (token bucket)")
+    parser.add_argument("--requests", type=int, default=60, help="uncached lookups for the host chain run")
+    parser.add_argument("--spike-every", type=int, default=4, help="every n-th request to the first host is slow")
+    parser.add_argument("--spike-ms", type=float, default=3000.0)
+    args = parser.parse_args()
+
+    asyncio.run(run_cache(args))
+    asyncio.run(run_budget(args))
+    asyncio.run(run_hosts(args))
+
+
+if __name__ == "__main__":
+    main()
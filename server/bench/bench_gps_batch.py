@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Measure store-and-forward GPS replay: one request per fix versus batches.
+
+Builds the backlog a phone collects offline (`--minutes` of 1 Hz fixes,
+stamped with `queued_at` like `mobile/src/telemetry/protocol.js`) and
+replays it against a running server, first with one `POST /api/gps` per
+fix, then with `POST /api/gps/batch` in chunks of `--batch`, then as WS
+`batch` messages waiting for each `batch_ack`.
+
+Usage:
+    python3 app.py                      # in another terminal
+    python3 bench/bench_gps_batch.py
+    python3 bench/bench_gps_batch.py --url http://127.0.0.1:8080 --minutes 60 --batch 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+
+
+def backlog(minutes: float) -> list[dict]:
+    start = time.time() - minutes * 60.0
+    fixes = []
+    for second in range(int(minutes * 60)):
+        t = start + second
+        fixes.append(
+            {
+                "v": 1,
+                "t": t,
+                "gps": {"lat": 37.5665 + second * 1e-4, "lon": 126.978, "spd": 11.0, "hdg": 0.0, "acc": 5.0},
+                "meta": {"source": "mobile", "bg_state": "background", "device": "bench"},
+                "queued_at": t,
+            }
+        )
+    return fixes
+
+
+def chunks(items: list[dict], size: int) -> list[list[dict]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+async def single(url: str, fixes: list[dict]) -> None:
+    async with httpx.AsyncClient(base_url=url) as client:
+        for fix in fixes:
+            (await client.post("/api/gps", json=fix)).raise_for_status()
+
+
+async def batched(url: str, fixes: list[dict], size: int) -> int:
+    accepted = 0
+    async with httpx.AsyncClient(base_url=url, timeout=30.0) as client:
+        for items in chunks(fixes, size):
+            response = await client.post("/api/gps/batch", json={"items": items})
+            response.raise_for_status()
+            accepted += response.json()["accepted"]
+    return accepted
+
+
+async def ws_batched(url: str, fixes: list[dict], size: int) -> int:
+    accepted = 0
+    ws_url = url.replace("http", "ws", 1) + "/ws?backfill=0"
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        for number, items in enumerate(chunks(fixes, size)):
+            await ws.send(json.dumps({"v": 1, "type": "batch", "id": number, "items": items}))
+            while True:
+                message = await ws.recv()
+                if isinstance(message, str) and '"batch_ack"' in message:
+                    accepted += json.loads(message)["accepted"]
+                    break
+    return accepted
+
+
+async def run(args: argparse.Namespace) -> None:
+    fixes = backlog(args.minutes)
+    print(f"backlog: {len(fixes)} fixes ({args.minutes:g} min at 1 Hz)")
+
+    started = time.perf_counter()
+    await single(args.url, fixes)
+    elapsed = time.perf_counter() - started
+    print(f"  POST /api/gps x{len(fixes):<5}       {elapsed:7.2f} s  ({len(fixes) / elapsed:8.0f} fixes/s)")
+
+    started = time.perf_counter()
+    accepted = await batched(args.url, fixes, args.batch)
+    elapsed = time.perf_counter() - started
+    requests = len(chunks(fixes, args.batch))
+    print(f"  POST /api/gps/batch x{requests:<3}   {elapsed:7.2f} s  ({accepted / elapsed:8.0f} fixes/s)")
+
+    started = time.perf_counter()
+    accepted = await ws_batched(args.url, fixes, args.batch)
+    elapsed = time.perf_counter() - started
+    print(f"  WS batch + ack x{requests:<3}        {elapsed:7.2f} s  ({accepted / elapsed:8.0f} fixes/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--batch", type=int, default=500, help="fixes per batch (mobile flushBatches limit)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
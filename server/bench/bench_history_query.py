@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Measure historical time-range queries against a logged session.
+
+Writes a synthetic session through `SessionCsvLogger` (DummyCANSource +
+SignalMapper with server/signals.json, gzip segments) into a temp directory,
+then times `history.query_can` (the `GET /api/sessions/{id}/can` path)
+for windows from the whole drive down to a few seconds.
+
+Usage:
+    python3 bench/bench_history_query.py
+    python3 bench/bench_history_query.py --hours 3 --can-hz 100 --max-points 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from can_source import DummyCANSource  # noqa: E402
+from history import query_can  # noqa: E402
+from logger import SessionCsvLogger  # noqa: E402
+from signal_mapper import SignalMapper  # noqa: E402
+
+SIGNALS_CONFIG = Path(__file__).resolve().parents[1] / "signals.json"
+EPOCH = 1_700_000_000.0
+
+
+def write_session(log_dir: Path, hours: float, can_hz: float, rotate_mb: float) -> Path:
+    source = DummyCANSource()
+    mapper = SignalMapper(SIGNALS_CONFIG)
+    # Live logging commits every LOG_FLUSH_MS; emulate its chunk size (one commit per 200 ms).
+    flush_bytes = int(can_hz * 0.2 * (24 + 4 * len(mapper.fields)))
+    logger = SessionCsvLogger(
+        log_dir, session_id="bench", flush_bytes=flush_bytes, rotate_bytes=int(rotate_mb * 1024 * 1024)
+    )
+    logger.set_can_schema(mapper.fields)
+    for seq in range(int(hours * 3600 * can_hz)):
+        sig = mapper.apply(source.next_frame())
+        logger.log_can({"t": EPOCH + seq / can_hz, "sig": sig, "status": {"seq": seq, "drop": 0}})
+    logger.close()
+    return logger.can_manifest_path
+
+
+def query(manifest: Path, t_from: float, t_to: float, max_points: int, method: str) -> tuple[dict, float]:
+    started = time.perf_counter()
+    result = query_can(manifest, None, t_from, t_to, max_points, method)
+    return result, (time.perf_counter() - started) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--can-hz", type=float, default=100.0)
+    parser.add_argument("--rotate-mb", type=float, default=256.0)
+    parser.add_argument("--max-points", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        manifest = write_session(Path(tmp), args.hours, args.can_hz, args.rotate_mb)
+        size = sum(path.stat().st_size for path in Path(tmp).glob("can_bench_*.tlog*"))
+        print(
+            f"session: {args.hours}h @ {args.can_hz:.0f}Hz, {size / 1e6:.1f} MB on disk, "
+            f"written in {time.perf_counter() - started:.1f}s"
+        )
+
+        duration = args.hours * 3600.0
+        print(f"{'window':>10} {'method':>7} {'source':>7} {'rows':>9} {'ms':>8}")
+        for window in (duration, 600.0, 60.0, 2.0):
+            t_from = EPOCH + (duration - window) / 2
+            for method in ("minmax", "lttb"):
+                result, ms = query(manifest, t_from, t_from + window, args.max_points, method)
+                print(f"{window:>9.0f}s {method:>7} {result['source']:>7} {result['rows']:>9} {ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Measure acquisition tick jitter around a signals.json hot reload.
+
+Runs a tick loop shaped like `app.can_broadcast_loop` (one wake every
+5 ms, `SignalMapper.apply` on a frame with every configured signal) and
+reloads a config with several hundred signals in the middle of the run,
+either inline on the event loop (`mapper.reload()`, the naive way) or the
+way the server does it (`build()` in a worker thread, `install()` at the
+start of a wake). Reports wake lateness before, during and after.
+
+Usage:
+    python3 bench/bench_hot_reload.py
+    python3 bench/bench_hot_reload.py --signals 800 --reloads 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from signal_mapper import SignalMapper  # noqa: E402
+
+WAKE_PERIOD = 0.005
+
+
+def write_config(path: Path, count: int, scale: float) -> None:
+    signals = {
+        f"sig_{i}": {
+            "source": f"raw_{i}",
+            "scale": scale,
+            "offset": 0.0,
+            "min": -1000.0,
+            "max": 1000.0,
+            "decimals": 2,
+            "unit": "x",
+        }
+        for i in range(count)
+    }
+    path.write_text(json.dumps({"version": 1, "signals": signals}, indent=2), encoding="utf-8")
+
+
+async def run(config: Path, count: int, mode: str, reloads: int, phase: float) -> dict[str, list[float]]:
+    mapper = SignalMapper(config)
+    rng = random.Random(3)
+    frame = {f"raw_{i}": rng.uniform(0, 100) for i in range(count)}
+    pending: list = []
+    lateness: dict[str, list[float]] = {"before": [], "during": [], "after": []}
+    # Time the event loop itself spent on each reload (parse+compile inline, or the swap).
+    blocked: list[float] = []
+
+    async def reloader() -> None:
+        await asyncio.sleep(phase)
+        for i in range(reloads):
+            # The editor saving the file is another process; keep it off this loop.
+            await asyncio.to_thread(write_config, config, count, 1.0 + i)
+            if mode == "inline":
+                started = time.perf_counter()
+                mapper.reload()
+                blocked.append((time.perf_counter() - started) * 1000.0)
+            else:
+                pending.append(await asyncio.to_thread(mapper.build))
+            await asyncio.sleep(phase / reloads)
+
+    task = asyncio.create_task(reloader())
+    started = time.perf_counter()
+    next_tick = started
+    while True:
+        next_tick += WAKE_PERIOD
+        if pending:
+            swap_started = time.perf_counter()
+            mapper.install(pending.pop())
+            blocked.append((time.perf_counter() - swap_started) * 1000.0)
+        mapper.apply(frame)
+
+        delay = next_tick - time.perf_counter()
+        await asyncio.sleep(max(0.0, delay))
+        now = time.perf_counter()
+        elapsed = now - started
+        key = "before" if elapsed < phase else "during" if elapsed < 2 * phase else "after"
+        lateness[key].append((now - next_tick) * 1000.0)
+        # Resynchronise after a stall so one late wake is not counted again by every later one.
+        next_tick = max(next_tick, now - WAKE_PERIOD)
+        if elapsed >= 3 * phase:
+            break
+    await task
+    lateness["loop blocked by reload"] = blocked
+    return lateness
+
+
+def summary(values: list[float]) -> str:
+    ordered = sorted(values)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):6.2f}  p99 {p99:6.2f}  max {ordered[-1]:6.2f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signals", type=int, default=500)
+    parser.add_argument("--reloads", type=int, default=5)
+    parser.add_argument("--phase", type=float, default=1.0, help="seconds before/during/after")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Path(tmp) / "signals.json"
+        for mode in ("inline", "offloop"):
+            write_config(config, args.signals, 1.0)
+            lateness = asyncio.run(run(config, args.signals, mode, args.reloads, args.phase))
+            print(f"{mode} reload, {args.signals} signals, {args.reloads} reloads (wake lateness ms)")
+            for key, values in lateness.items():
+                print(f"  {key:>22}: {summary(values)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Measure SignalMapper cost per sample at 10, 100 and 1000 signals.
+
+Builds a signals config with scale/offset, half of the signals clamped and
+rounded and every tenth disabled, then times `SignalMapper.apply` on one
+frame dict at a time and `SignalMapper.apply_batch` on blocks of samples.
+
+Usage:
+    python3 bench/bench_signal_mapper.py
+    python3 bench/bench_signal_mapper.py --signals 10,100,1000 --block 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from signal_mapper import SignalMapper  # noqa: E402
+
+
+def write_config(path: Path, count: int) -> None:
+    signals = {}
+    for i in range(count):
+        rule = {"source": f"raw_{i}", "scale": 0.01, "offset": -40.0, "unit": "x"}
+        if i % 2 == 0:
+            rule.update({"min": -20.0, "max": 20.0, "decimals": 2})
+        if i % 10 == 9:
+            rule["enabled"] = False
+        signals[f"sig_{i}"] = rule
+    path.write_text(json.dumps({"version": 1, "signals": signals}), encoding="utf-8")
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signals", default="10,100,1000")
+    parser.add_argument("--block", type=int, default=1000, help="samples per apply_batch call")
+    parser.add_argument("--frames", type=int, default=2000, help="frames per apply timing run")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'signals':>8} {'apply us/frame':>15} {'batch us/frame':>15} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(value) for value in args.signals.split(",")):
+            config = Path(tmp) / f"signals_{count}.json"
+            write_config(config, count)
+            mapper = SignalMapper(config)
+            sources = tuple(f"raw_{i}" for i in range(count))
+            frames = [{name: rng.uniform(0, 8000) for name in sources} for _ in range(64)]
+            block = np.array([[frame[name] for name in sources] for frame in frames] * (args.block // 64 + 1))[
+                : args.block
+            ]
+
+            def per_frame() -> None:
+                apply = mapper.apply
+                for i in range(args.frames):
+                    apply(frames[i & 63])
+
+            per_frame_us = timed(per_frame, 3) / args.frames * 1e6
+            batch_us = timed(lambda: mapper.apply_batch(block, sources), 5) / args.block * 1e6
+            print(f"{count:>8} {per_frame_us:>15.2f} {batch_us:>15.3f} {per_frame_us / batch_us:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Measure DBC decode throughput against a fully loaded 500 kbit/s CAN bus.
+
+Feeds random payloads (cangen-style) for every message of the DBC through
+`SocketCANSource.feed` and compares the achieved frame rate with the bus
+maximum (8-byte standard frames with worst-case bit stuffing).
+
+With `--channel vcan0` it instead writes the same traffic to a SocketCAN
+interface at the bus rate while a SocketCANSource reads it on the event
+loop, and reports received frames and kernel receive-queue drops.
+
+Usage:
+    python3 bench/bench_socketcan.py
+    python3 bench/bench_socketcan.py --dbc my.dbc --frames 200000
+    sudo ip link add vcan0 type vcan && sudo ip link set vcan0 up
+    python3 bench/bench_socketcan.py --channel vcan0 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from can_source import SocketCANSource  # noqa: E402
+from can_source.socketcan import FRAME_HEADER  # noqa: E402
+
+EXAMPLE_DBC = Path(__file__).resolve().parents[1] / "can_source" / "example.dbc"
+BUS_BITRATE = 500_000
+# Standard 8-byte frame: 111 bits incl. interframe space, up to 24 stuff bits.
+WORST_FRAME_BITS = 135
+
+
+def synthetic_frames(source: SocketCANSource, count: int) -> list[bytes]:
+    # Decoder keys already carry CAN_EFF_FLAG for 29-bit ids, as SocketCAN expects.
+    ids = list(source.decoders)
+    payloads = os.urandom(count * 8)
+    return [
+        FRAME_HEADER.pack(ids[i % len(ids)], 8) + payloads[i * 8 : i * 8 + 8] for i in range(count)
+    ]
+
+
+def bench_decode(dbc: Path, count: int) -> None:
+    source = SocketCANSource("bench", dbc)
+    frames = synthetic_frames(source, count)
+    feed = source.feed
+    started = time.perf_counter()
+    for frame in frames:
+        feed(frame)
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed
+    bus = BUS_BITRATE / WORST_FRAME_BITS
+    print(f"decoders: {len(source.decoders)} messages, {len(source.latest)} signals")
+    print(f"decode: {rate:,.0f} frames/s ({elapsed / count * 1e6:.2f} us/frame)")
+    print(f"500 kbit/s bus: {bus:,.0f} frames/s -> {bus / rate * 100:.1f}% of one core")
+
+
+async def bench_channel(dbc: Path, channel: str, seconds: float) -> None:
+    source = SocketCANSource(channel, dbc)
+    await source.start()
+    rate = BUS_BITRATE / WORST_FRAME_BITS
+    total = int(rate * seconds)
+    frames = synthetic_frames(source, min(total, 100_000))
+    with socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW) as tx:
+        tx.bind((channel,))
+        tx.setblocking(False)
+        sent = 0
+        started = time.perf_counter()
+        while sent < total:
+            due = min(total, int((time.perf_counter() - started) * rate) + 1)
+            while sent < due:
+                try:
+                    tx.send(frames[sent % len(frames)])
+                except BlockingIOError:
+                    break
+                sent += 1
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.1)
+    await source.stop()
+    stats = source.stats()
+    print(f"sent {sent} frames to {channel} in {seconds:.1f}s ({sent / seconds:,.0f}/s)")
+    print(f"received {stats['frames']}, decoded {stats['decoded']}, kernel drops {stats['kernel_drops']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dbc", type=Path, default=EXAMPLE_DBC)
+    parser.add_argument("--frames", type=int, default=100_000)
+    parser.add_argument("--channel", help="SocketCAN interface to load (e.g. vcan0)")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    if args.channel:
+        asyncio.run(bench_channel(args.dbc, args.channel, args.seconds))
+    else:
+        bench_decode(args.dbc, args.frames)
+
+
+if __name__ == "__main__":
+    main()
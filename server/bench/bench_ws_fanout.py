@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Measure per-tick WebSocket fan-out time versus client count.
+
+Compares the old path (sequential `send_json` per client, re-encoding the frame
+each time) against `broadcast.ClientOutbox` (encode once per tick, enqueue to
+per-client bounded outboxes drained by writer tasks). For the outbox path the
+producer-side publish cost is reported separately from delivery time (until
+every fast client has the frame). Sockets are simulated with a fixed LAN-ish
+send latency; one optional slow client models an iPad on weak Wi-Fi.
+
+Usage:
+    python3 bench/bench_ws_fanout.py
+    python3 bench/bench_ws_fanout.py --latency-ms 2 --slow-ms 300 --ticks 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from broadcast import ClientOutbox  # noqa: E402
+from codec import JsonFrame  # noqa: E402
+
+
+class FakeSocket:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.delivered = asyncio.Event()
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.latency)
+        self.delivered.set()
+
+    async def send_json(self, data: dict) -> None:
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+
+def _frame(seq: int, n_signals: int) -> dict:
+    return {
+        "v": 1,
+        "t": time.time(),
+        "sig": {f"sig_{i:03d}": 12.345 + i for i in range(n_signals)},
+        "status": {"seq": seq, "drop": 0},
+    }
+
+
+async def _sequential(sockets: list[FakeSocket], ticks: int, n_signals: int) -> list[float]:
+    samples: list[float] = []
+    for seq in range(ticks):
+        frame = _frame(seq, n_signals)
+        started = time.perf_counter()
+        for ws in sockets:
+            await ws.send_json(frame)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+async def _outboxes(
+    sockets: list[FakeSocket], fast: list[FakeSocket], ticks: int, n_signals: int, timeout: float
+) -> tuple[list[float], list[float]]:
+    outboxes = [ClientOutbox(ws, maxsize=4, policy="latest", send_timeout=timeout) for ws in sockets]
+    for outbox in outboxes:
+        outbox.start()
+
+    publish: list[float] = []
+    delivery: list[float] = []
+    for seq in range(ticks):
+        for ws in fast:
+            ws.delivered.clear()
+        frame = _frame(seq, n_signals)
+        started = time.perf_counter()
+        shared = JsonFrame(frame)
+        for outbox in outboxes:
+            outbox.offer(shared)
+        publish.append((time.perf_counter() - started) * 1000.0)
+        await asyncio.gather(*(ws.delivered.wait() for ws in fast))
+        delivery.append((time.perf_counter() - started) * 1000.0)
+
+    for outbox in outboxes:
+        await outbox.aclose()
+    return publish, delivery
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", default="1,2,4,8,12,16,32")
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="latency of one extra slow client (0=none)")
+    parser.add_argument("--timeout-ms", type=float, default=2000.0)
+    parser.add_argument("--signals", type=int, default=7)
+    parser.add_argument("--ticks", type=int, default=30)
+    args = parser.parse_args()
+
+    timeout = args.timeout_ms / 1000.0
+    print(
+        f"latency={args.latency_ms}ms slow={args.slow_ms}ms timeout={args.timeout_ms}ms "
+        f"signals={args.signals} ticks={args.ticks}"
+    )
+    print(
+        f"{'clients':>8} {'sequential p50':>15} {'sequential max':>15} "
+        f"{'publish p50':>12} {'delivery p50':>13} {'delivery max':>13}"
+    )
+
+    for count in (int(c) for c in args.clients.split(",")):
+        fast = [FakeSocket(args.latency_ms / 1000.0) for _ in range(count)]
+        sockets = list(fast)
+        if args.slow_ms > 0:
+            sockets.append(FakeSocket(args.slow_ms / 1000.0))
+
+        seq = await _sequential(sockets, args.ticks, args.signals)
+        publish, delivery = await _outboxes(sockets, fast, args.ticks, args.signals, timeout)
+        print(
+            f"{count:>8} {statistics.median(seq):>13.2f}ms {max(seq):>13.2f}ms "
+            f"{statistics.median(publish):>10.3f}ms {statistics.median(delivery):>11.2f}ms "
+            f"{max(delivery):>11.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
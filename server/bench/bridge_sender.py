@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Push synthetic signal records to the UDP/TCP CAN bridge (CAN_SOURCE=bridge).
+
+Sends DummyCANSource values as JSON lines or binary records at a fixed packet
+rate over loopback, paced in 1 ms batches, and reports the achieved rate.
+With `--local` it also runs a BridgeCANSource in this process and reports
+what it received, lost and how stale the cache was.
+
+Usage:
+    python3 bench/bridge_sender.py --local
+    python3 bench/bridge_sender.py --rate 10000 --seconds 5 --format binary
+    python3 bench/bridge_sender.py --transport tcp --port 5005 --format json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from can_source import BridgeCANSource, DummyCANSource  # noqa: E402
+from can_source.bridge import DEFAULT_SIGNALS, encode_binary  # noqa: E402
+
+
+def packet(fmt: str, seq: int, sig: dict[str, float]) -> bytes:
+    if fmt == "json":
+        return json.dumps({"seq": seq, "sig": sig}, separators=(",", ":")).encode() + b"\n"
+    return encode_binary(seq, [(DEFAULT_SIGNALS.index(name), value) for name, value in sig.items()])
+
+
+async def send(args: argparse.Namespace) -> tuple[int, float]:
+    source = DummyCANSource()
+    if args.transport == "udp":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.connect((args.host, args.port))
+        sock.setblocking(False)
+        write = sock.send
+    else:
+        _, writer = await asyncio.open_connection(args.host, args.port)
+        write = writer.write
+
+    sent = 0
+    total = int(args.rate * args.seconds)
+    started = time.perf_counter()
+    while sent < total:
+        due = min(total, int((time.perf_counter() - started) * args.rate) + 1)
+        sig = source.next_frame()
+        while sent < due:
+            try:
+                write(packet(args.format, sent, sig))
+            except BlockingIOError:
+                # Socket buffer full: the datagram is lost, as on a busy network.
+                pass
+            sent += 1
+        if args.transport == "tcp":
+            await writer.drain()
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+
+    if args.transport == "udp":
+        sock.close()
+    else:
+        writer.close()
+        await writer.wait_closed()
+    if args.local:
+        # Let the in-process receiver drain the socket.
+        await asyncio.sleep(0.05)
+    return sent, elapsed
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    bridge = None
+    if args.local:
+        bridge = BridgeCANSource(args.host, args.port, transport=args.transport)
+        await bridge.start()
+        args.port = bridge.port
+
+    sent, elapsed = await send(args)
+    print(f"sent {sent} {args.format} packets over {args.transport} in {elapsed:.2f}s ({sent / elapsed:.0f}/s)")
+
+    if bridge is not None:
+        stats = bridge.stats()
+        await bridge.stop()
+        ages = [s["age_ms"] for s in stats["signals"].values() if s["age_ms"] is not None]
+        print(
+            f"received {stats['packets']} packets, {stats['bytes'] / 1e6:.1f} MB, "
+            f"lost {stats['lost']}, errors {stats['errors']}, cache age {max(ages, default=0):.0f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=("udp", "tcp"), default="udp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--format", choices=("json", "binary"), default="binary")
+    parser.add_argument("--rate", type=float, default=10000.0, help="packets per second")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--local", action="store_true", help="run the bridge receiver in this process")
+    args = parser.parse_args()
+    if args.local:
+        args.port = 0
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
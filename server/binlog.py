@@ -0,0 +1,681 @@
+"""Chunked columnar binary CAN log (`.tlog`).
+
+Layout (little-endian, every record 8-byte aligned):
+
+    magic   b"TLOGv1\\r\\n"
+    record  u32 tag (4 ASCII bytes) + u32 payload length, payload, zero pad to 8
+      SCHM  UTF-8 JSON {"id", "signals", "units", "decimals", "dtype"}
+            written at start and whenever the mapper schema changes
+      CHNK  u32 schema id, u32 rows, f64 t_min, f64 t_max, then columns:
+            t f64[rows], seq i64[rows], drop i64[rows],
+            one `dtype` column per schema signal (NaN = missing);
+            every column is padded to 8 bytes
+
+Chunks refer to the last SCHM with their id, so a reader can memory-map the
+file and hand out NumPy views per column without parsing rows. A partially
+written trailing record (live session) is ignored.
+
+A session may be split into segments (`can_<session>_0001.tlog[.gz]`), each
+self-contained (magic + current SCHM first) and optionally gzip-compressed as
+it is written. `<prefix>.manifest.json` lists every segment with its time range
+and row count, so a time-range read only opens the segments it overlaps.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+
+MAGIC = b"TLOGv1\r\n"
+TAG_SCHEMA = b"SCHM"
+TAG_CHUNK = b"CHNK"
+RECORD_HEADER = struct.Struct("<4sI")
+CHUNK_HEADER = struct.Struct("<IIdd")
+DTYPES = {"float32": ("<f4", "f"), "float64": ("<f8", "d")}
+
+
+def _pad(size: int) -> int:
+    return (-size) % 8
+
+
+def _record(tag: bytes, payload: bytes) -> bytes:
+    return RECORD_HEADER.pack(tag, len(payload)) + payload + b"\0" * _pad(len(payload))
+
+
+def _column(data: bytes) -> bytes:
+    return data + b"\0" * _pad(len(data))
+
+
+class ColumnarLogWriter:
+    """Buffers CAN samples column-wise and encodes them as SCHM/CHNK records.
+
+    Not thread-safe; owned by the logger's writer thread. `drain()` returns the
+    bytes to append to the file (a chunk of buffered rows plus any schema records).
+    With `summarize=True` every encoded chunk also leaves a `ChunkSummary` in
+    `summaries` (per-signal min/max) for the caller to collect.
+    """
+
+    def __init__(self, dtype: str = "float32", summarize: bool = False) -> None:
+        if dtype not in DTYPES:
+            raise ValueError(f"unsupported dtype: {dtype}")
+        self.dtype = dtype
+        self._np_dtype, self._typecode = DTYPES[dtype]
+        self._schema_id = 0
+        self._fields: tuple[tuple[str, str | None, int | None], ...] = ()
+        self._names: tuple[str, ...] = ()
+        self._known: frozenset[str] = frozenset()
+        self._schema_record = b""
+        self._pending: list[bytes] = [MAGIC]
+        self._pending_size = len(MAGIC)
+        self.summarize = summarize
+        self.summaries: list[ChunkSummary] = []
+        self._reset_columns()
+        self._reset_segment()
+
+    @property
+    def rows(self) -> int:
+        return len(self._t)
+
+    @property
+    def schema_record(self) -> bytes:
+        """Encoded SCHM record of the current schema (empty before the first)."""
+        return self._schema_record
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_size + len(self._t) * (24 + len(self._names) * struct.calcsize(self._typecode))
+
+    def set_schema(self, fields: tuple[tuple[str, str | None, int | None], ...]) -> None:
+        """Start a new schema record; buffered rows are closed out as a chunk first."""
+        fields = tuple(fields)
+        if fields == self._fields and self._schema_id:
+            return
+        self._encode_chunk()
+        self._schema_id += 1
+        self._fields = fields
+        names = self._names = tuple(field[0] for field in fields)
+        self._known = frozenset(names)
+        self._reset_columns()
+        payload = json.dumps(
+            {
+                "id": self._schema_id,
+                "signals": list(names),
+                "units": [field[1] for field in fields],
+                "decimals": [field[2] for field in fields],
+                "dtype": self._np_dtype,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self._schema_record = _record(TAG_SCHEMA, payload)
+        self._emit(self._schema_record)
+        self.segment_signals.update(dict.fromkeys(names))
+
+    def append(self, t: float, seq: int, drop: int, sig: dict[str, float]) -> None:
+        if not self._schema_id or not self._known.issuperset(sig):
+            # A signal the schema does not know yet: extend rather than drop it.
+            extra = tuple((name, None, None) for name in sig if name not in self._known)
+            self.set_schema(self._fields + extra)
+        nan = math.nan
+        self._t.append(float(t) if t is not None else nan)
+        self._seq.append(int(seq or 0))
+        self._drop.append(int(drop or 0))
+        for name, column in zip(self._names, self._columns):
+            value = sig.get(name)
+            column.append(value if value is not None else nan)
+
+    def drain(self) -> bytes:
+        self._encode_chunk()
+        data = b"".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        return data
+
+    def start_segment(self) -> bytes:
+        """Header for a new segment file: magic plus the current schema record.
+
+        Call right after `drain()`; later chunks keep the current schema id.
+        """
+        if self._pending:
+            raise RuntimeError("start_segment() with undrained data")
+        self._reset_segment()
+        self.segment_signals.update(dict.fromkeys(self._names))
+        return MAGIC + self._schema_record
+
+    def _reset_segment(self) -> None:
+        self.segment_rows = 0
+        self.segment_t_min: float | None = None
+        self.segment_t_max: float | None = None
+        self.segment_signals: dict[str, None] = {}
+
+    def _emit(self, data: bytes) -> None:
+        self._pending.append(data)
+        self._pending_size += len(data)
+
+    def _reset_columns(self) -> None:
+        self._t = array("d")
+        self._seq = array("q")
+        self._drop = array("q")
+        self._columns = [array(self._typecode) for _ in self._names]
+
+    def _encode_chunk(self) -> None:
+        rows = len(self._t)
+        if not rows:
+            return
+        finite = [t for t in self._t if not math.isnan(t)]
+        t_min = min(finite) if finite else math.nan
+        t_max = max(finite) if finite else math.nan
+        header = CHUNK_HEADER.pack(self._schema_id, rows, t_min, t_max)
+        parts = [header, _column(self._t.tobytes()), _column(self._seq.tobytes()), _column(self._drop.tobytes())]
+        parts.extend(_column(column.tobytes()) for column in self._columns)
+        self._emit(_record(TAG_CHUNK, b"".join(parts)))
+        if self.summarize and finite:
+            extremes = {}
+            for name, column in zip(self._names, self._columns):
+                values = np.frombuffer(column, dtype=self._np_dtype)
+                # fmin/fmax skip NaN (and give NaN for an all-missing column).
+                extremes[name] = (float(np.fmin.reduce(values)), float(np.fmax.reduce(values)))
+            self.summaries.append(ChunkSummary(t_min, t_max, self._seq[0], self._drop[-1], rows, extremes))
+        self._reset_columns()
+
+        self.segment_rows += rows
+        if finite:
+            if self.segment_t_min is None or t_min < self.segment_t_min:
+                self.segment_t_min = t_min
+            if self.segment_t_max is None or t_max > self.segment_t_max:
+                self.segment_t_max = t_max
+
+
+@dataclass(frozen=True)
+class ChunkSummary:
+    t_min: float
+    t_max: float
+    seq: int
+    drop: int
+    rows: int
+    extremes: dict[str, tuple[float, float]]
+
+
+@dataclass(frozen=True)
+class ChunkInfo:
+    offset: int  # first byte of the column data
+    schema_id: int
+    rows: int
+    t_min: float
+    t_max: float
+
+
+@dataclass(frozen=True)
+class LogSchema:
+    id: int
+    signals: tuple[str, ...]
+    units: tuple[str | None, ...]
+    decimals: tuple[int | None, ...]
+    dtype: str
+
+
+def _parse_schema(payload: bytes) -> LogSchema:
+    meta = json.loads(payload)
+    return LogSchema(
+        id=int(meta["id"]),
+        signals=tuple(meta["signals"]),
+        units=tuple(meta.get("units") or [None] * len(meta["signals"])),
+        decimals=tuple(meta.get("decimals") or [None] * len(meta["signals"])),
+        dtype=str(meta.get("dtype", "<f4")),
+    )
+
+
+def _chunk_views(buf: Any, offset: int, rows: int, schema: LogSchema) -> dict[str, np.ndarray]:
+    columns: dict[str, np.ndarray] = {}
+    for name, dtype in (("t", "<f8"), ("seq", "<i8"), ("drop", "<i8")):
+        columns[name] = np.frombuffer(buf, dtype=dtype, count=rows, offset=offset)
+        offset += rows * 8
+    itemsize = np.dtype(schema.dtype).itemsize
+    for name in schema.signals:
+        columns[name] = np.frombuffer(buf, dtype=schema.dtype, count=rows, offset=offset)
+        offset += rows * itemsize + _pad(rows * itemsize)
+    return columns
+
+
+# Compressed bytes inflated per step when reading a gzip segment.
+_INFLATE_BLOCK = 256 * 1024
+
+
+class ColumnarLogReader:
+    """Indexes the schema and chunk records of one `.tlog` (or `.tlog.gz`) file.
+
+    Plain files are memory-mapped. Compressed segments are inflated into
+    memory, starting at compressed offset `start` (0 or a seek point recorded
+    in the manifest) and stopping once a chunk later than `t_to` is seen, so a
+    time-window read only inflates the blocks around the window. Only record
+    headers are read while indexing; column data is accessed as NumPy views
+    over the buffer when requested.
+    """
+
+    def __init__(self, path: Path, start: int = 0, t_to: float | None = None) -> None:
+        self.path = Path(path)
+        self._file: BinaryIO | None = None
+        self._buf: mmap.mmap | bytearray | None = None
+        self.schemas: dict[int, LogSchema] = {}
+        self.chunks: list[ChunkInfo] = []
+        if self.path.suffix == ".gz":
+            self._inflate(start, t_to)
+        elif self.path.stat().st_size:
+            self._file = self.path.open("rb")
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._check_magic()
+            self._index(len(MAGIC))
+
+    def __enter__(self) -> ColumnarLogReader:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            try:
+                self._buf.close()
+            except BufferError:
+                # Views handed out by chunk_columns() are still alive; the
+                # mapping is released when the last one is collected.
+                pass
+        self._buf = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def signals(self) -> list[str]:
+        """Every signal name seen in any schema, in first-seen order."""
+        names: dict[str, None] = {}
+        for schema in self.schemas.values():
+            names.update(dict.fromkeys(schema.signals))
+        return list(names)
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk.rows for chunk in self.chunks)
+
+    def _check_magic(self) -> None:
+        assert self._buf is not None
+        if self._buf[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"not a tlog file: {self.path}")
+
+    def _inflate(self, start: int, t_to: float | None) -> None:
+        # Segments are sync-flushed on every commit, so everything committed so
+        # far inflates even while the gzip trailer has not been written yet.
+        # Seek points follow a full flush, where raw inflate can resume.
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS if start == 0 else -zlib.MAX_WBITS)
+        buf = self._buf = bytearray()
+        offset = len(MAGIC) if start == 0 else 0
+        checked = start != 0
+        with self.path.open("rb") as fh:
+            fh.seek(start)
+            while not inflater.eof:
+                block = fh.read(_INFLATE_BLOCK)
+                if not block:
+                    break
+                buf += inflater.decompress(block)
+                if not checked:
+                    if len(buf) < len(MAGIC):
+                        continue
+                    self._check_magic()
+                    checked = True
+                offset = self._index(offset)
+                if t_to is not None and self.chunks and self.chunks[-1].t_min > t_to:
+                    break
+        if not buf:
+            self._buf = None
+
+    def _index(self, offset: int) -> int:
+        """Index complete records from `offset`; returns where parsing stopped."""
+        mm = self._buf
+        assert mm is not None
+        size = len(mm)
+        while offset + RECORD_HEADER.size <= size:
+            tag, length = RECORD_HEADER.unpack_from(mm, offset)
+            body = offset + RECORD_HEADER.size
+            end = body + length + _pad(length)
+            if end > size:
+                break  # not written (or not inflated) yet
+            if tag == TAG_SCHEMA:
+                schema = _parse_schema(bytes(mm[body : body + length]))
+                self.schemas[schema.id] = schema
+            elif tag == TAG_CHUNK:
+                schema_id, rows, t_min, t_max = CHUNK_HEADER.unpack_from(mm, body)
+                self.chunks.append(ChunkInfo(body + CHUNK_HEADER.size, schema_id, rows, t_min, t_max))
+            offset = end
+        return offset
+
+    def chunk_columns(self, chunk: ChunkInfo) -> dict[str, np.ndarray]:
+        """Zero-copy views of one chunk: `t`, `seq`, `drop` and every schema signal."""
+        assert self._buf is not None
+        return _chunk_views(self._buf, chunk.offset, chunk.rows, self.schemas[chunk.schema_id])
+
+    def iter_chunks(
+        self, t_from: float | None = None, t_to: float | None = None
+    ) -> Iterator[tuple[LogSchema, dict[str, np.ndarray]]]:
+        """(schema, columns) for every chunk whose time range overlaps [t_from, t_to]."""
+        for chunk in self.chunks:
+            if t_from is not None and chunk.t_max < t_from:
+                continue
+            if t_to is not None and chunk.t_min > t_to:
+                continue
+            yield self.schemas[chunk.schema_id], self.chunk_columns(chunk)
+
+    def read(
+        self, signals: list[str] | None = None, t_from: float | None = None, t_to: float | None = None
+    ) -> dict[str, np.ndarray]:
+        """Whole-file (or time-window) arrays per column (`t`, `seq`, `drop` + signals).
+
+        Signals absent from a chunk's schema are NaN for that chunk's rows.
+        """
+        names = self.signals if signals is None else list(signals)
+        chunks = [
+            chunk
+            for chunk in self.chunks
+            if (t_from is None or chunk.t_max >= t_from) and (t_to is None or chunk.t_min <= t_to)
+        ]
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in ("t", "seq", "drop", *names)}
+        for schema_id, run in itertools.groupby(chunks, key=lambda chunk: chunk.schema_id):
+            for name, column in self._gather(self.schemas[schema_id], list(run), names).items():
+                parts[name].append(column)
+        result = _concat(parts)
+
+        t = result["t"]
+        if len(t) and ((t_from is not None and t[0] < t_from) or (t_to is not None and t[-1] > t_to)):
+            mask = np.ones(len(t), dtype=bool)
+            if t_from is not None:
+                mask &= t >= t_from
+            if t_to is not None:
+                mask &= t <= t_to
+            result = {name: column[mask] for name, column in result.items()}
+        return result
+
+    def _gather(self, schema: LogSchema, run: list[ChunkInfo], names: list[str]) -> dict[str, np.ndarray]:
+        # One vectorized gather per column over a run of same-schema chunks, so
+        # the cost does not grow with the number of (small, per-commit) chunks.
+        buf = self._buf
+        assert buf is not None
+        rows = np.array([chunk.rows for chunk in run], dtype=np.int64)
+        offsets = np.array([chunk.offset for chunk in run], dtype=np.int64)
+        total = int(rows.sum())
+        within = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(rows) - rows, rows)
+        base = np.repeat(offsets, rows)
+        per_chunk = np.repeat(rows, rows)
+
+        words = len(buf) // 8
+        f8 = np.frombuffer(buf, dtype="<f8", count=words)
+        i8 = np.frombuffer(buf, dtype="<i8", count=words)
+        columns = {
+            "t": f8[(base >> 3) + within],
+            "seq": i8[(base >> 3) + per_chunk + within],
+            "drop": i8[(base >> 3) + 2 * per_chunk + within],
+        }
+
+        itemsize = np.dtype(schema.dtype).itemsize
+        values = np.frombuffer(buf, dtype=schema.dtype, count=len(buf) // itemsize)
+        padded = (per_chunk * itemsize + 7) // 8 * 8
+        signal_base = base + 24 * per_chunk
+        position = {name: index for index, name in enumerate(schema.signals)}
+        for name in names:
+            index = position.get(name)
+            if index is None:
+                columns[name] = np.full(total, np.nan, dtype=schema.dtype)
+            else:
+                columns[name] = values[(signal_base + index * padded) // itemsize + within]
+        return columns
+
+
+def _concat(parts: dict[str, list[np.ndarray]]) -> dict[str, np.ndarray]:
+    result: dict[str, np.ndarray] = {}
+    for name, bucket in parts.items():
+        if len(bucket) == 1:
+            result[name] = bucket[0]
+        elif bucket:
+            result[name] = np.concatenate(bucket)
+        else:
+            result[name] = np.empty(0, dtype="<i8" if name in ("seq", "drop") else "<f8")
+    return result
+
+
+class SessionLogReader:
+    """Reads a segmented session through its manifest.
+
+    Segments are opened lazily and only when their time range overlaps the
+    requested window; the segment still being written is always considered.
+    Within a gzip segment, reading starts at the last seek point (`seek`:
+    `[compressed offset, t_max before it]` pairs) at or before the window.
+    """
+
+    def __init__(self, manifest_path: Path) -> None:
+        self.path = Path(manifest_path)
+        self.manifest = json.loads(self.path.read_text(encoding="utf-8"))
+        self.segments: list[dict[str, Any]] = self.manifest.get("segments", [])
+
+    def __enter__(self) -> SessionLogReader:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        pass
+
+    @property
+    def signals(self) -> list[str]:
+        names: dict[str, None] = {}
+        for segment in self.segments:
+            names.update(dict.fromkeys(segment.get("signals") or ()))
+        return list(names)
+
+    @property
+    def rows(self) -> int:
+        return sum(int(segment.get("rows") or 0) for segment in self.segments)
+
+    def segments_for(self, t_from: float | None = None, t_to: float | None = None) -> list[dict[str, Any]]:
+        selected = []
+        for segment in self.segments:
+            if segment.get("closed"):
+                if segment.get("t_min") is None:
+                    continue
+                if t_from is not None and segment["t_max"] < t_from:
+                    continue
+                if t_to is not None and segment["t_min"] > t_to:
+                    continue
+            selected.append(segment)
+        return selected
+
+    def read_rollup(
+        self, signals: list[str], t_from: float | None = None, t_to: float | None = None
+    ) -> dict[str, np.ndarray] | None:
+        """Per-chunk summary rows in the window (`t`, `t_max`, `rows`, `<signal>.min/.max`).
+
+        None when the session has no rollup file.
+        """
+        name = self.manifest.get("rollup")
+        path = self.path.parent / name if name else None
+        if path is None or not path.exists():
+            return None
+        columns = ["t_max", "rows"]
+        for signal in signals:
+            columns += [f"{signal}.min", f"{signal}.max"]
+        with ColumnarLogReader(path) as reader:
+            return reader.read(columns, t_from, t_to)
+
+    @staticmethod
+    def _seek_offset(segment: dict[str, Any], t_from: float | None) -> int:
+        start = 0
+        if t_from is not None:
+            for offset, t_before in segment.get("seek") or ():
+                if t_before > t_from:
+                    break
+                start = offset
+        return start
+
+    def _open(self, segment: dict[str, Any], t_from: float | None, t_to: float | None) -> ColumnarLogReader | None:
+        path = self.path.parent / segment["file"]
+        if not path.exists():
+            return None
+        return ColumnarLogReader(path, start=self._seek_offset(segment, t_from), t_to=t_to)
+
+    def iter_chunks(
+        self, t_from: float | None = None, t_to: float | None = None
+    ) -> Iterator[tuple[LogSchema, dict[str, np.ndarray]]]:
+        for segment in self.segments_for(t_from, t_to):
+            reader = self._open(segment, t_from, t_to)
+            if reader is None:
+                continue
+            try:
+                yield from reader.iter_chunks(t_from, t_to)
+            finally:
+                reader.close()
+
+    def stream(self, t_from: float | None = None) -> Iterator[tuple[LogSchema, dict[str, np.ndarray]]]:
+        """Chunks from `t_from` (or the start) to the end, in time order, with bounded memory.
+
+        Unlike `iter_chunks`, no segment is inflated whole, so this suits
+        sequential playback of long sessions. The first chunk may still start
+        before `t_from`.
+        """
+        for segment in self.segments_for(t_from):
+            path = self.path.parent / segment["file"]
+            if not path.exists():
+                continue
+            for schema, columns in stream_chunks(path, self._seek_offset(segment, t_from)):
+                if t_from is not None and columns["t"][-1] < t_from:
+                    continue
+                yield schema, columns
+
+    def read(
+        self, signals: list[str] | None = None, t_from: float | None = None, t_to: float | None = None
+    ) -> dict[str, np.ndarray]:
+        names = self.signals if signals is None else list(signals)
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in ("t", "seq", "drop", *names)}
+        for segment in self.segments_for(t_from, t_to):
+            reader = self._open(segment, t_from, t_to)
+            if reader is None:
+                continue
+            with reader:
+                for name, column in reader.read(names, t_from, t_to).items():
+                    parts[name].append(column)
+        return _concat(parts)
+
+
+def stream_chunks(path: Path, start: int = 0) -> Iterator[tuple[LogSchema, dict[str, np.ndarray]]]:
+    """Yield one segment's (schema, columns) chunks in file order with bounded memory.
+
+    gzip segments are inflated block by block from compressed offset `start`
+    (0 or a seek point) and each chunk is copied out before the inflated
+    window is discarded; plain segments are read through the mmap reader.
+    """
+    path = Path(path)
+    if path.suffix != ".gz":
+        with ColumnarLogReader(path) as reader:
+            yield from reader.iter_chunks()
+        return
+
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS if start == 0 else -zlib.MAX_WBITS)
+    schemas: dict[int, LogSchema] = {}
+    buf = bytearray()
+    offset = 0
+    checked = start != 0
+    with path.open("rb") as fh:
+        fh.seek(start)
+        while not inflater.eof:
+            block = fh.read(_INFLATE_BLOCK)
+            if not block:
+                break
+            buf += inflater.decompress(block)
+            if not checked:
+                if len(buf) < len(MAGIC):
+                    continue
+                if buf[: len(MAGIC)] != MAGIC:
+                    raise ValueError(f"not a tlog file: {path}")
+                offset = len(MAGIC)
+                checked = True
+
+            while offset + RECORD_HEADER.size <= len(buf):
+                tag, length = RECORD_HEADER.unpack_from(buf, offset)
+                body = offset + RECORD_HEADER.size
+                end = body + length + _pad(length)
+                if end > len(buf):
+                    break
+                payload = bytes(buf[body : body + length])
+                offset = end
+                if tag == TAG_SCHEMA:
+                    schema = _parse_schema(payload)
+                    schemas[schema.id] = schema
+                elif tag == TAG_CHUNK:
+                    schema_id, rows, _, _ = CHUNK_HEADER.unpack_from(payload)
+                    schema = schemas[schema_id]
+                    yield schema, _chunk_views(payload, CHUNK_HEADER.size, rows, schema)
+            del buf[:offset]
+            offset = 0
+
+
+def open_log(path: Path) -> ColumnarLogReader | SessionLogReader:
+    """Reader for a `.manifest.json`, `.tlog` or `.tlog.gz` path."""
+    path = Path(path)
+    if path.name.endswith(".json"):
+        return SessionLogReader(path)
+    return ColumnarLogReader(path)
+
+
+def _text_column(column: np.ndarray, digits: int | None) -> np.ndarray:
+    if digits is not None:
+        column = np.round(column, digits)
+    # astype(str) keeps the shortest repr of the column's own dtype (float32 0.1 -> "0.1").
+    text = column.astype(str)
+    text[np.isnan(column)] = ""
+    return text
+
+
+def export_csv(reader: ColumnarLogReader | SessionLogReader, out: Any) -> int:
+    """Write the session as CSV (`server_t, seq, drop, <signals>`). Returns rows written.
+
+    Values are rounded to the schema's decimals; missing values are empty cells.
+    """
+    names = reader.signals
+    writer = csv.writer(out)
+    writer.writerow(["server_t", "seq", "drop", *names])
+    written = 0
+    for schema, columns in reader.iter_chunks():
+        rows = len(columns["t"])
+        decimals = dict(zip(schema.signals, schema.decimals))
+        empty = np.full(rows, "", dtype=object)
+        cells = [columns["t"].astype(str), columns["seq"].astype(str), columns["drop"].astype(str)]
+        for name in names:
+            column = columns.get(name)
+            cells.append(empty if column is None else _text_column(column, decimals.get(name)))
+        writer.writerows(zip(*(column.tolist() for column in cells)))
+        written += rows
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a columnar CAN log to CSV.")
+    parser.add_argument("log", type=Path, help=".manifest.json (whole session), .tlog or .tlog.gz")
+    parser.add_argument("-o", "--output", type=Path, help="CSV path (default: next to the input)")
+    args = parser.parse_args()
+
+    stem = args.log.name.split(".")[0]
+    output = args.output or args.log.with_name(f"{stem}.csv")
+    with open_log(args.log) as reader, output.open("w", newline="", encoding="utf-8") as fh:
+        rows = export_csv(reader, fh)
+    print(f"{rows} rows -> {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
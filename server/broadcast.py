@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import suppress
+from typing import Any
+
+from fastapi import WebSocket
+
+from codec import CODECS, JsonFrame, PackedFrame, encode_json
+
+log = logging.getLogger("broadcast")
+
+# Close code sent to clients evicted as slow consumers
+# (1013 = "try again later"; client backoff reconnects on its own).
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+OVERFLOW_POLICIES = ("drop_oldest", "latest", "disconnect")
+
+
+class ClientOutbox:
+    """Bounded per-client send queue drained by a dedicated writer task.
+
+    The producer only calls `offer()`, which never awaits. When the queue is
+    full the overflow policy decides what happens:
+      - `drop_oldest`: discard the oldest queued frame
+      - `latest`: discard everything queued and keep only the newest frame
+      - `disconnect`: close the client
+    Control messages (pong, notices, backfill) bypass the bound and are never
+    dropped. After `hold()` frames queue without the bound until `start()`,
+    so a joining client's backfill can go out ahead of them without a seq gap.
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        maxsize: int,
+        policy: str,
+        send_timeout: float,
+        codec: str = "json",
+    ) -> None:
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {policy}")
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec: {codec}")
+        self.ws = ws
+        self.codec = codec
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.send_timeout = send_timeout
+
+        self.dropped = 0
+        self.sent = 0
+        self.closed = False
+
+        self._frames: deque[JsonFrame | PackedFrame] = deque()
+        self._control: deque[str | bytes] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._held = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def hold(self) -> None:
+        """Keep every offered frame until `start()` (used while a backfill is built)."""
+        self._held = True
+
+    def start(self) -> None:
+        self._held = False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def offer(self, frame: JsonFrame | PackedFrame) -> bool:
+        """Queue a frame. Returns False if the client must be disconnected."""
+        if self.closed:
+            return False
+
+        if len(self._frames) >= self.maxsize and not self._held:
+            if self.policy == "disconnect":
+                self.closed = True
+                self._wakeup.set()
+                return False
+            if self.policy == "latest":
+                self.dropped += len(self._frames)
+                self._frames.clear()
+            else:
+                self._frames.popleft()
+                self.dropped += 1
+
+        self._frames.append(frame)
+        self._wakeup.set()
+        return True
+
+    def send_control(self, message: dict[str, Any] | bytes) -> None:
+        """Queue a control message: a JSON object, or a prebuilt binary message."""
+        if self.closed:
+            return
+        self._control.append(message if isinstance(message, bytes) else encode_json(message))
+        self._wakeup.set()
+
+    async def aclose(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                if not self._control and not self._frames:
+                    if self.closed:
+                        break
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                if self.closed:
+                    break
+
+                if self._control:
+                    data: str | bytes = self._control.popleft()
+                else:
+                    frame = self._frames.popleft()
+                    data = frame.render(len(self._frames), self.dropped)
+
+                if isinstance(data, bytes):
+                    send = self.ws.send_bytes(data)
+                else:
+                    send = self.ws.send_text(data)
+                await asyncio.wait_for(send, self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log.info("ws writer stopped: %s", exc)
+        finally:
+            self.closed = True
+
+
+async def close_quietly(ws: WebSocket, code: int = SLOW_CLIENT_CLOSE_CODE) -> None:
+    with suppress(Exception):
+        await ws.close(code=code)
@@ -1,18 +1,56 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from .base import CANSource
+from .bridge import BridgeCANSource
 from .dummy import DummyCANSource
+from .replay import ReplayCANSource
+from .socketcan import SocketCANSource
+
+if TYPE_CHECKING:
+    from config import Settings
 
 
-def create_can_source(kind: str) -> CANSource:
+def create_can_source(kind: str, settings: Settings | None = None) -> CANSource:
     normalized = kind.strip().lower()
     if normalized == "dummy":
         return DummyCANSource()
+    if normalized == "replay":
+        if settings is None or settings.replay_manifest is None:
+            raise ValueError("CAN_SOURCE='replay' requires REPLAY_SESSION (session id or manifest path).")
+        source = ReplayCANSource(
+            settings.replay_manifest, speed=settings.replay_speed, loop=settings.replay_loop
+        )
+        if settings.replay_start:
+            source.start = source.t_min + settings.replay_start
+            source.seek(source.start)
+        return source
+    if normalized == "bridge":
+        if settings is None:
+            return BridgeCANSource()
+        return BridgeCANSource(
+            settings.bridge_host,
+            settings.bridge_port,
+            transport=settings.bridge_transport,
+            signals=settings.bridge_signals,
+        )
+    if normalized == "socketcan":
+        if settings is None or settings.dbc_file is None:
+            raise ValueError("CAN_SOURCE='socketcan' requires DBC_FILE.")
+        return SocketCANSource(settings.socketcan_channel, settings.dbc_file)
 
     raise ValueError(
-        f"Unsupported CAN_SOURCE='{kind}'. Only 'dummy' is bundled in MVP. "
+        f"Unsupported CAN_SOURCE='{kind}'. Bundled sources: 'dummy', 'replay', 'bridge', 'socketcan'. "
         "See can_source/adapters.md for integration options."
     )
 
 
-__all__ = ["CANSource", "DummyCANSource", "create_can_source"]
+__all__ = [
+    "BridgeCANSource",
+    "CANSource",
+    "DummyCANSource",
+    "ReplayCANSource",
+    "SocketCANSource",
+    "create_can_source",
+]
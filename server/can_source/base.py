@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Any
 
 
 class CANSource(ABC):
@@ -8,5 +9,18 @@ class CANSource(ABC):
 
     @abstractmethod
     def next_frame(self) -> dict[str, float]:
-        """Return the next signal snapshot used in WS payload `sig` field."""
+        """Return the next signal snapshot used in WS payload `sig` field.
+
+        Called on the acquisition thread, so it may block on hardware reads.
+        """
         raise NotImplementedError
+
+    async def start(self) -> None:
+        """Open receivers (sockets, buses) on the server's event loop. Called once at startup."""
+
+    async def stop(self) -> None:
+        """Release what `start()` opened. Called once at shutdown."""
+
+    def stats(self) -> dict[str, Any]:
+        """Source-specific counters for `GET /api/stats/source`."""
+        return {}
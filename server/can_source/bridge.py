@@ -0,0 +1,302 @@
+"""UDP/TCP bridge source (adapters.md option A: CANoe -> UDP/TCP -> server).
+
+Senders push records in either of two formats; both may be mixed on one socket.
+
+JSON line (UTF-8, newline-terminated; a UDP datagram may carry several):
+
+    {"seq": 42, "sig": {"ws_fl": 51.2, "yaw": -3.0}}
+
+Binary record (little-endian; one or more back to back):
+
+    b"CB"  u16 count  u32 seq  then `count` x (u16 slot, f32 value)
+
+`slot` indexes the bridge's signal table (`BRIDGE_SIGNALS`, in order). `seq`
+is a per-sender packet counter; gaps are counted as lost packets. JSON `seq`
+is optional.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import socket
+import struct
+import time
+from typing import Any
+
+from .base import CANSource
+
+log = logging.getLogger("telemetry-server")
+
+BINARY_MAGIC = b"CB"
+BINARY_HEADER = struct.Struct("<2sHI")
+BINARY_ITEM = struct.Struct("<Hf")
+TRANSPORTS = ("udp", "tcp")
+RECEIVE_BUFFER = 4 * 1024 * 1024
+# Signal table used when BRIDGE_SIGNALS is not set (adapters.md recommended keys).
+DEFAULT_SIGNALS = ("ws_fl", "ws_fr", "ws_rl", "ws_rr", "yaw", "ax", "ay")
+# Slots are u16 on the wire; JSON senders cannot grow the table past this.
+MAX_SLOTS = 0xFFFF
+
+
+def encode_binary(seq: int, items: list[tuple[int, float]]) -> bytes:
+    """One binary record; `items` are (slot, value) pairs."""
+    return BINARY_HEADER.pack(BINARY_MAGIC, len(items), seq & 0xFFFFFFFF) + b"".join(
+        BINARY_ITEM.pack(slot, value) for slot, value in items
+    )
+
+
+class BridgeCANSource(CANSource):
+    """Receives pushed signal records and serves the latest value of each signal.
+
+    The receiver runs on the event loop (asyncio datagram or stream protocol)
+    and writes each value into its slot of preallocated per-slot arrays,
+    bumping `version`. `next_frame()` never waits on the network: it returns
+    the snapshot dict built for the current `version`, rebuilt only after
+    new values arrived. The dict is shared until then and must not be
+    mutated (`SignalMapper.apply` builds a new one).
+    `stats()` reports per-signal age, update and loss counts; packets lost in
+    a sequence gap are charged to the signals of the packet after the gap.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 5005,
+        transport: str = "udp",
+        signals: tuple[str, ...] = DEFAULT_SIGNALS,
+        clock: Any = time.perf_counter,
+    ) -> None:
+        if transport not in TRANSPORTS:
+            raise ValueError(f"transport must be one of: {', '.join(TRANSPORTS)}")
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self._clock = clock
+        self.names: list[str] = []
+        self._slots: dict[str, int] = {}
+        self._values: list[float] = []
+        self._received: list[float] = []
+        self._updates: list[int] = []
+        self._lost: list[int] = []
+        for name in signals:
+            self._slot(name)
+        # Slots that have had a value, in first-update order.
+        self._present: list[int] = []
+        self.version = 0
+        self._snapshot: dict[str, float] = {}
+        self._snapshot_version = 0
+        self._last_seq: dict[Any, int] = {}
+        self.packets = 0
+        self.bytes = 0
+        self.lost = 0
+        self.reordered = 0
+        self.errors = 0
+        self.unknown = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._endpoint: asyncio.DatagramTransport | None = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.transport == "udp":
+            self._endpoint, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), local_addr=(self.host, self.port)
+            )
+            sock = self._endpoint.get_extra_info("socket")
+            # Absorb bursts while the event loop is busy (e.g. a broadcast tick).
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+            self.port = self._endpoint.get_extra_info("sockname")[1]
+        else:
+            self._server = await loop.create_server(lambda: _StreamProtocol(self), self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        log.info("can bridge listening: %s://%s:%d", self.transport, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._endpoint is not None:
+            self._endpoint.close()
+            self._endpoint = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def next_frame(self) -> dict[str, float]:
+        version = self.version
+        if version != self._snapshot_version:
+            # Read `version` first: an update racing the rebuild only causes
+            # one more rebuild on the next call.
+            names, values = self.names, self._values
+            self._snapshot = {names[slot]: values[slot] for slot in self._present}
+            self._snapshot_version = version
+        return self._snapshot
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        signals = {
+            name: {
+                "age_ms": round((now - self._received[slot]) * 1000.0, 1)
+                if self._updates[slot]
+                else None,
+                "updates": self._updates[slot],
+                "lost": self._lost[slot],
+            }
+            for name, slot in self._slots.items()
+        }
+        return {
+            "transport": self.transport,
+            "port": self.port,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "lost": self.lost,
+            "reordered": self.reordered,
+            "errors": self.errors,
+            "unknown": self.unknown,
+            "signals": signals,
+        }
+
+    def feed(self, data: bytes | bytearray, peer: Any = None) -> int:
+        """Parse complete records from `data`; returns the number of bytes consumed."""
+        offset = 0
+        size = len(data)
+        while offset < size:
+            first = data[offset]
+            if first in b" \r\n\t":
+                offset += 1
+            elif first == 0x7B:  # "{"
+                end = data.find(b"\n", offset)
+                if end < 0:
+                    break
+                self._feed_json(data[offset:end], peer)
+                offset = end + 1
+            elif data[offset : offset + 2] == BINARY_MAGIC:
+                if offset + BINARY_HEADER.size > size:
+                    break
+                _, count, seq = BINARY_HEADER.unpack_from(data, offset)
+                body = offset + BINARY_HEADER.size
+                end = body + count * BINARY_ITEM.size
+                if end > size:
+                    break
+                self._feed_binary(data[body:end], seq, peer)
+                offset = end
+            else:
+                # Unframed garbage: drop the rest of this datagram / up to the next line.
+                self.errors += 1
+                end = data.find(b"\n", offset)
+                offset = size if end < 0 else end + 1
+        return offset
+
+    def _slot(self, name: str) -> int | None:
+        slot = self._slots.get(name)
+        if slot is None:
+            if len(self.names) >= MAX_SLOTS:
+                return None
+            slot = len(self.names)
+            self._slots[name] = slot
+            self.names.append(name)
+            self._values.append(0.0)
+            self._received.append(0.0)
+            self._updates.append(0)
+            self._lost.append(0)
+        return slot
+
+    def _sequence(self, seq: int, peer: Any) -> int:
+        """Count a packet and return how many packets were lost just before it."""
+        self.packets += 1
+        last = self._last_seq.get(peer)
+        self._last_seq[peer] = seq
+        if last is None:
+            return 0
+        gap = (seq - last - 1) & 0xFFFFFFFF
+        if gap >= 0x80000000:
+            # Duplicate, late or restarted sender.
+            self.reordered += 1
+            return 0
+        self.lost += gap
+        return gap
+
+    def _update(self, slot: int, value: float, now: float, gap: int) -> None:
+        self._values[slot] = value
+        self._received[slot] = now
+        if not self._updates[slot]:
+            self._present.append(slot)
+        self._updates[slot] += 1
+        self.version += 1
+        self._lost[slot] += gap
+
+    def _feed_json(self, line: bytes | bytearray, peer: Any) -> None:
+        try:
+            record = json.loads(line)
+            sig = record["sig"]
+            seq = record.get("seq")
+            seq = None if seq is None else int(seq)
+            items = [(str(name), float(value)) for name, value in sig.items() if value is not None]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            self.errors += 1
+            return
+        if seq is None:
+            self.packets += 1
+            gap = 0
+        else:
+            gap = self._sequence(seq, peer)
+        now = self._clock()
+        for name, value in items:
+            slot = self._slot(name)
+            if slot is None:
+                self.unknown += 1
+            elif math.isfinite(value):
+                self._update(slot, value, now, gap)
+
+    def _feed_binary(self, body: bytes | bytearray, seq: int, peer: Any) -> None:
+        gap = self._sequence(seq, peer)
+        now = self._clock()
+        slots = len(self.names)
+        for slot, value in BINARY_ITEM.iter_unpack(body):
+            if slot >= slots:
+                self.unknown += 1
+            elif math.isfinite(value):
+                self._update(slot, value, now, gap)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, bridge: BridgeCANSource) -> None:
+        self.bridge = bridge
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self.bridge.bytes += len(data)
+        if self.bridge.feed(data, addr) < len(data):
+            # Datagrams carry whole records; a truncated tail cannot complete later.
+            self.bridge.errors += 1
+
+
+class _StreamProtocol(asyncio.Protocol):
+    # A sender that never terminates a record is cut off past this much buffering.
+    MAX_BUFFER = 1 << 20
+
+    def __init__(self, bridge: BridgeCANSource) -> None:
+        self.bridge = bridge
+        self.buffer = bytearray()
+        self.peer: Any = None
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        self.peer = transport.get_extra_info("peername")
+
+    def data_received(self, data: bytes) -> None:
+        self.bridge.bytes += len(data)
+        if self.buffer:
+            self.buffer += data
+            consumed = self.bridge.feed(self.buffer, self.peer)
+            del self.buffer[:consumed]
+        else:
+            consumed = self.bridge.feed(data, self.peer)
+            if consumed < len(data):
+                self.buffer += data[consumed:]
+        if len(self.buffer) > self.MAX_BUFFER and self.transport is not None:
+            self.bridge.errors += 1
+            self.transport.close()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.bridge._last_seq.pop(self.peer, None)
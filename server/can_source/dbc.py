@@ -0,0 +1,207 @@
+"""Minimal DBC reader compiled into per-arbitration-ID decoders.
+
+Only what decoding needs is read: `BO_` messages, their `SG_` signals
+(Intel/Motorola byte order, signed/unsigned, scale/offset, simple
+multiplexing) and `SIG_VALTYPE_` float signals. Comments, value tables and
+attributes are ignored.
+
+`compile_dbc()` turns every message into a `MessageDecoder` whose plan is a
+tuple of precomputed (shift, mask, sign bit, scale, offset) entries against
+the frame read once as a little- and/or big-endian integer, so decoding a
+frame never looks at the DBC again.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# DBC marks 29-bit identifiers with bit 31, the same bit SocketCAN uses (CAN_EFF_FLAG).
+EXTENDED_FLAG = 0x80000000
+
+_MESSAGE = re.compile(r"^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)")
+_SIGNAL = re.compile(
+    r"^SG_\s+(\w+)\s*(M|m\d+)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*"
+    r"\(\s*([^,\s]+)\s*,\s*([^)\s]+)\s*\)\s*\[\s*([^|\s]*)\s*\|\s*([^\]\s]*)\s*\]\s*\"([^\"]*)\""
+)
+_VALTYPE = re.compile(r"^SIG_VALTYPE_\s+(\d+)\s+(\w+)\s*:\s*([12])\s*;")
+
+# Plan entry kinds.
+_INT, _FLOAT32, _FLOAT64 = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class DbcSignal:
+    name: str
+    start: int
+    length: int
+    little_endian: bool
+    signed: bool
+    scale: float
+    offset: float
+    minimum: float | None
+    maximum: float | None
+    unit: str
+    # "M" for the multiplexor switch, the switch value for multiplexed signals.
+    multiplexer: str | int | None = None
+    # 0 integer, 1 IEEE float32, 2 IEEE float64 (SIG_VALTYPE_).
+    value_type: int = _INT
+
+
+@dataclass
+class DbcMessage:
+    frame_id: int
+    name: str
+    length: int
+    signals: list[DbcSignal] = field(default_factory=list)
+
+
+def _number(text: str) -> float | None:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_dbc(text: str) -> list[DbcMessage]:
+    messages: dict[int, DbcMessage] = {}
+    current: DbcMessage | None = None
+    value_types: dict[tuple[int, str], int] = {}
+    for raw in text.splitlines():
+        line = raw.strip()
+        if line.startswith("BO_ "):
+            match = _MESSAGE.match(line)
+            if match is None:
+                raise ValueError(f"invalid DBC message line: {line}")
+            frame_id, name, length = match.groups()
+            current = DbcMessage(int(frame_id), name, int(length))
+            messages[current.frame_id] = current
+        elif line.startswith("SG_ "):
+            match = _SIGNAL.match(line)
+            if match is None or current is None:
+                raise ValueError(f"invalid DBC signal line: {line}")
+            name, mux, start, length, order, sign, scale, offset, low, high, unit = match.groups()
+            multiplexer: str | int | None = None
+            if mux == "M":
+                multiplexer = "M"
+            elif mux:
+                multiplexer = int(mux[1:])
+            current.signals.append(
+                DbcSignal(
+                    name=name,
+                    start=int(start),
+                    length=int(length),
+                    little_endian=order == "1",
+                    signed=sign == "-",
+                    scale=float(scale),
+                    offset=float(offset),
+                    minimum=_number(low),
+                    maximum=_number(high),
+                    unit=unit,
+                    multiplexer=multiplexer,
+                )
+            )
+        elif line.startswith("SIG_VALTYPE_ "):
+            match = _VALTYPE.match(line)
+            if match is not None:
+                value_types[(int(match.group(1)), match.group(2))] = int(match.group(3))
+
+    for (frame_id, name), value_type in value_types.items():
+        message = messages.get(frame_id)
+        if message is None:
+            continue
+        message.signals = [
+            DbcSignal(**{**signal.__dict__, "value_type": value_type}) if signal.name == name else signal
+            for signal in message.signals
+        ]
+    return list(messages.values())
+
+
+def load_dbc(path: Path) -> list[DbcMessage]:
+    # DBC files from Vector tools are often cp1252; names and numbers are ASCII either way.
+    return parse_dbc(Path(path).read_text(encoding="utf-8", errors="replace"))
+
+
+def _plan_entry(signal: DbcSignal, length: int) -> tuple[Any, ...]:
+    bits = signal.length
+    if signal.little_endian:
+        shift = signal.start
+    else:
+        # Motorola: `start` is the MSB in sawtooth numbering; convert to a
+        # shift against the frame read as one big-endian integer.
+        msb = (signal.start // 8) * 8 + (7 - signal.start % 8)
+        shift = length * 8 - msb - bits
+    if shift < 0 or shift + bits > length * 8:
+        raise ValueError(f"signal {signal.name} does not fit in {length} bytes")
+    kind = signal.value_type
+    sign = 1 << (bits - 1) if signal.signed and kind == _INT else 0
+    return (
+        signal.name,
+        not signal.little_endian,
+        shift,
+        (1 << bits) - 1,
+        sign,
+        signal.scale,
+        signal.offset,
+        kind,
+    )
+
+
+_F32 = struct.Struct("<f")
+_F64 = struct.Struct("<d")
+
+
+class MessageDecoder:
+    """Decodes one message's signals from a frame payload into a dict."""
+
+    __slots__ = ("name", "length", "plain", "switch", "muxed", "_little", "_big")
+
+    def __init__(self, message: DbcMessage) -> None:
+        self.name = message.name
+        self.length = message.length
+        plain: list[tuple[Any, ...]] = []
+        muxed: dict[int, list[tuple[Any, ...]]] = {}
+        self.switch: tuple[Any, ...] | None = None
+        for signal in message.signals:
+            entry = _plan_entry(signal, message.length)
+            if signal.multiplexer == "M":
+                self.switch = entry
+                plain.append(entry)
+            elif isinstance(signal.multiplexer, int):
+                muxed.setdefault(signal.multiplexer, []).append(entry)
+            else:
+                plain.append(entry)
+        self.plain = tuple(plain)
+        self.muxed = {value: tuple(plain + entries) for value, entries in muxed.items()}
+        entries = [*plain, *(entry for group in muxed.values() for entry in group)]
+        self._little = any(not entry[1] for entry in entries)
+        self._big = any(entry[1] for entry in entries)
+
+    def decode(self, data: bytes, out: dict[str, float]) -> None:
+        if len(data) != self.length:
+            data = data[: self.length].ljust(self.length, b"\0")
+        little = int.from_bytes(data, "little") if self._little else 0
+        big = int.from_bytes(data, "big") if self._big else 0
+
+        plan = self.plain
+        if self.switch is not None:
+            _, is_big, shift, mask, _, _, _, _ = self.switch
+            plan = self.muxed.get(((big if is_big else little) >> shift) & mask, self.plain)
+
+        for name, is_big, shift, mask, sign, scale, offset, kind in plan:
+            raw = ((big if is_big else little) >> shift) & mask
+            if kind == _INT:
+                value = raw - (sign << 1) if raw & sign else raw
+            elif kind == _FLOAT32:
+                value = _F32.unpack(raw.to_bytes(4, "little"))[0]
+            else:
+                value = _F64.unpack(raw.to_bytes(8, "little"))[0]
+            out[name] = value * scale + offset
+
+
+def compile_dbc(messages: list[DbcMessage]) -> dict[int, MessageDecoder]:
+    """Decoders keyed by SocketCAN id (29-bit ids carry EXTENDED_FLAG)."""
+    return {message.frame_id: MessageDecoder(message) for message in messages if message.signals}
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from binlog import LogSchema, SessionLogReader
+
+from .base import CANSource
+
+
+class ReplayCANSource(CANSource):
+    """Plays a logged session (`can_<session>.manifest.json`) back as live frames.
+
+    Rows are streamed chunk by chunk (`SessionLogReader.stream`), so memory
+    stays bounded on multi-GB sessions. With `speed > 0` each call returns the
+    latest logged row at `speed` times the recorded pace: rows are held when
+    the server acquires faster than the log and skipped when it acquires
+    slower. `speed <= 0` returns the next row on every call (as fast as the
+    acquisition loop runs). At the end the log restarts from `start` when
+    `loop` is set, otherwise the last row is held.
+
+    `seek(t)` jumps to an epoch timestamp using the manifest's segment time
+    ranges and gzip seek points; it is applied on the next `next_frame()`.
+    Logged values are already mapped, so pair this source with identity
+    scales in SIGNALS_CONFIG (the bundled signals.json is).
+    """
+
+    def __init__(
+        self,
+        manifest: Path,
+        speed: float = 1.0,
+        loop: bool = True,
+        start: float | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.reader = SessionLogReader(manifest)
+        ranges = [s for s in self.reader.segments if s.get("t_min") is not None]
+        if not ranges:
+            raise ValueError(f"no logged CAN rows in {manifest}")
+        self.t_min = min(s["t_min"] for s in ranges)
+        self.t_max = max(s["t_max"] for s in ranges)
+        self.speed = speed
+        self.loop = loop
+        self.start = start
+        self.loops = 0
+        self._clock = clock
+        self._seek_to: float | None = None
+        self._frame: dict[str, float] = {}
+        self._position: float | None = None
+        self._restart(start)
+
+    @property
+    def position(self) -> float | None:
+        """Logged timestamp of the row currently played, None before the first frame."""
+        return self._position
+
+    def seek(self, t: float) -> None:
+        self._seek_to = min(max(t, self.t_min), self.t_max)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "manifest": self.reader.path.name,
+            "speed": self.speed,
+            "loop": self.loop,
+            "loops": self.loops,
+            "t": self.position,
+            "t_min": self.t_min,
+            "t_max": self.t_max,
+        }
+
+    def next_frame(self) -> dict[str, float]:
+        if self._seek_to is not None:
+            self._restart(self._seek_to)
+            self._seek_to = None
+
+        now = self._clock()
+        target = None
+        if self.speed > 0 and self._origin is not None:
+            t0, wall0 = self._origin
+            target = t0 + (now - wall0) * self.speed
+
+        if not self._advance(target) and self.loop:
+            self.loops += 1
+            self._restart(self.start)
+            self._advance(None)
+        if self._origin is None and self._position is not None:
+            self._origin = (self._position, now)
+        return dict(self._frame)
+
+    def _restart(self, t_from: float | None) -> None:
+        self._chunks: Iterator[tuple[LogSchema, dict[str, np.ndarray]]] = self.reader.stream(t_from)
+        self._skip_before = t_from
+        self._t = np.empty(0)
+        self._values: list[tuple[str, np.ndarray]] = []
+        self._index = -1
+        self._origin: tuple[float, float] | None = None
+
+    def _load_next(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        schema, columns = chunk
+        self._t = columns["t"]
+        self._values = [(name, columns[name]) for name in schema.signals]
+        self._index = -1
+        if self._skip_before is not None:
+            self._index = int(np.searchsorted(self._t, self._skip_before, side="left")) - 1
+            self._skip_before = None
+        return True
+
+    def _advance(self, target: float | None) -> bool:
+        """Move to the next row (`target` None) or the last row at or before `target`.
+
+        False once the log is exhausted; the current frame is kept.
+        """
+        while True:
+            last = len(self._t) - 1
+            if target is None:
+                if self._index < last:
+                    self._index += 1
+                    self._take(self._index)
+                    return True
+            else:
+                index = min(int(np.searchsorted(self._t, target, side="right")) - 1, last)
+                if index > self._index:
+                    self._index = index
+                    self._take(index)
+                if index < last:
+                    return True
+            if not self._load_next():
+                return False
+
+    def _take(self, index: int) -> None:
+        row: dict[str, float] = {}
+        for name, values in self._values:
+            value = float(values[index])
+            if not math.isnan(value):
+                row[name] = value
+        self._frame = row
+        self._position = float(self._t[index])
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          TEXT PRIMARY KEY,
+    started     REAL NOT NULL,
+    ended       REAL NOT NULL,
+    closed      INTEGER NOT NULL DEFAULT 0,
+    can_rows    INTEGER NOT NULL DEFAULT 0,
+    gps_rows    INTEGER NOT NULL DEFAULT 0,
+    event_rows  INTEGER NOT NULL DEFAULT 0,
+    mark_count  INTEGER NOT NULL DEFAULT 0,
+    can_t_min   REAL,
+    can_t_max   REAL,
+    signals     TEXT NOT NULL DEFAULT '[]',
+    files       TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE INDEX IF NOT EXISTS sessions_duration ON sessions ((ended - started));
+"""
+
+_COLUMNS = (
+    "id",
+    "started",
+    "ended",
+    "closed",
+    "can_rows",
+    "gps_rows",
+    "event_rows",
+    "mark_count",
+    "can_t_min",
+    "can_t_max",
+    "signals",
+    "files",
+)
+_JSON_COLUMNS = ("signals", "files")
+_DEFAULTS: dict[str, Any] = {
+    "closed": False,
+    "can_rows": 0,
+    "gps_rows": 0,
+    "event_rows": 0,
+    "mark_count": 0,
+    "signals": [],
+    "files": {},
+}
+
+
+class SessionCatalog:
+    """SQLite index of logged sessions (one row per session).
+
+    The session logger upserts its own row while it writes; API handlers query
+    it. One connection is shared behind a lock; WAL mode keeps the writer's
+    commits from blocking readers on other processes (e.g. analysis scripts).
+    `files` holds paths relative to the catalog's directory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, record: dict[str, Any]) -> None:
+        record = {**_DEFAULTS, **record}
+        values = [
+            json.dumps(record[name], ensure_ascii=False) if name in _JSON_COLUMNS else record.get(name)
+            for name in _COLUMNS
+        ]
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in _COLUMNS if name != "id")
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO sessions ({', '.join(_COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                values,
+            )
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return _to_dict(row) if row is not None else None
+
+    def list(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Sessions overlapping [since, until] (epoch seconds), newest first, plus the total match count."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if since is not None:
+            clauses.append("ended >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("started <= ?")
+            params.append(until)
+        if min_duration is not None:
+            clauses.append("(ended - started) >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            clauses.append("(ended - started) <= ?")
+            params.append(max_duration)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM sessions {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM sessions {where} ORDER BY started DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return [_to_dict(row) for row in rows], int(total)
+
+
+def _to_dict(row: sqlite3.Row) -> dict[str, Any]:
+    record = dict(row)
+    for name in _JSON_COLUMNS:
+        record[name] = json.loads(record[name])
+    record["closed"] = bool(record["closed"])
+    record["duration"] = record["ended"] - record["started"]
+    return record
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import struct
+from typing import Any
+
+CODECS = ("json", "values", "packed")
+# Codecs whose frames are positional and need a `schema` message first.
+SCHEMA_CODECS = ("values", "packed")
+
+SchemaField = tuple[str, str | None, int | None]
+
+# Schema ids are unique across all schemas in the process, so a client that
+# switches to another subscription can never mistake an old frame for a new one.
+# They travel as u16 and wrap after 65535 changes; 0 means "no schema" and is
+# never issued.
+_schema_ids = itertools.count(1)
+
+
+def _next_schema_id() -> int:
+    return (next(_schema_ids) - 1) % 0xFFFF + 1
+
+
+# Packed binary frame (little-endian), sent as a WS binary message:
+#   u8  version (1)
+#   u8  kind (1 = frame)
+#   u16 schema id (matches the last `schema` text message)
+#   u32 seq
+#   u32 drop
+#   f64 t (server epoch seconds)
+#   u32 qdepth (receiving client's outbox depth)
+#   u32 qdrop (receiving client's outbox drop count)
+#   f32 values[n] in schema order, NaN = missing
+#
+# Packed batch (kind = 2) uses the same header with seq/t of the last sample,
+# followed by:
+#   u32 count
+#   u32 seq[count]
+#   f64 t[count]
+#   f32 values[count][n] row-major in schema order
+PACKED_VERSION = 1
+PACKED_KIND_FRAME = 1
+PACKED_KIND_BATCH = 2
+PACKED_HEADER = struct.Struct("<BBHIIdII")
+# Largest finite float32; `struct` raises OverflowError beyond it.
+F32_MAX = 3.4028234663852886e38
+
+
+def encode_json(message: dict[str, Any]) -> str:
+    """Serialize a message once, using the same compact form as `send_json`."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class FrameSchema:
+    """Ordered signal fields shared by positional codecs.
+
+    `update()` bumps `id` whenever names, units or decimals change, so clients
+    can tell which schema a positional frame was encoded against.
+    """
+
+    def __init__(self) -> None:
+        self.id = 0
+        self.fields: tuple[SchemaField, ...] = ()
+        self.names: tuple[str, ...] = ()
+        self._values = struct.Struct("<0f")
+
+    def update(self, fields: tuple[SchemaField, ...]) -> bool:
+        if fields is self.fields or fields == self.fields:
+            return False
+        self.id = _next_schema_id()
+        self.fields = fields
+        self.names = tuple(field[0] for field in fields)
+        self._values = struct.Struct(f"<{len(fields)}f")
+        return True
+
+    def message(self) -> dict[str, Any]:
+        return {
+            "v": 1,
+            "type": "schema",
+            "id": self.id,
+            "signals": list(self.names),
+            "units": [field[1] for field in self.fields],
+            "decimals": [field[2] for field in self.fields],
+        }
+
+    def values(self, sig: dict[str, float]) -> list[float | None]:
+        return [sig.get(name) for name in self.names]
+
+    def pack_values(self, sig: dict[str, float]) -> bytes:
+        nan = math.nan
+        return self._values.pack(*[_f32(sig.get(name, nan)) for name in self.names])
+
+    def pack_rows(self, sigs: list[dict[str, float]]) -> bytes:
+        nan = math.nan
+        names = self.names
+        flat = [_f32(sig.get(name, nan)) for sig in sigs for name in names]
+        return struct.pack(f"<{len(flat)}f", *flat)
+
+
+def _f32(value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    # Out of float32 range saturates to +-inf, as a C float cast would.
+    if value > F32_MAX or value < -F32_MAX:
+        return math.copysign(math.inf, value)
+    return value
+
+
+class JsonFrame:
+    """A frame encoded once per tick as JSON text and shared by every outbox.
+
+    The `status` block is kept as the last key so per-client queue stats can be
+    appended with a string splice at send time instead of re-serializing.
+    """
+
+    __slots__ = ("_head", "_text")
+
+    def __init__(self, frame: dict[str, Any]) -> None:
+        status = frame.get("status")
+        if isinstance(status, dict) and status:
+            body = {key: value for key, value in frame.items() if key != "status"}
+            body["status"] = status
+            # Encoded form ends with "}}" (status object, then frame object).
+            self._head: str | None = encode_json(body)[:-2]
+            self._text = ""
+        else:
+            self._head = None
+            self._text = encode_json(frame)
+
+    def render(self, qdepth: int, qdrop: int) -> str:
+        if self._head is None:
+            return self._text
+        return f'{self._head},"qdepth":{qdepth},"qdrop":{qdrop}}}}}'
+
+
+def values_frame(frame: dict[str, Any], schema: FrameSchema) -> JsonFrame:
+    """Values-only JSON frame: positional `val` array in schema order (null = missing)."""
+    return JsonFrame(
+        {
+            "v": 1,
+            "sid": schema.id,
+            "t": frame.get("t"),
+            "val": schema.values(frame.get("sig") or {}),
+            "status": frame.get("status") or {},
+        }
+    )
+
+
+def _batch_status(frames: list[dict[str, Any]]) -> dict[str, Any]:
+    first = frames[0].get("status") or {}
+    last = frames[-1].get("status") or {}
+    return {"seq": last.get("seq"), "seq0": first.get("seq"), "n": len(frames), "drop": last.get("drop")}
+
+
+def json_batch(frames: list[dict[str, Any]]) -> JsonFrame:
+    """Multi-sample JSON message with per-signal columns (null = missing)."""
+    names = dict.fromkeys(key for frame in frames for key in frame.get("sig") or {})
+    sigs = [frame.get("sig") or {} for frame in frames]
+    return JsonFrame(
+        {
+            "v": 1,
+            "type": "batch",
+            "seq": [(frame.get("status") or {}).get("seq") for frame in frames],
+            "t": [frame.get("t") for frame in frames],
+            "sig": {name: [sig.get(name) for sig in sigs] for name in names},
+            "status": _batch_status(frames),
+        }
+    )
+
+
+def values_batch(frames: list[dict[str, Any]], schema: FrameSchema) -> JsonFrame:
+    """Multi-sample values-only message: one positional row per sample."""
+    return JsonFrame(
+        {
+            "v": 1,
+            "type": "batch",
+            "sid": schema.id,
+            "seq": [(frame.get("status") or {}).get("seq") for frame in frames],
+            "t": [frame.get("t") for frame in frames],
+            "val": [schema.values(frame.get("sig") or {}) for frame in frames],
+            "status": _batch_status(frames),
+        }
+    )
+
+
+class PackedFrame:
+    """One or more samples packed once per tick as float32 values in schema order.
+
+    A single sample uses the plain frame layout; several use the batch layout.
+    Only the fixed-size header is packed per client.
+    """
+
+    __slots__ = ("_kind", "_schema_id", "_seq", "_drop", "_t", "_body")
+
+    def __init__(self, frames: dict[str, Any] | list[dict[str, Any]], schema: FrameSchema) -> None:
+        if isinstance(frames, dict):
+            frames = [frames]
+        last = frames[-1]
+        status = last.get("status") or {}
+        self._schema_id = schema.id
+        self._seq = int(status.get("seq", 0)) & 0xFFFFFFFF
+        self._drop = int(status.get("drop", 0)) & 0xFFFFFFFF
+        self._t = float(last.get("t") or 0.0)
+
+        if len(frames) == 1:
+            self._kind = PACKED_KIND_FRAME
+            self._body = schema.pack_values(last.get("sig") or {})
+            return
+
+        count = len(frames)
+        seqs = [int((frame.get("status") or {}).get("seq", 0)) & 0xFFFFFFFF for frame in frames]
+        times = [float(frame.get("t") or 0.0) for frame in frames]
+        self._kind = PACKED_KIND_BATCH
+        self._body = b"".join(
+            (
+                struct.pack(f"<I{count}I{count}d", count, *seqs, *times),
+                schema.pack_rows([frame.get("sig") or {} for frame in frames]),
+            )
+        )
+
+    def render(self, qdepth: int, qdrop: int) -> bytes:
+        header = PACKED_HEADER.pack(
+            PACKED_VERSION,
+            self._kind,
+            self._schema_id,
+            self._seq,
+            self._drop,
+            self._t,
+            min(qdepth, 0xFFFFFFFF),
+            min(qdrop, 0xFFFFFFFF),
+        )
+        return header + self._body
+
+
+def encode_frame(codec: str, frame: dict[str, Any], schema: FrameSchema) -> JsonFrame | PackedFrame:
+    if codec == "packed":
+        return PackedFrame(frame, schema)
+    if codec == "values":
+        return values_frame(frame, schema)
+    return JsonFrame(frame)
+
+
+def encode_batch(
+    codec: str, frames: list[dict[str, Any]], schema: FrameSchema
+) -> JsonFrame | PackedFrame:
+    """Encode samples acquired during one broadcast tick.
+
+    A single sample keeps the plain frame format so low-rate clients see no change.
+    """
+    if len(frames) == 1:
+        return encode_frame(codec, frames[0], schema)
+    if codec == "packed":
+        return PackedFrame(frames, schema)
+    if codec == "values":
+        return values_batch(frames, schema)
+    return json_batch(frames)
@@ -13,14 +13,48 @@ class Settings:
     host: str
     port: int
     can_hz: float
+    broadcast_hz: float
+    tick_policy: str
     simulate_drop_every: int
+    ws_send_timeout: float
+    ws_outbox_size: int
+    ws_overflow_policy: str
+    backfill_seconds: float
+    dedupe_window: float
+    dedupe_max_keys: int
     can_source: str
+    replay_manifest: Path | None
+    replay_speed: float
+    replay_loop: bool
+    replay_start: float
+    bridge_transport: str
+    bridge_host: str
+    bridge_port: int
+    bridge_signals: tuple[str, ...]
+    socketcan_channel: str
+    dbc_file: Path | None
     log_dir: Path
+    log_flush_interval: float
+    log_flush_bytes: int
+    can_log_dtype: str
+    log_compress: str
+    log_rotate_bytes: int
+    log_rotate_seconds: float
     signals_config: Path
+    signals_reload_interval: float
     ssl_certfile: str | None
     ssl_keyfile: str | None
     naver_maps_client_id: str | None
     naver_maps_client_secret: str | None
+    naver_geocode_hosts: tuple[str, ...]
+    geocode_cell_m: float
+    geocode_cache_size: int
+    geocode_cache_ttl: float
+    geocode_min_move_m: float
+    geocode_rate: float
+    geocode_burst: float
+    geocode_hedge_after: float
+    geocode_breaker_cooldown: float
 
 
 def _optional_env(name: str) -> str | None:
@@ -28,6 +62,38 @@ def _optional_env(name: str) -> str | None:
     return value if value else None
 
 
+def _choice_env(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = os.getenv(name, default).strip().lower()
+    if value not in choices:
+        raise ValueError(f"Unsupported {name}='{value}'. Expected one of: {', '.join(choices)}")
+    return value
+
+
+def _flag_env(name: str, default: bool) -> bool:
+    return _choice_env(name, "1" if default else "0", ("1", "0", "true", "false", "on", "off")) in ("1", "true", "on")
+
+
+def _replay_manifest(log_dir: Path) -> Path | None:
+    """REPLAY_SESSION: a session id under LOG_DIR or a path to a `can_*.manifest.json`."""
+    value = _optional_env("REPLAY_SESSION")
+    if value is None:
+        return None
+    if value.endswith(".json"):
+        return Path(value).expanduser().resolve()
+    return log_dir / f"can_{value}.manifest.json"
+
+
+def _geocode_hosts() -> tuple[str, ...]:
+    """NAVER_GEOCODE_HOSTS: comma-separated reverse-geocode endpoint URLs, tried in order."""
+    value = _optional_env("NAVER_GEOCODE_HOSTS")
+    if value is None:
+        return (
+            "https://maps.apigw.ntruss.com/map-reversegeocode/v2/gc",
+            "https://naveropenapi.apigw.ntruss.com/map-reversegeocode/v2/gc",
+        )
+    return tuple(url.strip() for url in value.split(",") if url.strip())
+
+
 def load_settings() -> Settings:
     signals_config_raw = os.getenv("SIGNALS_CONFIG")
     if signals_config_raw:
@@ -35,20 +101,78 @@ def load_settings() -> Settings:
     else:
         signals_config = BASE_DIR / "signals.json"
 
+    can_hz = float(os.getenv("CAN_HZ", "10"))
+    log_dir_raw = _optional_env("LOG_DIR")
+    log_dir = Path(log_dir_raw).expanduser().resolve() if log_dir_raw else BASE_DIR / "logs"
+    dbc_file_raw = _optional_env("DBC_FILE")
+    replay_speed = os.getenv("REPLAY_SPEED", "1").strip().lower()
+
     return Settings(
         # Conservative default: loopback only.
         # Expose to other devices only when HOST is explicitly set (e.g. 0.0.0.0 or LAN IP).
         host=os.getenv("HOST", "127.0.0.1"),
         port=int(os.getenv("PORT", "8080")),
-        can_hz=float(os.getenv("CAN_HZ", "10")),
+        can_hz=can_hz,
+        # Samples acquired between broadcasts are sent as one batch message.
+        broadcast_hz=float(os.getenv("BROADCAST_HZ", str(min(can_hz, 10.0)))),
+        # What the acquisition loop does after overrunning a tick (see scheduler.py).
+        tick_policy=_choice_env("TICK_POLICY", "skip", ("skip", "catchup", "stretch")),
         simulate_drop_every=int(os.getenv("SIM_DROP_EVERY", "0")),
+        ws_send_timeout=float(os.getenv("WS_SEND_TIMEOUT_MS", "2000")) / 1000.0,
+        ws_outbox_size=int(os.getenv("WS_OUTBOX_SIZE", "4")),
+        ws_overflow_policy=_choice_env(
+            "WS_OVERFLOW_POLICY", "latest", ("drop_oldest", "latest", "disconnect")
+        ),
+        # Recent samples kept for late-join backfill / resume (0 = off).
+        backfill_seconds=max(0.0, float(os.getenv("BACKFILL_S", "60"))),
+        # GPS uplink dedupe index: how long / how many (device, t, seq) keys are remembered.
+        dedupe_window=float(os.getenv("DEDUPE_WINDOW_H", "6")) * 3600.0,
+        dedupe_max_keys=int(os.getenv("DEDUPE_MAX_KEYS", "100000")),
         can_source=os.getenv("CAN_SOURCE", "dummy"),
-        log_dir=BASE_DIR / "logs",
+        replay_manifest=_replay_manifest(log_dir),
+        # "max" (or 0) replays one logged row per acquisition tick.
+        replay_speed=0.0 if replay_speed == "max" else float(replay_speed),
+        replay_loop=_flag_env("REPLAY_LOOP", True),
+        replay_start=float(os.getenv("REPLAY_START_S", "0")),
+        bridge_transport=_choice_env("BRIDGE_TRANSPORT", "udp", ("udp", "tcp")),
+        # Loopback by default, like HOST: CANoe usually runs on the same PC.
+        bridge_host=os.getenv("BRIDGE_HOST", "127.0.0.1"),
+        bridge_port=int(os.getenv("BRIDGE_PORT", "5005")),
+        # Binary-record slot table, in order; JSON senders may add names beyond it.
+        bridge_signals=tuple(
+            name.strip()
+            for name in os.getenv("BRIDGE_SIGNALS", "ws_fl,ws_fr,ws_rl,ws_rr,yaw,ax,ay").split(",")
+            if name.strip()
+        ),
+        socketcan_channel=os.getenv("SOCKETCAN_CHANNEL", "can0"),
+        dbc_file=Path(dbc_file_raw).expanduser().resolve() if dbc_file_raw else None,
+        log_dir=log_dir,
+        log_flush_interval=float(os.getenv("LOG_FLUSH_MS", "200")) / 1000.0,
+        log_flush_bytes=int(float(os.getenv("LOG_FLUSH_KB", "64")) * 1024),
+        can_log_dtype=_choice_env("CAN_LOG_DTYPE", "float32", ("float32", "float64")),
+        log_compress=_choice_env("LOG_COMPRESS", "gzip", ("gzip", "none")),
+        # CAN log segment limits; 0 disables the limit.
+        log_rotate_bytes=int(float(os.getenv("LOG_ROTATE_MB", "256")) * 1024 * 1024),
+        log_rotate_seconds=float(os.getenv("LOG_ROTATE_MIN", "60")) * 60.0,
         signals_config=signals_config,
+        # mtime polling period for hot reload of SIGNALS_CONFIG; 0 disables it.
+        signals_reload_interval=float(os.getenv("SIGNALS_RELOAD_MS", "1000")) / 1000.0,
         ssl_certfile=_optional_env("SSL_CERTFILE"),
         ssl_keyfile=_optional_env("SSL_KEYFILE"),
         naver_maps_client_id=_optional_env("NAVER_MAPS_CLIENT_ID"),
         naver_maps_client_secret=_optional_env("NAVER_MAPS_CLIENT_SECRET"),
+        naver_geocode_hosts=_geocode_hosts(),
+        geocode_cell_m=float(os.getenv("GEOCODE_CELL_M", "15")),
+        geocode_cache_size=int(os.getenv("GEOCODE_CACHE_SIZE", "4096")),
+        geocode_cache_ttl=float(os.getenv("GEOCODE_CACHE_TTL_S", "3600")),
+        # Outbound budget: reuse the last address within GEOCODE_MIN_MOVE_M and
+        # cap upstream calls per API key (GEOCODE_RATE_PER_S 0 = unlimited).
+        geocode_min_move_m=float(os.getenv("GEOCODE_MIN_MOVE_M", "30")),
+        geocode_rate=float(os.getenv("GEOCODE_RATE_PER_S", "2")),
+        geocode_burst=float(os.getenv("GEOCODE_BURST", "10")),
+        # Hedge delay until a host has a p95 of its own; 0 disables hedging.
+        geocode_hedge_after=float(os.getenv("GEOCODE_HEDGE_MS", "1000")) / 1000.0,
+        geocode_breaker_cooldown=float(os.getenv("GEOCODE_BREAKER_S", "30")),
     )
 
 
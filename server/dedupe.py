@@ -0,0 +1,107 @@
+"""Duplicate and out-of-order detection for GPS uplink rows.
+
+Store-and-forward replays may resend fixes the server already logged live.
+`UplinkIndex` remembers the `(device, client t, seq)` keys it has admitted
+in an insertion-ordered dict, bounded both by age (`window` seconds of
+server time) and by `max_keys`; expiry pops from the front, so every
+check is O(1) amortized. A key that fell out of the window is admitted
+again: the index trades exactness on very old replays for bounded memory.
+
+Per device it also keeps the newest client `t` admitted; an admitted row
+older than that is marked `out_of_order` (typically a replayed backlog
+arriving after live fixes), so readers know to sort by `client_t`.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+Key = tuple[Any, float, Any]
+
+
+def _hashable(value: Any) -> Any:
+    # JSON scalars key as themselves; anything else by its text.
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+class UplinkIndex:
+    def __init__(
+        self,
+        window: float = 6 * 3600.0,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self.max_keys = max(1, max_keys)
+        self.clock = clock
+        # key -> server time admitted, oldest first.
+        self._keys: OrderedDict[Key, float] = OrderedDict()
+        self._newest: dict[Any, float] = {}
+        self.admitted = 0
+        self.duplicates = 0
+        self.out_of_order = 0
+        self.unkeyed = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def admit(self, row: dict[str, Any]) -> bool:
+        """False for a duplicate; otherwise remember the row and set `row["out_of_order"]`."""
+        t = row.get("t")
+        if not isinstance(t, (int, float)) or isinstance(t, bool):
+            # No client time, nothing to key on: always logged, never flagged.
+            self.unkeyed += 1
+            row["out_of_order"] = 0
+            return True
+
+        now = self.clock()
+        self._expire(now)
+        device = _hashable(row.get("device"))
+        key = (device, float(t), _hashable(row.get("seq")))
+        if key in self._keys:
+            self.duplicates += 1
+            return False
+
+        self._keys[key] = now
+        if len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+            self.expired += 1
+        self.admitted += 1
+
+        newest = self._newest.get(device)
+        if newest is not None and t < newest:
+            self.out_of_order += 1
+            row["out_of_order"] = 1
+        else:
+            self._newest[device] = t
+            row["out_of_order"] = 0
+        return True
+
+    def _expire(self, now: float) -> None:
+        keys = self._keys
+        cutoff = now - self.window
+        while keys:
+            key, admitted = next(iter(keys.items()))
+            if admitted >= cutoff:
+                return
+            del keys[key]
+            self.expired += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "keys": len(self._keys),
+            "max_keys": self.max_keys,
+            "window_s": self.window,
+            "devices": len(self._newest),
+            "admitted": self.admitted,
+            "duplicates": self.duplicates,
+            "out_of_order": self.out_of_order,
+            "unkeyed": self.unkeyed,
+            "expired": self.expired,
+        }
@@ -0,0 +1,239 @@
+"""Derived signals computed on the server from mapped signals.
+
+`signals.json` may define a `derived` object next to `signals`; entries are
+evaluated in order after `SignalMapper.apply`, so later entries can use
+earlier ones:
+
+    "derived": {
+      "v_avg":      {"expr": "(ws_fl + ws_fr + ws_rl + ws_rr) / 4", "unit": "km/h", "decimals": 1},
+      "slip_fl":    {"expr": "(ws_fl - v_avg) / max(v_avg, 1)", "decimals": 3},
+      "ay_g":       {"expr": "ay / 9.80665", "unit": "g", "decimals": 3},
+      "v_mean_5s":  {"op": "mean", "of": "v_avg", "window": 5, "unit": "km/h", "decimals": 1},
+      "ay_rms_2s":  {"op": "rms", "of": "ay", "window": 2}
+    }
+
+Expressions allow numbers, signal names, + - * / ** %, unary +/- and the
+functions in `FUNCTIONS`; a sample missing any input (or dividing by zero)
+leaves the output out of that frame. Window operators (`OPS`) keep the last
+`window` seconds per output and update in O(1) per sample: running sums for
+mean/rms/std, monotonic deques for min/max/peak.
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+import math
+from collections import deque
+from functools import partial
+from typing import Any
+
+log = logging.getLogger("signal-mapper")
+
+FUNCTIONS: dict[str, Any] = {
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "hypot": math.hypot,
+    "atan2": math.atan2,
+    "degrees": math.degrees,
+    "radians": math.radians,
+}
+OPS = ("mean", "rms", "std", "min", "max", "peak")
+_SUM_OPS = ("mean", "rms", "std")
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Pow,
+    ast.Mod,
+    ast.USub,
+    ast.UAdd,
+)
+_EVAL_GLOBALS = {"__builtins__": {}, **FUNCTIONS}
+
+
+def _compile_expr(name: str, text: str) -> tuple[Any, frozenset[str]]:
+    """Validate an expression; return its code object and the signal names it reads."""
+    tree = ast.parse(text, mode="eval")
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"{type(node).__name__} is not allowed")
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ValueError("only numeric constants are allowed")
+            # Float arithmetic overflows instead of building huge ints (9 ** 9 ** 9).
+            node.value = float(node.value)
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"allowed functions: {', '.join(FUNCTIONS)}")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+            names.add(node.id)
+    return compile(tree, f"<derived {name}>", "eval"), frozenset(names)
+
+
+class _SumWindow:
+    """Time window with running sum and sum of squares (mean, rms, std)."""
+
+    __slots__ = ("op", "window", "samples", "total", "total_sq", "_evicted")
+
+    def __init__(self, op: str, window: float) -> None:
+        self.op = op
+        self.window = window
+        self.samples: deque[tuple[float, float]] = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._evicted = 0
+
+    def push(self, t: float, value: float) -> float:
+        samples = self.samples
+        samples.append((t, value))
+        self.total += value
+        self.total_sq += value * value
+        horizon = t - self.window
+        while samples[0][0] <= horizon:
+            _, old = samples.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+            self._evicted += 1
+        if self._evicted >= len(samples):
+            # Re-sum now and then so add/subtract rounding cannot drift (amortised O(1)).
+            self.total = math.fsum(v for _, v in samples)
+            self.total_sq = math.fsum(v * v for _, v in samples)
+            self._evicted = 0
+
+        count = len(samples)
+        mean = self.total / count
+        if self.op == "mean":
+            return mean
+        mean_sq = max(0.0, self.total_sq / count)
+        if self.op == "rms":
+            return math.sqrt(mean_sq)
+        return math.sqrt(max(0.0, mean_sq - mean * mean))
+
+
+class _ExtremeWindow:
+    """Time window min/max via a monotonic deque; `peak` is the max of |x|."""
+
+    __slots__ = ("window", "sign", "absolute", "samples")
+
+    def __init__(self, op: str, window: float) -> None:
+        self.window = window
+        self.sign = -1.0 if op == "min" else 1.0
+        self.absolute = op == "peak"
+        # (t, signed value), values non-increasing from the left.
+        self.samples: deque[tuple[float, float]] = deque()
+
+    def push(self, t: float, value: float) -> float:
+        key = abs(value) if self.absolute else value * self.sign
+        samples = self.samples
+        while samples and samples[-1][1] <= key:
+            samples.pop()
+        samples.append((t, key))
+        horizon = t - self.window
+        while samples[0][0] <= horizon:
+            samples.popleft()
+        best = samples[0][1]
+        return best if self.absolute else best * self.sign
+
+
+class DerivedSignals:
+    """Compiled `derived` section of signals.json.
+
+    Holds no sample state: `make_state()` returns fresh windows and
+    `update(sig, t, state)` adds every computable derived value to `sig`.
+    Invalid entries are logged and skipped, like invalid signal rules.
+    """
+
+    def __init__(self, config: Any, known: frozenset[str] = frozenset()) -> None:
+        # (name, code or None, source or None, window factory or None, decimals)
+        self.steps: tuple[tuple[Any, ...], ...] = ()
+        self.fields: tuple[tuple[str, str | None, int | None], ...] = ()
+        if not config:
+            return
+        if not isinstance(config, dict):
+            log.warning("signals config 'derived' must be an object")
+            return
+
+        steps = []
+        fields = []
+        defined: set[str] = set()
+        unknown: set[str] = set()
+        for name, spec in config.items():
+            try:
+                step, refs = self._compile(name, spec, config, defined)
+            except (SyntaxError, TypeError, ValueError) as exc:
+                log.warning("derived signal %r skipped: %s", name, exc)
+                continue
+            steps.append(step)
+            unit = spec.get("unit")
+            fields.append((name, str(unit) if unit is not None else None, step[4]))
+            defined.add(name)
+            unknown |= refs - defined - known
+        if unknown and known:
+            log.warning("derived signals read unmapped signals: %s", ", ".join(sorted(unknown)))
+        self.steps = tuple(steps)
+        self.fields = tuple(fields)
+
+    @staticmethod
+    def _compile(
+        name: str, spec: Any, config: dict[str, Any], defined: set[str]
+    ) -> tuple[tuple[Any, ...], frozenset[str]]:
+        if not isinstance(spec, dict):
+            raise ValueError("definition must be an object")
+        decimals = spec.get("decimals")
+        if decimals is not None:
+            decimals = max(0, min(6, int(decimals)))
+
+        if "expr" in spec:
+            code, refs = _compile_expr(name, str(spec["expr"]))
+            source = None
+            factory = None
+        else:
+            op = spec.get("op")
+            if op not in OPS:
+                raise ValueError(f"needs 'expr' or an 'op' of {', '.join(OPS)}")
+            source = spec.get("of")
+            if not isinstance(source, str) or not source:
+                raise ValueError(f"'{op}' needs the signal name in 'of'")
+            window = float(spec.get("window", 1.0))
+            if not window > 0:
+                raise ValueError("'window' must be > 0 seconds")
+            code = None
+            refs = frozenset((source,))
+            factory = partial(_SumWindow if op in _SUM_OPS else _ExtremeWindow, op, window)
+
+        ahead = (refs & config.keys()) - defined
+        if ahead:
+            raise ValueError(f"reads derived signals defined after it: {', '.join(sorted(ahead))}")
+        return (name, code, source, factory, decimals), refs
+
+    def make_state(self) -> list[Any]:
+        return [factory() if factory is not None else None for _, _, _, factory, _ in self.steps]
+
+    def update(self, sig: dict[str, float], t: float, state: list[Any]) -> None:
+        for (name, code, source, _, decimals), window in zip(self.steps, state):
+            if code is not None:
+                try:
+                    value = float(eval(code, _EVAL_GLOBALS, sig))  # noqa: S307 - AST checked in _compile_expr
+                except (ArithmeticError, NameError, TypeError, ValueError):
+                    continue
+                if not math.isfinite(value):
+                    continue
+            else:
+                value = sig.get(source)
+                if value is None or value != value:
+                    continue
+                value = window.push(t, value)
+            sig[name] = round(value, decimals) if decimals is not None else value
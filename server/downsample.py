@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+METHODS = ("minmax", "lttb")
+# LTTB over long windows first keeps this many min/max points per output point
+# (MinMaxLTTB), so its sequential pass stays short on multi-hour windows.
+LTTB_PRESELECT = 4
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum, in time order.
+
+    Rows are split into `max_points // 2` equal-count buckets, so the result
+    has at most `max_points` points and keeps every peak of the original.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    size = math.ceil(n / max(1, max_points // 2))
+    buckets = math.ceil(n / size)
+    padded = np.full(buckets * size, np.nan, dtype=np.float64)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+    base = np.arange(buckets) * size
+    lo = base + np.nanargmin(grid, axis=1)
+    hi = base + np.nanargmax(grid, axis=1)
+    return np.unique(np.concatenate((lo, hi)))
+
+
+def lttb_indices(t: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: `max_points` indices preserving visual shape.
+
+    Keeps the first and last points; from each bucket in between it picks the
+    point forming the largest triangle with the previous pick and the mean of
+    the next bucket.
+    """
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n) if n <= max_points else np.array([0, n - 1])
+    x = t.astype(np.float64)
+    v = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    # Mean of each bucket (the "next" anchor), with the last point closing the series.
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[: n - 1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(v[: n - 1], edges[:-1]) / counts, v[-1])
+    xs = x.tolist()
+    vs = v.tolist()
+
+    picked = [0]
+    px, py = xs[0], vs[0]
+    for i in range(max_points - 2):
+        start, stop = int(edges[i]), int(edges[i + 1])
+        nx, ny = mean_x[i + 1], mean_y[i + 1]
+        # Twice the triangle area; the constant factor does not change the argmax.
+        dx, dy = px - nx, ny - py
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            area = abs(dx * (vs[j] - py) - (px - xs[j]) * dy)
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        px, py = xs[best], vs[best]
+    picked.append(n - 1)
+    return np.array(picked, dtype=np.int64)
+
+
+def downsample(t: np.ndarray, y: np.ndarray, max_points: int, method: str = "minmax") -> tuple[np.ndarray, np.ndarray]:
+    """Drop missing (NaN) samples and reduce to at most `max_points` points."""
+    keep = ~np.isnan(y)
+    if not keep.all():
+        t, y = t[keep], y[keep]
+    if method == "lttb":
+        if len(y) > LTTB_PRESELECT * max_points:
+            pre = minmax_indices(y, LTTB_PRESELECT * max_points)
+            t, y = t[pre], y[pre]
+        index = lttb_indices(t, y, max_points)
+    elif method == "minmax":
+        index = minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"method must be one of: {', '.join(METHODS)}")
+    return t[index], y[index]
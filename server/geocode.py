@@ -0,0 +1,566 @@
+"""NAVER reverse geocoding with a grid-cell cache and request coalescing.
+
+Coordinates are snapped to a grid of `cell_m` metres (rows of constant
+latitude, columns scaled by cos(latitude)), and one cached address serves
+the whole cell. Entries expire after `ttl` seconds and the least recently
+used entry is evicted beyond `cache_size`. Concurrent lookups of a cell
+that is not cached share one upstream request.
+
+Upstream calls are budgeted: a lookup less than `min_move_m` from the
+last resolved position reuses that address, and a token bucket per API key
+caps the call rate; a throttled lookup gets the nearest cached address.
+So the upstream volume follows the distance driven, not the poll rate.
+
+Upstream hosts are ranked by a latency/error EWMA with a per-host circuit
+breaker, and a slow first request is hedged with one to the next host.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import httpx
+
+log = logging.getLogger("telemetry-server")
+
+UPSTREAM_TIMEOUT = 4.0
+METERS_PER_DEGREE = 111_320.0
+
+# Host health: EWMA weight, latency samples kept for the p95, and the hedge
+# floor so a fast host does not get a second request on every lookup.
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 64
+MIN_LATENCY_SAMPLES = 8
+HEDGE_MIN_DELAY = 0.05
+BREAKER_FAILURES = 3
+# Auth and quota answers: the host is up, the key or budget is not. They
+# reach the caller as-is and never count toward a host's breaker.
+CREDENTIAL_ERRORS = (401, 403, 429)
+
+
+class GeocodeError(Exception):
+    """Upstream failure, carrying the HTTP status the API should answer with."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _format_naver_address(payload: dict[str, Any]) -> str | None:
+    results = payload.get("results")
+    if not isinstance(results, list) or not results:
+        return None
+
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+
+        region = item.get("region") if isinstance(item.get("region"), dict) else {}
+        land = item.get("land") if isinstance(item.get("land"), dict) else {}
+
+        region_names: list[str] = []
+        for area in ("area1", "area2", "area3", "area4"):
+            node = region.get(area)
+            if isinstance(node, dict):
+                name = node.get("name")
+                if name:
+                    region_names.append(str(name))
+
+        land_name = land.get("name")
+        number1 = land.get("number1")
+        number2 = land.get("number2")
+
+        number = ""
+        if number1:
+            number = str(number1)
+        if number2:
+            number = f"{number}-{number2}" if number else str(number2)
+
+        parts = region_names
+        if land_name:
+            parts.append(str(land_name))
+        if number:
+            parts.append(str(number))
+
+        address = " ".join([p for p in parts if p]).strip()
+        if address:
+            return address
+
+    return None
+
+
+def _safe_json(response: httpx.Response) -> dict[str, Any] | None:
+    try:
+        payload = response.json()
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _extract_naver_error(payload: dict[str, Any] | None) -> str | None:
+    if not isinstance(payload, dict):
+        return None
+
+    status = payload.get("status")
+    if isinstance(status, dict):
+        code = status.get("code")
+        if code not in (None, 0, "0"):
+            name = status.get("name")
+            message = status.get("message")
+            parts = [p for p in [name, f"code={code}", message] if p]
+            if parts:
+                return ", ".join(str(p) for p in parts)
+            return f"code={code}"
+
+    error = payload.get("error")
+    if isinstance(error, dict):
+        code = error.get("errorCode") or error.get("code")
+        message = error.get("message")
+        if code or message:
+            return f"{code or 'error'}: {message or ''}".strip()
+
+    return None
+
+
+def _short_error_detail(payload: dict[str, Any] | None, response: httpx.Response) -> str:
+    from_payload = _extract_naver_error(payload)
+    if from_payload:
+        return from_payload
+
+    text = response.text.strip().replace("\n", " ")
+    if text:
+        return text[:220]
+    return "no detail"
+
+
+def distance_m(a: tuple[float, float], b: tuple[float, float]) -> float:
+    """Equirectangular distance; plenty for the few hundred metres compared here."""
+    dy = (a[0] - b[0]) * METERS_PER_DEGREE
+    dx = (a[1] - b[1]) * METERS_PER_DEGREE * math.cos(math.radians((a[0] + b[0]) / 2.0))
+    return math.hypot(dx, dy)
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `burst`; `rate <= 0` never runs out."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def available(self) -> float:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * max(self.rate, 0.0))
+        self.updated = now
+        return self.tokens
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        if self.available() < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class _HostHealth:
+    """Latency/error EWMA and circuit breaker state of one upstream host.
+
+    The breaker opens after BREAKER_FAILURES consecutive failures and lets
+    requests through again after `cooldown` seconds (half-open); one more
+    failure re-opens it, a success closes it.
+    """
+
+    def __init__(self, url: str, cooldown: float) -> None:
+        self.url = url
+        self.cooldown = cooldown
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.trips = 0
+
+    def available(self, now: float) -> bool:
+        return self.failures < BREAKER_FAILURES or now >= self.open_until
+
+    def state(self, now: float) -> str:
+        if self.failures < BREAKER_FAILURES:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+    def score(self) -> float:
+        # Expected cost of a request: latency plus a timeout's worth per error.
+        return (self.latency or 0.0) + self.error_rate * UPSTREAM_TIMEOUT
+
+    def p95(self) -> float | None:
+        if len(self.samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record(self, elapsed: float, ok: bool | None, now: float) -> None:
+        """`ok=None` is a request cancelled by the hedge: latency only."""
+        self.requests += 1
+        self.samples.append(elapsed)
+        self.latency = elapsed if self.latency is None else self.latency + EWMA_ALPHA * (elapsed - self.latency)
+        if ok is None:
+            self.cancelled += 1
+            return
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.failures = 0
+            return
+        self.errors += 1
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURES:
+            if now >= self.open_until:
+                self.trips += 1
+            self.open_until = now + self.cooldown
+
+    def stats(self, now: float) -> dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "url": self.url,
+            "state": self.state(now),
+            "latency_ms": None if self.latency is None else round(self.latency * 1000.0, 1),
+            "p95_ms": None if p95 is None else round(p95 * 1000.0, 1),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "trips": self.trips,
+        }
+
+
+class ReverseGeocoder:
+    """Cached, coalescing client for the NAVER reverse-geocode API.
+
+    `start()`/`stop()` own the HTTP client (like a CAN source's hooks);
+    `reverse()` answers from the cache or the upstream host chain, ordered
+    by host health (see `_HostHealth`). A second host is asked once the
+    first has been slower than its own p95, or `hedge_after` seconds until
+    enough samples exist; `hedge_after=0` disables hedging.
+
+    The movement threshold compares against the last resolved position of
+    this geocoder: the dashboard follows a single vehicle.
+    """
+
+    def __init__(
+        self,
+        client_id: str | None,
+        client_secret: str | None,
+        hosts: Sequence[str],
+        cell_m: float = 15.0,
+        cache_size: int = 4096,
+        ttl: float = 3600.0,
+        min_move_m: float = 30.0,
+        rate: float = 2.0,
+        burst: float = 10.0,
+        hedge_after: float = 1.0,
+        breaker_cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.hosts = tuple(hosts)
+        self.hedge_after = hedge_after
+        self._health = [_HostHealth(url, breaker_cooldown) for url in self.hosts]
+        self.cell_deg = max(cell_m, 0.1) / METERS_PER_DEGREE
+        self.cache_size = max(1, cache_size)
+        self.ttl = ttl
+        self.min_move_m = min_move_m
+        self.clock = clock
+        # One bucket per API key: the upstream quota is counted per key.
+        self._buckets: dict[str, TokenBucket] = {}
+        self._bucket_args = (rate, burst)
+        # (expires_at, position, result) of the last upstream answer.
+        self._last: tuple[float, tuple[float, float], dict[str, Any]] | None = None
+        self.http: httpx.AsyncClient | None = None
+
+        # cell -> (expires_at, result, resolved position), least recently used first.
+        self._cache: OrderedDict[tuple[int, int], tuple[float, dict[str, Any], tuple[float, float]]] = OrderedDict()
+        self._inflight: dict[tuple[int, int], asyncio.Future[dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream = 0
+        self.errors = 0
+        self.evictions = 0
+        self.suppressed = 0
+        self.throttled = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    @property
+    def bucket(self) -> TokenBucket:
+        key = self.client_id or ""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*self._bucket_args, clock=self.clock)
+        return bucket
+
+    async def start(self) -> None:
+        if self.http is None:
+            self.http = httpx.AsyncClient(timeout=httpx.Timeout(UPSTREAM_TIMEOUT))
+
+    async def stop(self) -> None:
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+
+    def cell(self, lat: float, lon: float) -> tuple[int, int]:
+        row = math.floor(lat / self.cell_deg)
+        # Column width follows the row's latitude so cells stay roughly square.
+        scale = max(math.cos(math.radians((row + 0.5) * self.cell_deg)), 1e-6)
+        return row, math.floor(lon * scale / self.cell_deg)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced + self.suppressed + self.throttled
+        now = self.clock()
+        return {
+            "entries": len(self._cache),
+            "capacity": self.cache_size,
+            "cell_m": round(self.cell_deg * METERS_PER_DEGREE, 3),
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "suppressed": self.suppressed,
+            "throttled": self.throttled,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else None,
+            "min_move_m": self.min_move_m,
+            "rate_per_s": self._bucket_args[0],
+            "tokens": round(self.bucket.available(), 2),
+            "upstream": self.upstream,
+            "errors": self.errors,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hosts": [host.stats(now) for host in self._health],
+        }
+
+    async def reverse(self, lat: float, lon: float) -> dict[str, Any]:
+        """Address for a position: `{"ok", "address", "raw", "cache"}`.
+
+        `cache` is `hit`, `miss` (this call went upstream), `coalesced`
+        (joined another caller's upstream request), `suppressed` (moved less
+        than `min_move_m` since the last resolved address) or `throttled`
+        (out of tokens: nearest cached address). The last two also carry
+        `distance_m` to the position the address was resolved for. Raises
+        GeocodeError, including 429 when throttled with nothing cached.
+        """
+        key = self.cell(lat, lon)
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return {**entry[1], "cache": "hit"}
+            del self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is None:
+            position = (lat, lon)
+            if self._last is not None and self._last[0] > self.clock():
+                moved = distance_m(position, self._last[1])
+                if moved < self.min_move_m:
+                    self.suppressed += 1
+                    return {**self._last[2], "cache": "suppressed", "distance_m": round(moved, 1)}
+            if not self.bucket.take():
+                return self._nearest(position)
+            self.misses += 1
+            source = "miss"
+            future = self._inflight[key] = asyncio.ensure_future(self._resolve(key, lat, lon))
+            # Mark the error retrieved even if every caller went away meanwhile.
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        else:
+            self.coalesced += 1
+            source = "coalesced"
+        # Shielded: a caller that disconnects does not cancel the shared request.
+        result = await asyncio.shield(future)
+        return {**result, "cache": source}
+
+    def _nearest(self, position: tuple[float, float]) -> dict[str, Any]:
+        # Expired entries still beat an error while the budget is exhausted.
+        best = min(
+            ((distance_m(position, resolved), result) for _, result, resolved in self._cache.values()),
+            key=lambda item: item[0],
+            default=None,
+        )
+        if best is None:
+            raise GeocodeError(429, "Naver reverse-geocode budget exhausted and nothing cached")
+        self.throttled += 1
+        return {**best[1], "cache": "throttled", "distance_m": round(best[0], 1)}
+
+    async def _resolve(self, key: tuple[int, int], lat: float, lon: float) -> dict[str, Any]:
+        try:
+            result = await self._fetch(lat, lon)
+        except GeocodeError:
+            self.errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        expires_at = self.clock() + self.ttl
+        self._cache[key] = (expires_at, result, (lat, lon))
+        self._last = (expires_at, (lat, lon), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def _plan(self) -> list[_HostHealth]:
+        """Hosts to try, healthiest first, skipping those with an open circuit."""
+        now = self.clock()
+        return sorted((host for host in self._health if host.available(now)), key=_HostHealth.score)
+
+    def _hedge_delay(self, host: _HostHealth) -> float:
+        p95 = host.p95()
+        delay = self.hedge_after if p95 is None else p95
+        return min(max(delay, HEDGE_MIN_DELAY), UPSTREAM_TIMEOUT)
+
+    async def _fetch(self, lat: float, lon: float) -> dict[str, Any]:
+        """Query the host chain: healthiest first, next one hedged past its p95.
+
+        At most two requests run at once. A failure starts the next host
+        right away, like the plain fallback chain did; the first success
+        wins and cancels the other request.
+        """
+        if self.http is None:
+            raise GeocodeError(503, "HTTP client not initialized")
+
+        params = {
+            "request": "coordsToaddr",
+            "coords": f"{lon},{lat}",
+            "sourcecrs": "epsg:4326",
+            "output": "json",
+            "orders": "roadaddr,addr",
+        }
+        headers = {
+            "X-NCP-APIGW-API-KEY-ID": self.client_id or "",
+            "X-NCP-APIGW-API-KEY": self.client_secret or "",
+        }
+
+        queue = self._plan()
+        loop = asyncio.get_running_loop()
+        # task -> (host, started, launched as a hedge)
+        pending: dict[asyncio.Task[dict[str, Any]], tuple[_HostHealth, float, bool]] = {}
+        errors: list[GeocodeError] = []
+
+        def launch(hedge: bool = False) -> None:
+            host = queue.pop(0)
+            task = asyncio.ensure_future(self._attempt(host, params, headers))
+            pending[task] = (host, loop.time(), hedge)
+
+        if not queue:
+            raise GeocodeError(503, "Naver reverse-geocode unavailable: every host's circuit is open")
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge_after > 0 and queue and len(pending) == 1:
+                    host, started, _ = next(iter(pending.values()))
+                    timeout = max(0.0, started + self._hedge_delay(host) - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedged += 1
+                    launch(hedge=True)
+                    continue
+                for task in done:
+                    _, _, hedge = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except GeocodeError as exc:
+                        errors.append(exc)
+                        continue
+                    self.hedge_wins += hedge
+                    return result
+                if queue and not pending:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        for status_code in CREDENTIAL_ERRORS:
+            for exc in errors:
+                if exc.status_code == status_code:
+                    raise exc
+        raise GeocodeError(502, f"Naver reverse-geocode failed: {errors[-1].detail}")
+
+    async def _attempt(
+        self, host: _HostHealth, params: dict[str, str], headers: dict[str, str]
+    ) -> dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = await self._request(host.url, params, headers)
+        except asyncio.CancelledError:
+            # Lost to the other request: it took at least this long.
+            host.record(time.perf_counter() - started, None, self.clock())
+            raise
+        except GeocodeError as exc:
+            ok = exc.status_code in CREDENTIAL_ERRORS
+            host.record(time.perf_counter() - started, ok, self.clock())
+            raise
+        host.record(time.perf_counter() - started, True, self.clock())
+        return result
+
+    async def _request(self, url: str, params: dict[str, str], headers: dict[str, str]) -> dict[str, Any]:
+        assert self.http is not None
+        self.upstream += 1
+        try:
+            response = await self.http.get(url, params=params, headers=headers)
+        except Exception as exc:
+            log.warning("reverse-geocode exception (%s): %s", url, exc)
+            raise GeocodeError(502, f"{url} -> {exc!r}") from exc
+        payload = _safe_json(response)
+        status_code = response.status_code
+
+        if status_code in (401, 403):
+            detail = _short_error_detail(payload, response)
+            raise GeocodeError(status_code, f"Naver reverse-geocode auth failed ({url}): {detail}")
+
+        if status_code == 429:
+            detail = _short_error_detail(payload, response)
+            raise GeocodeError(429, f"Naver reverse-geocode rate limited ({url}): {detail}")
+
+        if status_code != 200:
+            detail = _short_error_detail(payload, response)
+            last_error = f"{url} -> HTTP {status_code} ({detail})"
+            log.warning("reverse-geocode fallback: %s", last_error)
+            raise GeocodeError(502, last_error)
+
+        if not payload:
+            last_error = f"{url} -> invalid JSON payload"
+            log.warning("reverse-geocode invalid payload: %s", last_error)
+            raise GeocodeError(502, last_error)
+
+        api_error = _extract_naver_error(payload)
+        if api_error:
+            last_error = f"{url} -> API error ({api_error})"
+            log.warning("reverse-geocode API error: %s", last_error)
+            raise GeocodeError(502, last_error)
+
+        address = _format_naver_address(payload)
+        return {
+            "ok": True,
+            "address": address,
+            "raw": payload if address is None else None,
+        }
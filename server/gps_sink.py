@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import math
 from typing import Any
 
+from dedupe import UplinkIndex
+
+# Upper bound per batch; the mobile queue holds 1000 payloads.
+MAX_BATCH_ITEMS = 5000
+
 
 def extract_gps_row(payload: dict[str, Any]) -> dict[str, Any] | None:
     gps = payload.get("gps")
@@ -23,6 +29,8 @@ def extract_gps_row(payload: dict[str, Any]) -> dict[str, Any] | None:
         "os": meta.get("os"),
         "app_ver": meta.get("app_ver"),
         "device": meta.get("device"),
+        "seq": payload.get("seq"),
+        "queued_at": payload.get("queued_at"),
     }
 
 
@@ -39,3 +47,67 @@ def extract_event_row(payload: dict[str, Any]) -> dict[str, Any] | None:
         "type": "MARK",
         "note": payload.get("note", ""),
     }
+
+
+def _finite(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _gps_error(row: dict[str, Any]) -> str | None:
+    lat, lon = row["lat"], row["lon"]
+    if not (_finite(lat) and _finite(lon)):
+        return "gps.lat/gps.lon must be numbers"
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return "gps.lat/gps.lon out of range"
+    if row["t"] is not None and not _finite(row["t"]):
+        return "t must be a number"
+    return None
+
+
+def parse_batch(
+    items: Any, index: UplinkIndex | None = None
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Split a store-and-forward batch into (gps rows, event rows, per-item results).
+
+    Items are the same payloads `POST /api/gps` / `POST /api/event` take.
+    Results line up with `items`: `{"ok": True, "kind": "gps"|"event"}` or
+    `{"ok": False, "error": ...}`. A batch item is stricter than a single
+    message: a GPS fix needs finite, in-range lat/lon, so one bad fix is
+    reported instead of landing in the log. With `index`, a fix seen before
+    is `{"ok": True, "kind": "gps", "duplicate": True}` and is not returned.
+    """
+    if not isinstance(items, list):
+        raise ValueError("items must be a list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"at most {MAX_BATCH_ITEMS} items per batch")
+
+    gps_rows: list[dict[str, Any]] = []
+    event_rows: list[dict[str, Any]] = []
+    results: list[dict[str, Any]] = []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({"ok": False, "error": "item must be an object"})
+            continue
+
+        row = extract_gps_row(item)
+        if row is not None:
+            error = _gps_error(row)
+            if error:
+                results.append({"ok": False, "error": error})
+                continue
+            if index is not None and not index.admit(row):
+                results.append({"ok": True, "kind": "gps", "duplicate": True})
+                continue
+            gps_rows.append(row)
+            results.append({"ok": True, "kind": "gps"})
+            continue
+
+        row = extract_event_row(item)
+        if row is not None:
+            event_rows.append(row)
+            results.append({"ok": True, "kind": "event"})
+            continue
+
+        results.append({"ok": False, "error": "not a GPS fix or MARK event"})
+
+    return gps_rows, event_rows, results
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from binlog import SessionLogReader
+from downsample import downsample
+
+
+def _json_floats(values: np.ndarray) -> list[float]:
+    # float32 values go through their shortest repr so 52.8 stays 52.8, not 52.79999923706055.
+    if values.dtype == np.float32:
+        values = values.astype(str).astype(np.float64)
+    return values.tolist()
+
+
+def _interleave(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.column_stack((a, b)).ravel()
+
+
+def query_can(
+    manifest: Path,
+    signals: list[str] | None,
+    t_from: float | None,
+    t_to: float | None,
+    max_points: int,
+    method: str,
+) -> dict[str, Any]:
+    """Chart-sized series per signal for a time window of a logged session.
+
+    When the window spans at least `max_points` logged chunks, the series is
+    built from the session rollup (per-chunk min/max) instead of the raw rows,
+    so the cost follows the output size rather than the window length. Rows
+    newer than the rollup (live session) are read raw and appended.
+    """
+    with SessionLogReader(manifest) as reader:
+        available = reader.signals
+        names = available if signals is None else [name for name in signals if name in available]
+        dtype = np.dtype(reader.manifest.get("dtype", "float32"))
+
+        rollup = reader.read_rollup(names, t_from, t_to)
+        if rollup is None or len(rollup["t"]) < max_points:
+            data = reader.read(names, t_from, t_to)
+            series = {}
+            for name in names:
+                st, sv = downsample(data["t"], data[name], max_points, method)
+                series[name] = {"t": st.tolist(), "v": _json_floats(sv)}
+            return {"rows": len(data["t"]), "source": "raw", "signals": series}
+
+        covered = float(rollup["t_max"][-1])
+        tail = None
+        if t_to is None or t_to > covered:
+            tail = reader.read(names, covered, t_to)
+            keep = tail["t"] > covered
+            tail = {key: column[keep] for key, column in tail.items()}
+
+    # Each chunk contributes its min at its first sample time and its max at
+    # its last; for a chunk-aligned bucket these are the exact extremes.
+    times = _interleave(rollup["t"], rollup["t_max"])
+    rows = int(rollup["rows"].sum())
+    series = {}
+    for name in names:
+        values = _interleave(rollup[f"{name}.min"], rollup[f"{name}.max"]).astype(dtype)
+        t = times
+        if tail is not None and len(tail["t"]):
+            t = np.concatenate((t, tail["t"]))
+            values = np.concatenate((values, tail[name].astype(dtype)))
+        st, sv = downsample(t, values, max_points, method)
+        series[name] = {"t": st.tolist(), "v": _json_floats(sv)}
+    if tail is not None:
+        rows += len(tail["t"])
+    return {"rows": rows, "source": "rollup", "signals": series}
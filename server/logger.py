@@ -1,116 +1,570 @@
 from __future__ import annotations
 
 import csv
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
 from typing import Any
 
+from binlog import ColumnarLogWriter
+from catalog import SessionCatalog
+
+log = logging.getLogger("telemetry-server")
+
+GPS_HEADER = [
+    "client_t",
+    "lat",
+    "lon",
+    "spd",
+    "hdg",
+    "acc",
+    "alt",
+    "source",
+    "bg_state",
+    "os",
+    "app_ver",
+    "device",
+    "seq",
+    "queued_at",
+    "out_of_order",
+]
+EVENTS_HEADER = ["client_t", "type", "note"]
+
+_STOP = object()
+# Queue tag for CAN schema changes, kept in order with the CAN rows.
+_CAN_SCHEMA = "can_schema"
+# Queue tag for many (stream, row) pairs enqueued with one put.
+_BULK = "bulk"
+
+
+class _Stream:
+    """One CSV file plus the rows buffered for its next group commit."""
+
+    def __init__(self, path: Path, header: list[str]) -> None:
+        self.path = path
+        self.file = path.open("w", newline="", encoding="utf-8")
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(header)
+        self.oldest: float | None = None
+        self.rows = 0
+        self.total_rows = 0
+
+    def append(self, row: list[Any]) -> None:
+        self.writer.writerow(row)
+
+    def pending_bytes(self) -> int:
+        return self.buffer.tell()
+
+    def drain(self) -> str:
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def committed(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ColumnarStream:
+    """The columnar CAN log (see `binlog`) with the same commit interface as `_Stream`.
+
+    Rows go to segments `<prefix>_0001.tlog[.gz]`; after a commit the segment is
+    rotated once it reaches `rotate_bytes` on disk or is `rotate_seconds` old
+    (0 disables either limit). gzip segments are sync-flushed on every commit,
+    so a crash loses at most the rows that were not yet committed. Every
+    `seek_bytes` of log data a gzip segment gets a full flush followed by the
+    current schema record: a seek point from which a reader can inflate
+    without the preceding data. The manifest is rewritten on every rotation,
+    seek point and on close.
+
+    Alongside the segments, `<prefix>.rollup.tlog` (plain, float64) gets one
+    row per CAN chunk: `t` = chunk t_min, `seq` = first seq, plus `t_max`,
+    `rows` and `<signal>.min`/`<signal>.max`. Wide time-range queries read
+    it instead of the raw rows. It is written every `ROLLUP_FLUSH_ROWS` rows
+    and on rotation/close, so it may trail the segments slightly.
+    """
+
+    ROLLUP_FLUSH_ROWS = 64
+
+    def __init__(
+        self,
+        log_dir: Path,
+        prefix: str,
+        dtype: str,
+        compress: str = "gzip",
+        rotate_bytes: int = 0,
+        rotate_seconds: float = 0.0,
+        seek_bytes: int = 1024 * 1024,
+    ) -> None:
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.seek_bytes = seek_bytes
+        self.compress = compress
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.manifest_path = log_dir / f"{prefix}.manifest.json"
+        self.rollup_path = log_dir / f"{prefix}.rollup.tlog"
+        self.columns = ColumnarLogWriter(dtype, summarize=True)
+        self.rollup = ColumnarLogWriter("float64")
+        self._rollup_file = self.rollup_path.open("wb")
+        self.segments: list[dict[str, Any]] = []
+        self.oldest: float | None = None
+        self.rows = 0
+        self.total_rows = 0
+        self._open_segment(b"")
+
+    @property
+    def path(self) -> Path:
+        return self.log_dir / self.segments[-1]["file"]
+
+    def append(self, row: tuple[Any, Any, Any, dict[str, float]]) -> None:
+        self.columns.append(*row)
+
+    def pending_bytes(self) -> int:
+        return self.columns.pending_bytes
+
+    def drain(self) -> bytes:
+        data = self.columns.drain()
+        self._since_seek += len(data)
+        for summary in self.columns.summaries:
+            sig = {"t_max": summary.t_max, "rows": summary.rows}
+            for name, (low, high) in summary.extremes.items():
+                sig[f"{name}.min"] = low
+                sig[f"{name}.max"] = high
+            self.rollup.append(summary.t_min, summary.seq, summary.drop, sig)
+        self.columns.summaries.clear()
+        if self.rollup.rows >= self.ROLLUP_FLUSH_ROWS:
+            self._flush_rollup()
+        segment = self.segments[-1]
+        if len(segment["signals"]) != len(self.columns.segment_signals):
+            # Readers of a live session learn its columns from the manifest.
+            segment["signals"] = list(self.columns.segment_signals)
+            self._write_manifest()
+        return data
+
+    def _flush_rollup(self) -> None:
+        self._rollup_file.write(self.rollup.drain())
+        self._rollup_file.flush()
+
+    def committed(self) -> None:
+        if self.columns.segment_rows == 0:
+            return
+        if self.file is not self._raw and self._since_seek >= self.seek_bytes:
+            self._add_seek_point()
+        too_big = self.rotate_bytes > 0 and self._raw.tell() >= self.rotate_bytes
+        too_old = self.rotate_seconds > 0 and time.monotonic() - self._opened >= self.rotate_seconds
+        if too_big or too_old:
+            self._close_segment()
+            self._open_segment(self.columns.start_segment())
+
+    def close(self) -> None:
+        self._close_segment()
+        self._rollup_file.close()
+
+    def time_range(self) -> tuple[float | None, float | None]:
+        columns = self.columns
+        starts = [seg["t_min"] for seg in self.segments if seg.get("t_min") is not None]
+        ends = [seg["t_max"] for seg in self.segments if seg.get("t_max") is not None]
+        if columns.segment_t_min is not None and not self.segments[-1]["closed"]:
+            starts.append(columns.segment_t_min)
+            ends.append(columns.segment_t_max)
+        return (min(starts) if starts else None, max(ends) if ends else None)
+
+    def signals(self) -> list[str]:
+        names: dict[str, None] = {}
+        for segment in self.segments:
+            names.update(dict.fromkeys(segment.get("signals") or ()))
+        names.update(self.columns.segment_signals)
+        return list(names)
+
+    def _open_segment(self, header: bytes) -> None:
+        suffix = ".tlog.gz" if self.compress == "gzip" else ".tlog"
+        name = f"{self.prefix}_{len(self.segments) + 1:04d}{suffix}"
+        self._raw = (self.log_dir / name).open("wb")
+        # mtime=0 keeps segment bytes independent of the wall clock.
+        self.file = gzip.GzipFile(fileobj=self._raw, mode="wb", mtime=0) if self.compress == "gzip" else self._raw
+        self._opened = time.monotonic()
+        self._since_seek = 0
+        self.segments.append({"file": name, "closed": False, "seek": [], "signals": list(self.columns.segment_signals)})
+        if header:
+            self.file.write(header)
+            self.file.flush()
+        self._write_manifest()
+
+    def _add_seek_point(self) -> None:
+        self.file.flush(zlib.Z_FULL_FLUSH)
+        self.segments[-1]["seek"].append([self._raw.tell(), self.columns.segment_t_max])
+        # Lands in the file with the next commit, ahead of that commit's chunks.
+        self.file.write(self.columns.schema_record)
+        self._since_seek = 0
+        self._write_manifest()
+
+    def _close_segment(self) -> None:
+        self._flush_rollup()
+        if self.file is not self._raw:
+            self.file.close()  # writes the gzip trailer; does not close _raw
+        self._raw.close()
+        columns = self.columns
+        self.segments[-1].update(
+            closed=True,
+            rows=columns.segment_rows,
+            t_min=columns.segment_t_min,
+            t_max=columns.segment_t_max,
+            bytes=(self.log_dir / self.segments[-1]["file"]).stat().st_size,
+            signals=list(columns.segment_signals),
+        )
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "v": 1,
+            "stream": "can",
+            "dtype": self.columns.dtype,
+            "compress": self.compress,
+            "rollup": self.rollup_path.name,
+            "segments": self.segments,
+        }
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+
+def _gps_values(row: dict[str, Any]) -> list[Any]:
+    return [
+        row.get("t"),
+        row.get("lat"),
+        row.get("lon"),
+        row.get("spd"),
+        row.get("hdg"),
+        row.get("acc"),
+        row.get("alt"),
+        row.get("source"),
+        row.get("bg_state"),
+        row.get("os"),
+        row.get("app_ver"),
+        row.get("device"),
+        row.get("seq"),
+        row.get("queued_at"),
+        row.get("out_of_order"),
+    ]
+
+
+def _event_values(row: dict[str, Any]) -> list[Any]:
+    return [row.get("t"), row.get("type"), row.get("note", "")]
+
 
 class SessionCsvLogger:
-    def __init__(self, log_dir: Path, session_id: str | None = None) -> None:
-        self._lock = Lock()
+    """Session logger with a background writer thread.
+
+    `log_*` calls only enqueue a row on a `queue.SimpleQueue` and return; the
+    writer thread formats rows into per-stream buffers and commits each buffer
+    with one write+flush once it reaches `flush_bytes` or its oldest row is
+    `flush_interval` seconds old. `close()` drains everything still queued.
+
+    A failed write (disk full, EIO, ...) loses that batch only: it is logged,
+    counted in `errors`/`dropped_rows` and the thread carries on. Should the
+    thread die anyway, `failed` is set and `log_*` drop rows instead of
+    queueing them without bound.
+
+    GPS and events are CSV; CAN samples go to a columnar binary log whose
+    columns follow `set_can_schema()`, split into (optionally gzip-compressed)
+    segments listed in `can_<session>.manifest.json`.
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        session_id: str | None = None,
+        flush_interval: float = 0.2,
+        flush_bytes: int = 64 * 1024,
+        can_dtype: str = "float32",
+        can_compress: str = "gzip",
+        rotate_bytes: int = 0,
+        rotate_seconds: float = 0.0,
+        catalog: SessionCatalog | None = None,
+        catalog_interval: float = 1.0,
+    ) -> None:
         self.log_dir = log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
         self.session_id = session_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.started = time.time()
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.catalog = catalog
+        self.catalog_interval = catalog_interval
+        self._catalog_at = 0.0
+        self._marks = 0
 
-        self.can_path = self.log_dir / f"can_{self.session_id}.csv"
         self.gps_path = self.log_dir / f"gps_{self.session_id}.csv"
         self.events_path = self.log_dir / f"events_{self.session_id}.csv"
 
-        self._can_file, self._can_writer = self._open_writer(
-            self.can_path,
-            [
-                "server_t",
-                "seq",
-                "drop",
-                "ws_fl",
-                "ws_fr",
-                "ws_rl",
-                "ws_rr",
-                "yaw",
-                "ax",
-                "ay",
-            ],
-        )
-        self._gps_file, self._gps_writer = self._open_writer(
-            self.gps_path,
-            [
-                "client_t",
-                "lat",
-                "lon",
-                "spd",
-                "hdg",
-                "acc",
-                "alt",
-                "source",
-                "bg_state",
-                "os",
-                "app_ver",
-                "device",
-            ],
-        )
-        self._events_file, self._events_writer = self._open_writer(
-            self.events_path,
-            ["client_t", "type", "note"],
-        )
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._closed = False
+        self._failed = False
+        # True from a failed batch until the next successful commit.
+        self._failing = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "errors": 0,
+            "dropped_rows": 0,
+            "last_error": None,
+            "rows": 0,
+            "commits": 0,
+            "bytes": 0,
+            "last_write_ms": 0.0,
+            "max_write_ms": 0.0,
+            "max_lag_ms": 0.0,
+        }
+
+        self._streams: dict[str, _Stream | _ColumnarStream] = {
+            "can": _ColumnarStream(
+                self.log_dir,
+                f"can_{self.session_id}",
+                can_dtype,
+                compress=can_compress,
+                rotate_bytes=rotate_bytes,
+                rotate_seconds=rotate_seconds,
+            ),
+            "gps": _Stream(self.gps_path, GPS_HEADER),
+            "events": _Stream(self.events_path, EVENTS_HEADER),
+        }
+        self.can_manifest_path = self._streams["can"].manifest_path
+        for stream in self._streams.values():
+            self._commit(stream)
+        self._update_catalog(closed=False)
+
+        self._thread = threading.Thread(target=self._run, name="session-logger", daemon=True)
+        self._thread.start()
 
-    @staticmethod
-    def _open_writer(path: Path, header: list[str]) -> tuple[Any, csv.writer]:
-        fp = path.open("w", newline="", encoding="utf-8")
-        writer = csv.writer(fp)
-        writer.writerow(header)
-        fp.flush()
-        return fp, writer
+    def set_can_schema(self, fields: tuple[tuple[str, str | None, int | None], ...]) -> None:
+        """Set the CAN columns (name, unit, decimals) for rows logged after this call."""
+        self._put((_CAN_SCHEMA, 0.0, fields), 0)
 
     def log_can(self, frame: dict[str, Any]) -> None:
-        sig = frame.get("sig", {})
+        # `sig` is stored by reference; frames are never mutated after acquisition.
         status = frame.get("status", {})
-        with self._lock:
-            self._can_writer.writerow(
-                [
-                    frame.get("t"),
-                    status.get("seq"),
-                    status.get("drop"),
-                    sig.get("ws_fl"),
-                    sig.get("ws_fr"),
-                    sig.get("ws_rl"),
-                    sig.get("ws_rr"),
-                    sig.get("yaw"),
-                    sig.get("ax"),
-                    sig.get("ay"),
-                ]
+        self._put(
+            (
+                "can",
+                time.monotonic(),
+                (frame.get("t"), status.get("seq"), status.get("drop"), frame.get("sig", {})),
             )
-            self._can_file.flush()
+        )
 
     def log_gps(self, row: dict[str, Any]) -> None:
-        with self._lock:
-            self._gps_writer.writerow(
-                [
-                    row.get("t"),
-                    row.get("lat"),
-                    row.get("lon"),
-                    row.get("spd"),
-                    row.get("hdg"),
-                    row.get("acc"),
-                    row.get("alt"),
-                    row.get("source"),
-                    row.get("bg_state"),
-                    row.get("os"),
-                    row.get("app_ver"),
-                    row.get("device"),
-                ]
-            )
-            self._gps_file.flush()
+        self._put(("gps", time.monotonic(), _gps_values(row)))
 
     def log_event(self, row: dict[str, Any]) -> None:
-        with self._lock:
-            self._events_writer.writerow([row.get("t"), row.get("type"), row.get("note", "")])
-            self._events_file.flush()
+        self._put(("events", time.monotonic(), _event_values(row)))
+
+    def log_batch(self, gps_rows: list[dict[str, Any]], event_rows: list[dict[str, Any]]) -> None:
+        """Enqueue many GPS/event rows with one queue operation (store-and-forward replay)."""
+        rows = [("gps", _gps_values(row)) for row in gps_rows]
+        rows.extend(("events", _event_values(row)) for row in event_rows)
+        if rows:
+            self._put((_BULK, time.monotonic(), rows), len(rows))
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot["failed"] = self._failed
+        snapshot["queue_depth"] = self._queue.qsize()
+        return snapshot
+
+    def _put(self, item: Any, rows: int = 1) -> None:
+        if self._failed:
+            self._count_dropped(rows)
+            return
+        self._queue.put(item)
+
+    def _count_dropped(self, rows: int) -> None:
+        with self._stats_lock:
+            self._stats["dropped_rows"] += rows
 
     def close(self) -> None:
-        with self._lock:
-            self._can_file.close()
-            self._gps_file.close()
-            self._events_file.close()
+        if self._closed:
+            return
+        self._closed = True
+        if not self._failed:
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            self._write_loop()
+        except BaseException:
+            self._failed = True
+            log.exception("session log writer stopped; further rows are dropped")
+            # Release what is still queued; nothing will write it.
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP and item[0] != _CAN_SCHEMA:
+                    self._count_dropped(len(item[2]) if item[0] == _BULK else 1)
+
+    def _write_loop(self) -> None:
+        while True:
+            timeout = self._next_deadline()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout is not None else self._queue.get()
+            except queue.Empty:
+                item = None
+
+            try:
+                if self._write_batch(item):
+                    return
+            except Exception as exc:
+                self._write_failed(exc)
+
+    def _write_batch(self, item: Any) -> bool:
+        """Write `item` and everything queued behind it; True once `_STOP` was handled."""
+        # Take everything already queued before checking the time budget, so
+        # a backlog becomes a few large commits instead of one per row.
+        while item is not None:
+            if item is _STOP:
+                for stream in self._streams.values():
+                    try:
+                        self._commit(stream)
+                    finally:
+                        stream.close()
+                self._update_catalog(closed=True)
+                return True
+
+            name, enqueued, row = item
+            if name == _CAN_SCHEMA:
+                self._streams["can"].columns.set_schema(row)
+            elif name == _BULK:
+                for stream_name, values in row:
+                    self._append(stream_name, enqueued, values)
+            else:
+                self._append(name, enqueued, row)
+
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                item = None
+
+        now = time.monotonic()
+        for stream in self._streams.values():
+            if stream.oldest is not None and now - stream.oldest >= self.flush_interval:
+                self._commit(stream)
+        if self.catalog is not None and now - self._catalog_at >= self.catalog_interval:
+            self._update_catalog(closed=False)
+        return False
+
+    def _write_failed(self, exc: Exception) -> None:
+        with self._stats_lock:
+            self._stats["errors"] += 1
+            self._stats["last_error"] = repr(exc)
+        if self._failing:
+            log.warning("session log write failed again: %r", exc)
+        else:
+            # Full traceback once per streak; a full disk fails every commit.
+            self._failing = True
+            log.exception("session log write failed; the batch is dropped")
+
+    def _append(self, name: str, enqueued: float, row: Any) -> None:
+        stream = self._streams[name]
+        stream.append(row)
+        stream.rows += 1
+        if name == "events" and row[1] == "MARK":
+            self._marks += 1
+        if stream.oldest is None:
+            stream.oldest = enqueued
+        if stream.pending_bytes() >= self.flush_bytes:
+            self._commit(stream)
+
+    def _update_catalog(self, closed: bool) -> None:
+        if self.catalog is None:
+            return
+        self._catalog_at = time.monotonic()
+        can = self._streams["can"]
+        t_min, t_max = can.time_range()
+        record = {
+            "id": self.session_id,
+            "started": self.started,
+            "ended": time.time(),
+            "closed": closed,
+            "can_rows": can.total_rows,
+            "gps_rows": self._streams["gps"].total_rows,
+            "event_rows": self._streams["events"].total_rows,
+            "mark_count": self._marks,
+            "can_t_min": t_min,
+            "can_t_max": t_max,
+            "signals": can.signals(),
+            "files": {
+                "can_manifest": self._relative(can.manifest_path),
+                "can_segments": [self._relative(self.log_dir / seg["file"]) for seg in can.segments],
+                "gps": self._relative(self.gps_path),
+                "events": self._relative(self.events_path),
+            },
+        }
+        try:
+            self.catalog.upsert(record)
+        except sqlite3.Error as exc:
+            # The catalog is an index; never let it stop the log itself.
+            log.warning("session catalog update failed: %s", exc)
+
+    def _relative(self, path: Path) -> str:
+        assert self.catalog is not None
+        try:
+            return str(path.relative_to(self.catalog.path.parent))
+        except ValueError:
+            return str(path)
+
+    def _next_deadline(self) -> float | None:
+        oldest = [s.oldest for s in self._streams.values() if s.oldest is not None]
+        if not oldest:
+            return None
+        return max(0.0, min(oldest) + self.flush_interval - time.monotonic())
+
+    def _commit(self, stream: _Stream | _ColumnarStream) -> None:
+        # Taken up front: if the write fails these rows are dropped, not
+        # retried, so one bad batch cannot wedge the writer in a commit loop.
+        oldest, rows = stream.oldest, stream.rows
+        stream.oldest = None
+        stream.rows = 0
+        try:
+            data = stream.drain()
+            if not data:
+                return
+            started = time.monotonic()
+            stream.file.write(data)
+            stream.file.flush()
+        except Exception:
+            self._count_dropped(rows)
+            raise
+        finished = time.monotonic()
+
+        write_ms = (finished - started) * 1000.0
+        lag_ms = (finished - oldest) * 1000.0 if oldest is not None else 0.0
+        with self._stats_lock:
+            stats = self._stats
+            stats["rows"] += rows
+            stream.total_rows += rows
+            stats["commits"] += 1
+            stats["bytes"] += len(data)
+            stats["last_write_ms"] = write_ms
+            stats["max_write_ms"] = max(stats["max_write_ms"], write_ms)
+            stats["max_lag_ms"] = max(stats["max_lag_ms"], lag_ms)
+
+        if self._failing:
+            self._failing = False
+            log.warning("session log writes recovered")
+        stream.committed()
@@ -2,9 +2,15 @@ from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from derived import DerivedSignals
+
 log = logging.getLogger("signal-mapper")
 
 
@@ -19,50 +25,166 @@ def _to_float(value: Any) -> float | None:
         return None
 
 
-def _load_json(path: Path) -> dict[str, Any] | None:
+class SignalsConfigError(ValueError):
+    """The signals config could not be read or parsed, or has no rules object."""
+
+
+def _load_json(path: Path) -> dict[str, Any]:
     try:
         text = path.read_text(encoding="utf-8")
-    except FileNotFoundError:
-        log.warning("signals config not found: %s (raw passthrough mode)", path)
-        return None
+    except FileNotFoundError as exc:
+        raise SignalsConfigError(f"signals config not found: {path}") from exc
     except OSError as exc:
-        log.warning("failed to read signals config %s: %s", path, exc)
-        return None
+        raise SignalsConfigError(f"failed to read signals config {path}: {exc}") from exc
 
     try:
         payload = json.loads(text)
     except json.JSONDecodeError as exc:
-        log.warning("invalid JSON in signals config %s: %s", path, exc)
-        return None
+        raise SignalsConfigError(f"invalid JSON in signals config {path}: {exc}") from exc
 
     if not isinstance(payload, dict):
-        log.warning("signals config root must be object: %s", path)
-        return None
+        raise SignalsConfigError(f"signals config root must be object: {path}")
     return payload
 
 
+class _BatchPlan:
+    """Column gather + arrays of the compiled rules for one source column order."""
+
+    __slots__ = ("compiled", "index", "missing", "scale", "offset", "low", "high", "rounding")
+
+    def __init__(self, compiled: CompiledRules, sources: Sequence[str]) -> None:
+        self.compiled = compiled
+        plan = compiled.plan
+        position = {name: i for i, name in enumerate(sources)}
+        index = [position.get(source, -1) for _, source, *_ in plan]
+        self.index = np.array([i if i >= 0 else 0 for i in index], dtype=np.intp)
+        self.missing = np.array([i < 0 for i in index], dtype=bool)
+        self.scale = np.array([entry[2] for entry in plan], dtype=np.float64)
+        self.offset = np.array([entry[3] for entry in plan], dtype=np.float64)
+        self.low = np.array([-np.inf if entry[4] is None else entry[4] for entry in plan], dtype=np.float64)
+        self.high = np.array([np.inf if entry[5] is None else entry[5] for entry in plan], dtype=np.float64)
+        groups: dict[int, list[int]] = {}
+        for column, entry in enumerate(plan):
+            if entry[6] is not None:
+                groups.setdefault(entry[6], []).append(column)
+        self.rounding = tuple((decimals, np.array(columns, dtype=np.intp)) for decimals, columns in groups.items())
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Parsed rules plus their execution plan, built by `SignalMapper.build()`."""
+
+    rules: dict[str, dict[str, Any]]
+    fields: tuple[tuple[str, str | None, int | None], ...]
+    # (output, source, scale, offset, min, max, decimals) per enabled rule.
+    plan: tuple[tuple[Any, ...], ...]
+    # Config file (mtime_ns, size) read before parsing; None when missing.
+    stamp: tuple[int, int] | None
+    # Compiled `derived` section; its outputs are appended to `fields`.
+    derived: DerivedSignals
+
+
 class SignalMapper:
     """Maps raw CAN signal dict using signals.json rules.
 
-    If config is missing or invalid, mapper falls back to raw float passthrough.
+    If config is missing or invalid at startup, mapper falls back to raw float
+    passthrough; a reload with `build(strict=True)` keeps the installed rules
+    instead (a half-saved file must not change the live schema).
+    `build()` compiles the enabled rules into a flat plan of
+    (output, source, scale, offset, min, max, decimals) tuples and `install()`
+    swaps it in (`reload()` does both); `apply_batch()` runs the same plan
+    over a 2-D block of samples with NumPy. `derive()` then adds the
+    `derived` channels (see derived.py), which keep per-mapper window state.
     """
 
     def __init__(self, config_path: Path) -> None:
         self.config_path = config_path
-        self.rules: dict[str, dict[str, Any]] = {}
+        # Ordered (name, unit, decimals) of enabled outputs; rebuilt on reload.
+        self.fields: tuple[tuple[str, str | None, int | None], ...] = ()
+        self._compiled = CompiledRules({}, (), (), None, DerivedSignals(None))
+        self._batch_plans: dict[tuple[str, ...], _BatchPlan] = {}
+        self._derived_state: list[Any] = []
         self.reload()
 
+    @property
+    def rules(self) -> dict[str, dict[str, Any]]:
+        return self._compiled.rules
+
     def reload(self) -> None:
-        payload = _load_json(self.config_path)
+        self.install(self.build())
+
+    def config_stamp(self) -> tuple[int, int] | None:
+        """(mtime_ns, size) of the config file, None when it cannot be stat'ed."""
+        try:
+            stat = self.config_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def build(self, strict: bool = False) -> CompiledRules:
+        """Read and compile the config without touching the live rules.
+
+        Safe to run off the event loop; `install()` then swaps the result in.
+        An unreadable or malformed config compiles to passthrough, or raises
+        `SignalsConfigError` when `strict`.
+        """
+        stamp = self.config_stamp()
+        payload: dict[str, Any] | None
+        try:
+            payload = _load_json(self.config_path)
+            if strict and not isinstance(payload.get("signals"), dict):
+                raise SignalsConfigError(f"signals config missing 'signals' object: {self.config_path}")
+        except SignalsConfigError as exc:
+            if strict:
+                raise
+            log.warning("%s (raw passthrough mode)", exc)
+            payload = None
+        rules = self._read_rules(payload)
+        enabled = [(output_key, rule) for output_key, rule in rules.items() if rule["enabled"]]
+        derived = DerivedSignals(
+            payload.get("derived") if payload else None,
+            known=frozenset(output_key for output_key, _ in enabled),
+        )
+        fields = tuple((output_key, rule["unit"], rule["decimals"]) for output_key, rule in enabled)
+        return CompiledRules(
+            rules=rules,
+            # Passthrough mode keeps no fields; derived outputs are then raw-like keys.
+            fields=fields + derived.fields if fields else (),
+            plan=tuple(
+                (
+                    output_key,
+                    rule["source"],
+                    rule["scale"],
+                    rule["offset"],
+                    rule["min"],
+                    rule["max"],
+                    rule["decimals"],
+                )
+                for output_key, rule in enabled
+            ),
+            stamp=stamp,
+            derived=derived,
+        )
+
+    def install(self, compiled: CompiledRules) -> None:
+        # One attribute holds rules and plan, so `apply` never sees a mix.
+        self._compiled = compiled
+        self._batch_plans = {}
+        # Windows restart on reload: sources or their scaling may have changed.
+        self._derived_state = compiled.derived.make_state()
+        # Keep the old tuple when nothing changed so consumers can detect
+        # schema changes with an identity check.
+        if compiled.fields != self.fields:
+            self.fields = compiled.fields
+
+    def _read_rules(self, payload: dict[str, Any] | None) -> dict[str, dict[str, Any]]:
         if not payload:
-            self.rules = {}
-            return
+            return {}
 
         raw_signals = payload.get("signals")
         if not isinstance(raw_signals, dict):
             log.warning("signals config missing 'signals' object: %s", self.config_path)
-            self.rules = {}
-            return
+            return {}
 
         rules: dict[str, dict[str, Any]] = {}
         for output_key, rule in raw_signals.items():
@@ -91,6 +213,8 @@ class SignalMapper:
                 coerced = _to_float(decimals_raw)
                 decimals = max(0, min(6, int(coerced))) if coerced is not None else None
 
+            unit = rule.get("unit")
+
             rules[output_key] = {
                 "source": source,
                 "enabled": enabled,
@@ -99,17 +223,19 @@ class SignalMapper:
                 "min": min_value,
                 "max": max_value,
                 "decimals": decimals,
+                "unit": str(unit) if unit is not None else None,
             }
 
-        self.rules = rules
-        log.info("signals config loaded: %s (%d signals)", self.config_path, len(self.rules))
+        log.info("signals config loaded: %s (%d signals)", self.config_path, len(rules))
+        return rules
 
     def apply(self, raw_signals: dict[str, Any]) -> dict[str, float]:
         if not isinstance(raw_signals, dict):
             return {}
 
+        compiled = self._compiled
         # Fallback path: no config loaded -> pass through numeric values.
-        if not self.rules:
+        if not compiled.rules:
             mapped: dict[str, float] = {}
             for key, value in raw_signals.items():
                 if not isinstance(key, str):
@@ -120,30 +246,64 @@ class SignalMapper:
                 mapped[key] = number
             return mapped
 
-        mapped: dict[str, float] = {}
-        for output_key, rule in self.rules.items():
-            if not rule.get("enabled", True):
-                continue
-
-            source = rule["source"]
-            raw = raw_signals.get(source)
-            value = _to_float(raw)
+        mapped = {}
+        get = raw_signals.get
+        for output_key, source, scale, offset, min_value, max_value, decimals in compiled.plan:
+            value = get(source)
             if value is None:
                 continue
+            if type(value) is not float:
+                value = _to_float(value)
+                if value is None:
+                    continue
 
-            value = value * rule["scale"] + rule["offset"]
-
-            min_value = rule["min"]
-            max_value = rule["max"]
-            if min_value is not None:
-                value = max(min_value, value)
-            if max_value is not None:
-                value = min(max_value, value)
-
-            decimals = rule["decimals"]
+            value = value * scale + offset
+            # Negated comparisons clamp NaN too, as max()/min() did.
+            if min_value is not None and not value >= min_value:
+                value = min_value
+            if max_value is not None and not value <= max_value:
+                value = max_value
             if decimals is not None:
                 value = round(value, decimals)
 
             mapped[output_key] = value
 
         return mapped
+
+    def derive(self, signals: dict[str, float], t: float) -> dict[str, float]:
+        """Add the derived channels to mapped `signals` sampled at `t` (seconds).
+
+        Called once per frame in time order; window operators update in O(1).
+        """
+        compiled = self._compiled
+        if compiled.derived.steps:
+            compiled.derived.update(signals, t, self._derived_state)
+        return signals
+
+    def apply_batch(self, samples: np.ndarray, sources: Sequence[str]) -> tuple[tuple[str, ...], np.ndarray]:
+        """Map a block of samples in one call.
+
+        `samples` is (rows, len(sources)) with raw values in `sources` column
+        order (NaN = missing). Returns the enabled output names and a float64
+        (rows, outputs) array; outputs whose source is not a column are NaN.
+        NaN inputs stay NaN (missing) instead of being clamped as in `apply`.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        compiled = self._compiled
+        if not compiled.rules:
+            return tuple(sources), samples.copy()
+
+        key = tuple(sources)
+        plan = self._batch_plans.get(key)
+        if plan is None or plan.compiled is not compiled:
+            plan = self._batch_plans[key] = _BatchPlan(compiled, key)
+
+        out = samples[:, plan.index]
+        out *= plan.scale
+        out += plan.offset
+        np.clip(out, plan.low, plan.high, out=out)
+        for decimals, columns in plan.rounding:
+            out[:, columns] = np.round(out[:, columns], decimals)
+        if plan.missing.any():
+            out[:, plan.missing] = np.nan
+        return tuple(entry[0] for entry in compiled.plan), out
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any
+
+from codec import FrameSchema, SchemaField
+
+REDUCERS = ("last", "mean", "minmax")
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """What a client wants: a signal subset, a target rate and a reduction.
+
+    `signals=None` means every mapped signal; `hz=None` means every sample.
+    Clients with equal subscriptions share one group and one encoded payload.
+    """
+
+    signals: tuple[str, ...] | None = None
+    hz: float | None = None
+    reduce: str = "last"
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "signals": list(self.signals) if self.signals is not None else None,
+            "hz": self.hz,
+            "reduce": self.reduce,
+        }
+
+
+DEFAULT_SUBSCRIPTION = Subscription()
+
+
+def parse_subscription(payload: dict[str, Any]) -> Subscription:
+    """Parse a `{"type": "subscribe", ...}` message. Raises ValueError if invalid."""
+    signals_raw = payload.get("signals")
+    signals: tuple[str, ...] | None
+    if signals_raw is None:
+        signals = None
+    elif isinstance(signals_raw, list) and all(isinstance(name, str) for name in signals_raw):
+        signals = tuple(dict.fromkeys(signals_raw))
+    else:
+        raise ValueError("signals must be a list of names or null")
+
+    hz_raw = payload.get("hz")
+    hz: float | None
+    if hz_raw is None:
+        hz = None
+    else:
+        try:
+            hz = float(hz_raw)
+        except (TypeError, ValueError):
+            raise ValueError("hz must be a number") from None
+        if not math.isfinite(hz) or hz <= 0:
+            raise ValueError("hz must be > 0")
+
+    reduce = str(payload.get("reduce", "last")).strip().lower()
+    if reduce not in REDUCERS:
+        raise ValueError(f"reduce must be one of: {', '.join(REDUCERS)}")
+
+    return Subscription(signals=signals, hz=hz, reduce=reduce)
+
+
+class SubscriptionGroup:
+    """Filters and decimates the sample stream for one subscription.
+
+    Samples are bucketed into windows of 1/hz seconds by their acquisition time;
+    a window is reduced when the first sample of the next window arrives:
+      - `last`: the last sample of the window
+      - `mean`: per-signal mean, stamped with the last sample's t/seq
+      - `minmax`: two samples, per-signal minimum then maximum, so charts keep
+        the envelope of the decimated signal
+    """
+
+    def __init__(self, subscription: Subscription) -> None:
+        self.subscription = subscription
+        self.schema = FrameSchema()
+        self._window: list[dict[str, Any]] = []
+        self._window_end: float | None = None
+
+    def update_schema(self, fields: tuple[SchemaField, ...]) -> bool:
+        names = self.subscription.signals
+        if names is not None:
+            by_name = {field[0]: field for field in fields}
+            fields = tuple(by_name[name] for name in names if name in by_name)
+        return self.schema.update(fields)
+
+    def feed(self, frames: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        selected = frames if self.subscription.signals is None else [self._select(f) for f in frames]
+        hz = self.subscription.hz
+        if hz is None:
+            return selected
+
+        out: list[dict[str, Any]] = []
+        for frame in selected:
+            t = float(frame["t"])
+            if self._window_end is None:
+                self._window_end = (math.floor(t * hz) + 1) / hz
+            elif t >= self._window_end:
+                out.extend(self._reduce())
+                self._window = []
+                self._window_end = (math.floor(t * hz) + 1) / hz
+            self._window.append(frame)
+        return out
+
+    def _select(self, frame: dict[str, Any]) -> dict[str, Any]:
+        sig = frame["sig"]
+        return {
+            **frame,
+            "sig": {name: sig[name] for name in self.subscription.signals or () if name in sig},
+        }
+
+    def _reduce(self) -> list[dict[str, Any]]:
+        window = self._window
+        if not window:
+            return []
+        last = window[-1]
+        if len(window) == 1 or self.subscription.reduce == "last":
+            return [last]
+
+        columns: dict[str, list[float]] = {}
+        for frame in window:
+            for name, value in frame["sig"].items():
+                columns.setdefault(name, []).append(value)
+
+        if self.subscription.reduce == "mean":
+            decimals = {field[0]: field[2] for field in self.schema.fields}
+            sig = {}
+            for name, values in columns.items():
+                mean = sum(values) / len(values)
+                digits = decimals.get(name)
+                sig[name] = round(mean, digits) if digits is not None else mean
+            return [{**last, "sig": sig}]
+
+        first = window[0]
+        return [
+            {**first, "sig": {name: min(values) for name, values in columns.items()}},
+            {**last, "sig": {name: max(values) for name, values in columns.items()}},
+        ]
+
+
+class SubscriptionRegistry:
+    """Tracks which group each client belongs to; empty groups are dropped."""
+
+    def __init__(self) -> None:
+        self.groups: dict[Subscription, SubscriptionGroup] = {}
+        self._members: dict[Any, Subscription] = {}
+        self._counts: dict[Subscription, int] = {}
+
+    def assign(
+        self, member: Any, subscription: Subscription, fields: tuple[SchemaField, ...]
+    ) -> SubscriptionGroup:
+        self.remove(member)
+        group = self.groups.get(subscription)
+        if group is None:
+            group = self.groups[subscription] = SubscriptionGroup(subscription)
+            group.update_schema(fields)
+        self._members[member] = subscription
+        self._counts[subscription] = self._counts.get(subscription, 0) + 1
+        return group
+
+    def remove(self, member: Any) -> None:
+        subscription = self._members.pop(member, None)
+        if subscription is None:
+            return
+        self._counts[subscription] -= 1
+        if self._counts[subscription] <= 0:
+            del self._counts[subscription]
+            del self.groups[subscription]
+
+    def group_of(self, member: Any) -> SubscriptionGroup | None:
+        subscription = self._members.get(member)
+        return self.groups.get(subscription) if subscription is not None else None
+
+    def update_schema(self, fields: tuple[SchemaField, ...]) -> list[SubscriptionGroup]:
+        return [group for group in self.groups.values() if group.update_schema(fields)]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+# Server modules use flat imports (`from config import settings`), matching `python app.py`.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[ModuleType]:
+    # `config` reads the environment once at import; load a fresh app on a temp LOG_DIR.
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    monkeypatch.setenv("CAN_HZ", "10")
+    for name in ("config", "app"):
+        sys.modules.pop(name, None)
+    app = importlib.import_module("app")
+    yield app
+    for name in ("config", "app"):
+        sys.modules.pop(name, None)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import ModuleType
+
+import pytest
+from fastapi.testclient import TestClient
+
+from acquisition import AcquisitionThread, SampleRing
+from can_source import CANSource
+
+
+def test_ring_keeps_order_across_wraparound_and_counts_overflow() -> None:
+    ring = SampleRing(4)
+    assert [ring.push(item) for item in range(5)] == [True, True, True, True, False]
+    assert ring.drain() == [0, 1, 2, 3]
+    for item in range(4, 10):
+        ring.push(item)
+    assert ring.drain() == [4, 5, 6, 7]
+    assert ring.drain() == []
+    assert ring.stats() == {"capacity": 4, "depth": 0, "high_water": 4, "pushed": 8, "overflows": 3}
+
+
+def test_ring_hands_off_between_threads_without_loss() -> None:
+    ring = SampleRing(64)
+    count = 20_000
+
+    def produce() -> None:
+        for item in range(count):
+            while not ring.push(item):
+                time.sleep(0)
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    received: list[int] = []
+    while len(received) < count:
+        items = ring.drain()
+        received.extend(items)
+        if not items:
+            time.sleep(0)
+    thread.join()
+    assert received == list(range(count))
+
+
+def test_producer_stamps_samples_at_read_time() -> None:
+    ring = SampleRing(1024)
+    producer = AcquisitionThread(lambda t: t, hz=200.0, ring=ring, samples_per_wake=4)
+
+    async def start() -> None:
+        producer.start()
+
+    asyncio.run(start())
+    time.sleep(0.3)
+    producer.stop()
+    stamps = ring.drain()
+    assert not producer.running and producer.error is None
+    assert len(stamps) == producer.samples >= 40
+    assert all(a < b for a, b in zip(stamps, stamps[1:]))
+    assert stamps[-1] - stamps[0] == pytest.approx(0.005 * (len(stamps) - 1), abs=0.05)
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> bool:
+        self.now += seconds
+        return False
+
+
+def _slow_producer(fake: FakeTime, policy: str, stall: float, samples: int) -> tuple[AcquisitionThread, list[float]]:
+    """A 10 Hz producer whose third read blocks for `stall` seconds, stopped after `samples` reads."""
+    stamps: list[float] = []
+    prepared: list[int] = []
+
+    def acquire(t: float) -> float:
+        stamps.append(fake.now)
+        assert len(prepared) == len(stamps)
+        if len(stamps) == 3:
+            fake.now += stall
+        if len(stamps) == samples:
+            producer._stopping.set()
+        return t
+
+    producer = AcquisitionThread(
+        acquire,
+        hz=10.0,
+        ring=SampleRing(64),
+        policy=policy,
+        prepare=lambda: prepared.append(len(stamps)),
+        clock=fake.clock,
+    )
+    producer.scheduler.sleep = fake.sleep
+    producer._produce()
+    return producer, stamps
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected", "skipped"),
+    [
+        ("skip", [0.0, 0.1, 0.2, 0.55, 0.6, 0.7, 0.8, 0.9], 2),
+        ("catchup", [0.0, 0.1, 0.2, 0.55, 0.55, 0.55, 0.6, 0.7], 0),
+        ("stretch", [0.0, 0.1, 0.2, 0.55, 0.65, 0.75, 0.85, 0.95], 2),
+    ],
+)
+def test_slow_acquire_follows_tick_policy(policy: str, expected: list[float], skipped: int) -> None:
+    fake = FakeTime()
+    producer, stamps = _slow_producer(fake, policy, stall=0.35, samples=8)
+    assert stamps == pytest.approx(expected, abs=1e-9)
+    # Samples carry their read time, not a nominal grid time.
+    pushed = producer.ring.drain()
+    assert [b - a for a, b in zip(pushed, pushed[1:])] == pytest.approx(
+        [b - a for a, b in zip(expected, expected[1:])], abs=1e-6
+    )
+    assert producer.samples == 8 and producer.skipped == skipped
+
+
+def test_catchup_backlog_is_capped() -> None:
+    fake = FakeTime()
+    producer, stamps = _slow_producer(fake, "catchup", stall=5.0, samples=20)
+    # The 0.3 s wake fires 4.9 s late; of the 49 wakes behind it only the
+    # last second (10) is read late, back to back, and the rest is dropped.
+    assert stamps[3:14] == pytest.approx([5.2] * 11, abs=1e-9)
+    assert stamps[14] == pytest.approx(5.3, abs=1e-9)
+    assert producer.skipped == 39
+
+
+class BlockingSource(CANSource):
+    """A hardware adapter whose reads block the calling thread for `delay`."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.reads = 0
+
+    def next_frame(self) -> dict[str, float]:
+        time.sleep(self.delay)
+        self.reads += 1
+        return {"ws_fl": 50.0, "ws_fr": 50.0, "ws_rl": 50.0, "ws_rr": 50.0, "yaw": 0.0, "ax": 0.0, "ay": 0.0}
+
+
+def test_blocking_adapter_does_not_delay_http(server: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = BlockingSource(0.05)
+    monkeypatch.setattr(server, "can_source", source)
+
+    with TestClient(server.app) as client:
+        time.sleep(0.3)
+        latencies = []
+        for _ in range(40):
+            started = time.perf_counter()
+            assert client.get("/api/ping").json()["ok"]
+            latencies.append(time.perf_counter() - started)
+            time.sleep(0.02)
+        acquisition = client.get("/api/stats/acquisition").json()
+
+    # Half of every 100 ms tick is spent inside the adapter; inline on the
+    # event loop that put p90 ping latency near the 50 ms read time.
+    assert source.reads >= 10
+    assert acquisition["ring"]["pushed"] >= 10 and acquisition["acquire_ms"]["p50"] >= 50.0
+    assert sorted(latencies)[int(len(latencies) * 0.9)] < 0.02
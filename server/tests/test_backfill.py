@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from backfill import FrameRing, decode_backfill, encode_backfill
+
+FIELDS = (("speed", "km/h", 1), ("yaw", "deg/s", 2), ("raw", None, None))
+
+
+def _frames(first: int, count: int) -> list[dict]:
+    frames = []
+    for seq in range(first, first + count):
+        sig = {"speed": round(seq * 0.1, 1), "raw": seq / 3}
+        if seq % 4:
+            sig["yaw"] = round(-seq * 0.01, 2)
+        frames.append({"v": 1, "t": 100.0 + seq * 0.01, "sig": sig, "status": {"seq": seq, "drop": 0}})
+    return frames
+
+
+def test_ring_wraps_at_capacity_and_resumes_after_seq() -> None:
+    ring = FrameRing(50)
+    for first in range(0, 120, 7):
+        ring.extend(_frames(first, 7), FIELDS)
+    assert len(ring) == 50
+    assert ring.nbytes == 50 * (8 + 8 + 3 * 4)
+
+    t, seq, values, gap = ring.snapshot()
+    assert list(seq) == list(range(76, 126)) and not gap
+    assert values.shape == (3, 50)
+    assert t[0] == pytest.approx(100.76)
+
+    _, seq, values, gap = ring.snapshot(since=120)
+    assert list(seq) == [121, 122, 123, 124, 125] and not gap
+    assert values[0].tolist() == pytest.approx([12.1, 12.2, 12.3, 12.4, 12.5])
+    assert len(ring.snapshot(since=125)[1]) == 0
+
+    # The client's next sample (seq 11) was already evicted: everything, flagged.
+    _, seq, _, gap = ring.snapshot(since=10)
+    assert len(seq) == 50 and gap
+
+
+def test_schema_change_keeps_history_by_name() -> None:
+    ring = FrameRing(10)
+    ring.extend(_frames(0, 4), FIELDS)
+    ring.extend(_frames(4, 2), (("yaw", "deg/s", 2), ("new", None, None)))
+    _, seq, values, _ = ring.snapshot()
+    assert ring.names == ("yaw", "new")
+    assert values[0][1:4].tolist() == pytest.approx([-0.01, -0.02, -0.03])
+    assert np.isnan(values[1]).all()
+
+
+def test_encode_round_trip_quantizes_decimal_columns() -> None:
+    ring = FrameRing(1000)
+    ring.extend(_frames(0, 1000), FIELDS)
+    snapshot = ring.snapshot(since=499)
+    data = encode_backfill(snapshot, ring.fields, "s1")
+    message = decode_backfill(data)
+
+    assert message["stream"] == "s1" and message["count"] == 500 and not message["gap"]
+    assert message["signals"] == ["speed", "yaw", "raw"]
+    assert message["scale"] == [10.0, 100.0, None]
+    assert message["seq"].tolist() == list(range(500, 1000))
+    speed, yaw, raw = message["values"]
+    # Decimal columns come back exactly at their schema precision.
+    assert speed.tolist() == [round(seq * 0.1, 1) for seq in range(500, 1000)]
+    assert [math.isnan(value) for value in yaw[:4]] == [True, False, False, False]
+    assert yaw[1] == -5.01
+    assert raw.tolist() == pytest.approx([seq / 3 for seq in range(500, 1000)], rel=1e-6)
+    assert len(data) < 500 * (8 + 4 + 3 * 4) / 2
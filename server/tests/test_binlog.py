@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import io
+import math
+from pathlib import Path
+
+import numpy as np
+
+from binlog import ColumnarLogReader, ColumnarLogWriter, export_csv
+
+FIELDS = (("speed", "km/h", 1), ("ay", "g", 2))
+
+
+def _write(path: Path, writer: ColumnarLogWriter) -> None:
+    with path.open("ab") as fh:
+        fh.write(writer.drain())
+
+
+def test_round_trip_returns_numpy_columns(tmp_path: Path) -> None:
+    path = tmp_path / "s.tlog"
+    writer = ColumnarLogWriter()
+    writer.set_schema(FIELDS)
+    for seq in range(10):
+        writer.append(100.0 + seq * 0.1, seq, 0, {"speed": float(seq), "ay": 0.25})
+        if seq == 4:
+            _write(path, writer)
+    _write(path, writer)
+
+    with ColumnarLogReader(path) as reader:
+        assert len(reader.chunks) == 2
+        assert reader.rows == 10
+        data = reader.read()
+        assert data["speed"].dtype == np.float32
+        assert data["speed"].tolist() == [float(i) for i in range(10)]
+        assert data["seq"].tolist() == list(range(10))
+        assert data["t"][-1] == 100.0 + 9 * 0.1
+
+        late = list(reader.iter_chunks(t_from=100.6))
+        assert len(late) == 1 and late[0][1]["seq"][0] == 5
+        assert reader.read(["speed"], t_from=100.25, t_to=100.65)["seq"].tolist() == [3, 4, 5, 6]
+
+
+def test_schema_change_adds_column_and_fills_nan(tmp_path: Path) -> None:
+    path = tmp_path / "s.tlog"
+    writer = ColumnarLogWriter("float64")
+    writer.set_schema(FIELDS)
+    writer.append(1.0, 0, 0, {"speed": 1.0, "ay": 0.1})
+    writer.set_schema(FIELDS + (("temp", "C", 0),))
+    writer.append(2.0, 1, 0, {"speed": 2.0, "temp": 40.0})
+    _write(path, writer)
+
+    with ColumnarLogReader(path) as reader:
+        assert sorted(reader.schemas) == [1, 2]
+        data = reader.read(["temp", "ay"])
+    assert math.isnan(data["temp"][0]) and data["temp"][1] == 40.0
+    assert data["ay"][0] == 0.1 and math.isnan(data["ay"][1])
+
+
+def test_truncated_tail_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "s.tlog"
+    writer = ColumnarLogWriter()
+    writer.set_schema(FIELDS)
+    writer.append(1.0, 0, 0, {"speed": 1.0, "ay": 0.1})
+    _write(path, writer)
+    writer.append(2.0, 1, 0, {"speed": 2.0, "ay": 0.2})
+    with path.open("ab") as fh:
+        fh.write(writer.drain()[:20])
+
+    with ColumnarLogReader(path) as reader:
+        assert reader.rows == 1
+
+
+def test_export_csv_rounds_to_schema_decimals(tmp_path: Path) -> None:
+    path = tmp_path / "s.tlog"
+    writer = ColumnarLogWriter()
+    writer.set_schema(FIELDS)
+    writer.append(1.5, 7, 1, {"speed": 12.34, "ay": None})
+    _write(path, writer)
+
+    out = io.StringIO()
+    with ColumnarLogReader(path) as reader:
+        assert export_csv(reader, out) == 1
+    assert out.getvalue().splitlines() == ["server_t,seq,drop,speed,ay", "1.5,7,1,12.3,"]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+
+from can_source import BridgeCANSource
+from can_source.bridge import encode_binary
+
+
+def test_json_and_binary_records_update_latest_values() -> None:
+    now = [10.0]
+    bridge = BridgeCANSource(signals=("ws_fl", "yaw"), clock=lambda: now[0])
+    data = b'{"seq": 1, "sig": {"ws_fl": 12.5, "extra": 3}}\n' + encode_binary(2, [(1, -4.0)])
+    assert bridge.feed(data) == len(data)
+    assert bridge.next_frame() == {"ws_fl": 12.5, "extra": 3.0, "yaw": -4.0}
+
+    now[0] = 10.25
+    stats = bridge.stats()
+    assert stats["packets"] == 2
+    assert stats["signals"]["ws_fl"] == {"age_ms": 250.0, "updates": 1, "lost": 0}
+    # JSON senders may add names beyond the configured binary slot table.
+    assert bridge.names == ["ws_fl", "yaw", "extra"]
+
+
+def test_sequence_gaps_count_as_loss_per_signal() -> None:
+    bridge = BridgeCANSource(signals=("ws_fl", "yaw"))
+    for seq in (0, 1, 5, 6, 3):
+        bridge.feed(encode_binary(seq, [(0, float(seq))]))
+    bridge.feed(encode_binary(9, [(1, 1.0), (7, 2.0)]))
+    stats = bridge.stats()
+    assert stats["lost"] == 3 + 5
+    assert stats["reordered"] == 1
+    assert stats["unknown"] == 1
+    assert stats["signals"]["ws_fl"]["lost"] == 3
+    assert stats["signals"]["yaw"]["lost"] == 5
+    assert bridge.next_frame()["ws_fl"] == 3.0
+
+
+def test_snapshot_is_rebuilt_only_after_new_values() -> None:
+    bridge = BridgeCANSource(signals=("ws_fl", "yaw"))
+    assert bridge.next_frame() == {}
+    bridge.feed(encode_binary(0, [(1, 2.0)]))
+    first = bridge.next_frame()
+    assert first == {"yaw": 2.0}
+    assert bridge.next_frame() is first
+    bridge.feed(encode_binary(1, [(0, 1.0), (1, 3.0)]))
+    assert bridge.next_frame() == {"yaw": 3.0, "ws_fl": 1.0}
+    assert first == {"yaw": 2.0}
+
+
+def test_partial_records_wait_for_more_bytes() -> None:
+    bridge = BridgeCANSource(signals=("ws_fl",))
+    record = encode_binary(0, [(0, 1.5)])
+    line = b'{"sig": {"ws_fl": 2.5}}\n'
+    assert bridge.feed(record[:5]) == 0
+    assert bridge.feed(record + line[:7]) == len(record)
+    assert bridge.feed(b"garbage\n" + line) == 8 + len(line)
+    assert bridge.errors == 1
+    assert bridge.next_frame() == {"ws_fl": 2.5}
+
+
+def test_udp_and_tcp_receivers() -> None:
+    async def run(transport: str) -> dict[str, float]:
+        bridge = BridgeCANSource(port=0, transport=transport, signals=("ws_fl",))
+        await bridge.start()
+        try:
+            if transport == "udp":
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    sock.sendto(encode_binary(0, [(0, 7.0)]), ("127.0.0.1", bridge.port))
+            else:
+                _, writer = await asyncio.open_connection("127.0.0.1", bridge.port)
+                record = encode_binary(0, [(0, 7.0)])
+                writer.write(record[:3])
+                await writer.drain()
+                await asyncio.sleep(0.01)
+                writer.write(record[3:])
+                await writer.drain()
+                writer.close()
+            for _ in range(100):
+                if bridge.packets:
+                    break
+                await asyncio.sleep(0.01)
+            return bridge.next_frame()
+        finally:
+            await bridge.stop()
+
+    assert asyncio.run(run("udp")) == {"ws_fl": 7.0}
+    assert asyncio.run(run("tcp")) == {"ws_fl": 7.0}
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from broadcast import ClientOutbox
+from codec import JsonFrame
+
+
+class FakeSocket:
+    def __init__(self, latency: float = 0.0, fail: bool = False) -> None:
+        self.latency = latency
+        self.fail = fail
+        self.sent: list[str] = []
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(text)
+
+
+def _frame(seq: int) -> dict:
+    return {"v": 1, "t": 1.0, "sig": {"ws_fl": 1.5}, "status": {"seq": seq, "drop": 0}}
+
+
+def _fill(policy: str, count: int, maxsize: int = 3) -> tuple[ClientOutbox, list[bool]]:
+    outbox = ClientOutbox(FakeSocket(), maxsize=maxsize, policy=policy, send_timeout=1.0)
+    accepted = [outbox.offer(JsonFrame(_frame(seq))) for seq in range(count)]
+    return outbox, accepted
+
+
+def _queued_seqs(outbox: ClientOutbox) -> list[int]:
+    return [json.loads(frame.render(0, 0))["status"]["seq"] for frame in outbox._frames]
+
+
+def test_drop_oldest_policy_keeps_newest_frames() -> None:
+    outbox, accepted = _fill("drop_oldest", 5)
+    assert all(accepted)
+    assert _queued_seqs(outbox) == [2, 3, 4]
+    assert outbox.dropped == 2
+
+
+def test_latest_policy_keeps_only_newest_frame_on_overflow() -> None:
+    outbox, accepted = _fill("latest", 4)
+    assert all(accepted)
+    assert _queued_seqs(outbox) == [3]
+    assert outbox.dropped == 3
+
+
+def test_disconnect_policy_rejects_on_overflow() -> None:
+    outbox, accepted = _fill("disconnect", 4)
+    assert accepted == [True, True, True, False]
+    assert outbox.closed
+
+
+def test_writer_drains_queue_and_reports_stats() -> None:
+    async def run() -> FakeSocket:
+        ws = FakeSocket()
+        outbox = ClientOutbox(ws, maxsize=8, policy="latest", send_timeout=1.0)
+        outbox.start()
+        outbox.offer(JsonFrame(_frame(0)))
+        outbox.send_control({"type": "pong"})
+        outbox.offer(JsonFrame(_frame(1)))
+        await asyncio.sleep(0.05)
+        await outbox.aclose()
+        return ws
+
+    ws = asyncio.run(run())
+    decoded = [json.loads(text) for text in ws.sent]
+    assert decoded[0] == {"type": "pong"}
+    assert [msg["status"]["seq"] for msg in decoded[1:]] == [0, 1]
+    assert decoded[1]["status"]["qdepth"] == 1
+
+
+def test_producer_never_waits_on_slow_writer() -> None:
+    async def run() -> tuple[ClientOutbox, float]:
+        outbox = ClientOutbox(FakeSocket(latency=0.5), maxsize=2, policy="latest", send_timeout=5.0)
+        outbox.start()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for seq in range(100):
+            outbox.offer(JsonFrame(_frame(seq)))
+        elapsed = loop.time() - started
+        await outbox.aclose()
+        return outbox, elapsed
+
+    outbox, elapsed = asyncio.run(run())
+    assert elapsed < 0.05
+    assert outbox.dropped > 90
+
+
+def test_writer_stops_when_send_exceeds_deadline() -> None:
+    async def run() -> ClientOutbox:
+        outbox = ClientOutbox(FakeSocket(latency=1.0), maxsize=2, policy="latest", send_timeout=0.02)
+        outbox.start()
+        outbox.offer(JsonFrame(_frame(0)))
+        await asyncio.sleep(0.1)
+        return outbox
+
+    outbox = asyncio.run(run())
+    assert outbox.closed
+    assert not outbox.offer(JsonFrame(_frame(1)))
+
+
+def test_held_outbox_keeps_frames_past_the_bound_until_started() -> None:
+    outbox = ClientOutbox(FakeSocket(), maxsize=2, policy="disconnect", send_timeout=1.0)
+    outbox.hold()
+    assert all(outbox.offer(JsonFrame(_frame(seq))) for seq in range(5))
+    assert _queued_seqs(outbox) == [0, 1, 2, 3, 4]
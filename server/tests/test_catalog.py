@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from catalog import SessionCatalog
+from logger import SessionCsvLogger
+
+
+def _record(session_id: str, started: float, duration: float) -> dict:
+    return {"id": session_id, "started": started, "ended": started + duration, "closed": True}
+
+
+def test_list_filters_by_time_and_duration(tmp_path: Path) -> None:
+    catalog = SessionCatalog(tmp_path / "sessions.sqlite3")
+    catalog.upsert(_record("a", 1000.0, 60.0))
+    catalog.upsert(_record("b", 5000.0, 3600.0))
+    catalog.upsert(_record("c", 9000.0, 10.0))
+
+    sessions, total = catalog.list()
+    assert total == 3
+    assert [s["id"] for s in sessions] == ["c", "b", "a"]
+
+    assert [s["id"] for s in catalog.list(since=1100.0, until=8000.0)[0]] == ["b"]
+    assert [s["id"] for s in catalog.list(min_duration=30.0)[0]] == ["b", "a"]
+    assert [s["id"] for s in catalog.list(max_duration=60.0, limit=1)[0]] == ["c"]
+
+    catalog.upsert({**_record("a", 1000.0, 120.0), "mark_count": 3, "signals": ["ws_fl"]})
+    session = catalog.get("a")
+    assert session is not None
+    assert session["duration"] == 120.0
+    assert session["mark_count"] == 3 and session["signals"] == ["ws_fl"]
+    assert catalog.get("missing") is None
+    catalog.close()
+
+
+def test_logger_maintains_its_catalog_row(tmp_path: Path) -> None:
+    catalog = SessionCatalog(tmp_path / "sessions.sqlite3")
+    logger = SessionCsvLogger(tmp_path, session_id="s1", catalog=catalog)
+    assert catalog.get("s1")["closed"] is False
+
+    logger.set_can_schema((("ws_fl", "km/h", 1),))
+    for seq in range(10):
+        logger.log_can({"t": 100.0 + seq, "sig": {"ws_fl": 1.0}, "status": {"seq": seq}})
+    logger.log_gps({"t": 1.0, "lat": 37.5, "lon": 127.0})
+    logger.log_event({"t": 2.0, "type": "MARK"})
+    logger.close()
+
+    session = catalog.get("s1")
+    assert session["closed"] is True
+    assert (session["can_rows"], session["gps_rows"], session["event_rows"], session["mark_count"]) == (10, 1, 1, 1)
+    assert (session["can_t_min"], session["can_t_max"]) == (100.0, 109.0)
+    assert session["signals"] == ["ws_fl"]
+    assert session["files"]["can_manifest"] == "can_s1.manifest.json"
+    assert session["files"]["can_segments"] == ["can_s1_0001.tlog.gz"]
+    catalog.close()
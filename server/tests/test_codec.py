@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import struct
+import time
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codec
+from can_source import CANSource
+from codec import (
+    PACKED_HEADER,
+    FrameSchema,
+    JsonFrame,
+    PackedFrame,
+    encode_batch,
+    encode_json,
+    values_frame,
+)
+
+
+def _frame(seq: int, sig: dict | None = None) -> dict:
+    return {
+        "v": 1,
+        "t": 1730000000.25,
+        "sig": sig if sig is not None else {"ws_fl": 1.5, "yaw": -2.25},
+        "status": {"seq": seq, "drop": 2},
+    }
+
+
+def test_encode_json_matches_compact_send_json_form() -> None:
+    frame = _frame(3)
+    text = encode_json(frame)
+    assert " " not in text
+    assert json.loads(text) == frame
+
+
+def test_json_frame_appends_per_client_stats_to_status() -> None:
+    decoded = json.loads(JsonFrame(_frame(7)).render(qdepth=2, qdrop=5))
+    assert decoded["status"] == {"seq": 7, "drop": 2, "qdepth": 2, "qdrop": 5}
+    assert decoded["sig"] == {"ws_fl": 1.5, "yaw": -2.25}
+
+
+def test_json_frame_without_status_is_sent_verbatim() -> None:
+    assert json.loads(JsonFrame({"v": 1, "type": "notice"}).render(0, 0)) == {"v": 1, "type": "notice"}
+
+
+def _fields(*names: str) -> tuple:
+    return tuple((name, None, None) for name in names)
+
+
+def test_schema_id_changes_only_when_fields_change() -> None:
+    schema = FrameSchema()
+    assert schema.update((("ws_fl", "km/h", 1), ("yaw", "deg/s", 2)))
+    first = schema.id
+    assert not schema.update((("ws_fl", "km/h", 1), ("yaw", "deg/s", 2)))
+    assert schema.id == first
+    assert schema.update((("ws_fl", "km/h", 2), ("yaw", "deg/s", 2)))
+    assert schema.id != first
+    assert schema.message() == {
+        "v": 1,
+        "type": "schema",
+        "id": schema.id,
+        "signals": ["ws_fl", "yaw"],
+        "units": ["km/h", "deg/s"],
+        "decimals": [2, 2],
+    }
+
+
+def test_values_frame_carries_positional_array_and_status() -> None:
+    schema = FrameSchema()
+    schema.update(_fields("yaw", "ax", "ws_fl"))
+    decoded = json.loads(values_frame(_frame(5), schema).render(qdepth=0, qdrop=1))
+    assert decoded == {
+        "v": 1,
+        "sid": schema.id,
+        "t": 1730000000.25,
+        "val": [-2.25, None, 1.5],
+        "status": {"seq": 5, "drop": 2, "qdepth": 0, "qdrop": 1},
+    }
+
+
+def test_packed_frame_round_trip() -> None:
+    schema = FrameSchema()
+    schema.update(_fields("ws_fl", "ax", "yaw"))
+    data = PackedFrame(_frame(41), schema).render(qdepth=1, qdrop=9)
+
+    version, kind, schema_id, seq, drop, t, qdepth, qdrop = PACKED_HEADER.unpack_from(data)
+    assert (version, kind, schema_id) == (1, 1, schema.id)
+    assert (seq, drop, qdepth, qdrop) == (41, 2, 1, 9)
+    assert t == 1730000000.25
+
+    values = struct.unpack_from("<3f", data, PACKED_HEADER.size)
+    assert values[0] == 1.5
+    assert math.isnan(values[1])
+    assert values[2] == -2.25
+    assert len(data) == PACKED_HEADER.size + 3 * 4
+
+
+def test_packed_frame_is_much_smaller_than_json() -> None:
+    sig = {name: 123.456 for name in ("ws_fl", "ws_fr", "ws_rl", "ws_rr", "yaw", "ax", "ay")}
+    schema = FrameSchema()
+    schema.update(_fields(*sig))
+    packed = PackedFrame(_frame(1, sig), schema).render(0, 0)
+    text = JsonFrame(_frame(1, sig)).render(0, 0)
+    assert len(packed) * 3 < len(text.encode("utf-8"))
+
+
+def _batch() -> list[dict]:
+    return [
+        {"v": 1, "t": 10.0, "sig": {"ws_fl": 1.5, "yaw": 2.0}, "status": {"seq": 5, "drop": 1}},
+        {"v": 1, "t": 10.01, "sig": {"ws_fl": 2.5}, "status": {"seq": 6, "drop": 1}},
+        {"v": 1, "t": 10.03, "sig": {"ws_fl": 3.5, "yaw": 4.0}, "status": {"seq": 8, "drop": 2}},
+    ]
+
+
+def test_single_sample_batch_keeps_plain_frame_format() -> None:
+    schema = FrameSchema()
+    schema.update(_fields("ws_fl", "yaw"))
+    frame = _batch()[0]
+    assert encode_batch("json", [frame], schema).render(0, 0) == JsonFrame(frame).render(0, 0)
+
+
+def test_json_batch_is_columnar_with_seq_range() -> None:
+    decoded = json.loads(encode_batch("json", _batch(), FrameSchema()).render(qdepth=1, qdrop=0))
+    assert decoded["type"] == "batch"
+    assert decoded["seq"] == [5, 6, 8]
+    assert decoded["t"] == [10.0, 10.01, 10.03]
+    assert decoded["sig"] == {"ws_fl": [1.5, 2.5, 3.5], "yaw": [2.0, None, 4.0]}
+    assert decoded["status"] == {"seq": 8, "seq0": 5, "n": 3, "drop": 2, "qdepth": 1, "qdrop": 0}
+
+
+def test_values_batch_has_one_positional_row_per_sample() -> None:
+    schema = FrameSchema()
+    schema.update(_fields("yaw", "ws_fl"))
+    decoded = json.loads(encode_batch("values", _batch(), schema).render(0, 0))
+    assert decoded["sid"] == schema.id
+    assert decoded["val"] == [[2.0, 1.5], [None, 2.5], [4.0, 3.5]]
+    assert decoded["seq"] == [5, 6, 8]
+
+
+def test_packed_batch_round_trip() -> None:
+    schema = FrameSchema()
+    schema.update(_fields("ws_fl", "yaw"))
+    data = encode_batch("packed", _batch(), schema).render(qdepth=0, qdrop=4)
+
+    _, kind, _, seq, drop, t, _, qdrop = PACKED_HEADER.unpack_from(data)
+    assert (kind, seq, drop, t, qdrop) == (2, 8, 2, 10.03, 4)
+
+    offset = PACKED_HEADER.size
+    (count,) = struct.unpack_from("<I", data, offset)
+    seqs = struct.unpack_from(f"<{count}I", data, offset + 4)
+    times = struct.unpack_from(f"<{count}d", data, offset + 4 + 4 * count)
+    values = struct.unpack_from(f"<{count * 2}f", data, offset + 4 + 12 * count)
+    assert seqs == (5, 6, 8)
+    assert times == (10.0, 10.01, 10.03)
+    assert values[:3] == (1.5, 2.0, 2.5)
+    assert math.isnan(values[3])
+    assert values[4:] == (3.5, 4.0)
+    assert len(data) == offset + 4 + 12 * count + 4 * count * 2
+
+
+def test_schema_ids_wrap_without_issuing_zero(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(codec, "_schema_ids", itertools.count(0xFFFE))
+    ids = [codec._next_schema_id() for _ in range(4)]
+    assert ids == [0xFFFE, 0xFFFF, 1, 2]
+
+
+def test_out_of_range_values_pack_as_infinity() -> None:
+    schema = FrameSchema()
+    schema.update(_fields("big", "small", "yaw"))
+    sig = {"big": 1e39, "small": -1e39, "yaw": 3.4e38}
+    data = PackedFrame(_frame(1, sig), schema).render(0, 0)
+    assert struct.unpack_from("<3f", data, PACKED_HEADER.size)[:2] == (math.inf, -math.inf)
+
+    data = encode_batch("packed", [_frame(1, sig), _frame(2, sig)], schema).render(0, 0)
+    values = struct.unpack_from("<6f", data, PACKED_HEADER.size + 4 + 12 * 2)
+    assert values[:2] == values[3:5] == (math.inf, -math.inf)
+
+
+class HugeSource(CANSource):
+    def next_frame(self) -> dict[str, float]:
+        return {"big": 1e39, "ok": 1.0}
+
+
+def test_packed_client_keeps_receiving_out_of_range_signals(
+    server: ModuleType, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Passthrough mode forwards the raw value unclamped.
+    monkeypatch.setattr(server, "can_source", HugeSource())
+    monkeypatch.setattr(server.signal_mapper, "config_path", tmp_path / "missing.json")
+    server.signal_mapper.reload()
+
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/ws?codec=packed&backfill=0") as ws:
+            frames = []
+            for _ in range(50):
+                # A pong ends each read, so a dead broadcast loop cannot hang the test.
+                ws.send_json({"type": "ping"})
+                while (message := ws.receive()).get("text") is None or '"pong"' not in message["text"]:
+                    if message.get("bytes") is not None:
+                        frames.append(message["bytes"])
+                if len(frames) >= 3:
+                    break
+                time.sleep(0.05)
+        assert not server.broadcast_task.done()
+
+    assert len(frames) >= 3
+
+    for data in frames:
+        kind = PACKED_HEADER.unpack_from(data)[1]
+        offset = PACKED_HEADER.size
+        if kind == 2:
+            (count,) = struct.unpack_from("<I", data, offset)
+            offset += 4 + 12 * count
+        assert struct.unpack_from("<2f", data, offset) == (math.inf, 1.0)
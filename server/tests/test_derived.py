@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+from signal_mapper import SignalMapper
+
+
+def _write(path: Path, signals: dict, derived: dict) -> Path:
+    path.write_text(json.dumps({"version": 1, "signals": signals, "derived": derived}), encoding="utf-8")
+    return path
+
+
+def test_expressions_chain_and_skip_missing_inputs(tmp_path: Path) -> None:
+    config = _write(
+        tmp_path / "signals.json",
+        {"a": {"unit": "km/h"}, "b": {}},
+        {
+            "avg": {"expr": "(a + b) / 2", "unit": "km/h", "decimals": 1},
+            "ratio": {"expr": "a / b"},
+            "mag": {"expr": "hypot(avg, 3) - abs(-1)"},
+            "later": {"expr": "avg + nope_yet"},
+            "nope_yet": {"expr": "1"},
+            "evil": {"expr": "__import__('os').getcwd()"},
+            "bad_op": {"op": "median", "of": "a"},
+        },
+    )
+    mapper = SignalMapper(config)
+    assert [field[0] for field in mapper.fields] == ["a", "b", "avg", "ratio", "mag", "nope_yet"]
+    assert mapper.fields[2] == ("avg", "km/h", 1)
+
+    sig = mapper.derive(mapper.apply({"a": 4.0, "b": 0.0}), 0.0)
+    # a / 0 is left out of the frame instead of failing it.
+    assert sig == {"a": 4.0, "b": 0.0, "avg": 2.0, "mag": pytest.approx(math.hypot(2, 3) - 1), "nope_yet": 1.0}
+    assert mapper.derive(mapper.apply({"a": 4.0}), 0.01) == {"a": 4.0, "nope_yet": 1.0}
+
+
+def test_windows_match_recomputation_over_the_window(tmp_path: Path) -> None:
+    ops = ("mean", "rms", "std", "min", "max", "peak")
+    config = _write(
+        tmp_path / "signals.json",
+        {"x": {}},
+        {op: {"op": op, "of": "x", "window": 0.5} for op in ops},
+    )
+    mapper = SignalMapper(config)
+    rng = random.Random(5)
+    history: list[tuple[float, float]] = []
+    t = 0.0
+    for _ in range(3000):
+        # Irregular sample spacing and an occasional missing sample.
+        t += rng.uniform(0.001, 0.02)
+        raw = {} if rng.random() < 0.05 else {"x": rng.uniform(-50.0, 30.0)}
+        sig = mapper.derive(mapper.apply(raw), t)
+        if "x" not in raw:
+            # Windows only advance (and report) on frames that carry their input.
+            assert sig == {}
+            continue
+        history.append((t, raw["x"]))
+        values = [value for ts, value in history if ts > t - 0.5]
+        mean = sum(values) / len(values)
+        expected = {
+            "mean": mean,
+            "rms": math.sqrt(sum(v * v for v in values) / len(values)),
+            "std": math.sqrt(max(0.0, sum(v * v for v in values) / len(values) - mean * mean)),
+            "min": min(values),
+            "max": max(values),
+            "peak": max(abs(v) for v in values),
+        }
+        for op in ops:
+            assert sig[op] == pytest.approx(expected[op], rel=1e-9, abs=1e-9), op
+
+
+def test_reload_restarts_windows(tmp_path: Path) -> None:
+    config = _write(tmp_path / "signals.json", {"x": {}}, {"hi": {"op": "max", "of": "x", "window": 10}})
+    mapper = SignalMapper(config)
+    mapper.derive({"x": 9.0}, 0.0)
+    assert mapper.derive({"x": 1.0}, 1.0)["hi"] == 9.0
+    mapper.reload()
+    assert mapper.derive({"x": 1.0}, 2.0)["hi"] == 1.0
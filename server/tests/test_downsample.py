@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import numpy as np
+
+from downsample import downsample, lttb_indices, minmax_indices
+
+
+def test_minmax_keeps_every_bucket_extreme() -> None:
+    t = np.arange(10_000, dtype=np.float64)
+    y = np.sin(t / 50.0)
+    y[1234] = 9.0
+    y[8765] = -9.0
+    index = minmax_indices(y, 200)
+    assert len(index) <= 200
+    assert np.all(np.diff(index) > 0)
+    assert 1234 in index and 8765 in index
+    assert minmax_indices(y[:50], 200).tolist() == list(range(50))
+
+
+def test_lttb_returns_requested_points_with_endpoints() -> None:
+    t = np.linspace(0.0, 10.0, 5000)
+    y = np.where(t > 5.0, 1.0, 0.0)
+    y[2500] = 5.0
+    index = lttb_indices(t, y, 100)
+    assert len(index) == 100
+    assert index[0] == 0 and index[-1] == 4999
+    assert np.all(np.diff(index) > 0)
+    assert 2500 in index
+
+
+def test_downsample_skips_missing_values() -> None:
+    t = np.arange(6, dtype=np.float64)
+    y = np.array([1.0, np.nan, 3.0, np.nan, 5.0, 6.0], dtype=np.float32)
+    st, sv = downsample(t, y, 100, "lttb")
+    assert st.tolist() == [0.0, 2.0, 4.0, 5.0]
+    assert sv.tolist() == [1.0, 3.0, 5.0, 6.0]
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from geocode import METERS_PER_DEGREE, GeocodeError, ReverseGeocoder
+
+SEOUL = (37.5665, 126.9780)
+
+
+class StubNaver(ThreadingHTTPServer):
+    """Local stand-in for the reverse-geocode API: fixed address, optional delay/status."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay = 0.0
+        self.status = 200
+        self.requests: list[str] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/map-reversegeocode/v2/gc"
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        pass  # clients hang up on requests that lost a hedge
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: StubNaver
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+        body = {
+            "status": {"code": 0, "name": "ok"},
+            "results": [
+                {
+                    "region": {"area1": {"name": "서울특별시"}, "area2": {"name": "중구"}},
+                    "land": {"name": "세종대로", "number1": "110"},
+                }
+            ],
+        }
+        if self.server.status != 200:
+            body = {"error": {"errorCode": str(self.server.status), "message": "stub"}}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stub() -> Iterator[StubNaver]:
+    server = StubNaver()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _run(geocoder: ReverseGeocoder, scenario) -> object:
+    async def main() -> object:
+        await geocoder.start()
+        try:
+            return await scenario()
+        finally:
+            await geocoder.stop()
+
+    return asyncio.run(main())
+
+
+def test_cell_cache_hits_and_lru_ttl(stub: StubNaver) -> None:
+    now = [0.0]
+    geocoder = ReverseGeocoder(
+        "id", "secret", [stub.url], cell_m=15.0, cache_size=2, ttl=60.0, min_move_m=0.0, clock=lambda: now[0]
+    )
+    lat, lon = SEOUL
+
+    async def scenario() -> list[str]:
+        sources = []
+        for dlat, dlon in ((0.0, 0.0), (0.00002, 0.00002), (0.001, 0.0), (0.0, 0.0), (0.002, 0.0), (0.001, 0.0)):
+            result = await geocoder.reverse(lat + dlat, lon + dlon)
+            assert result["address"] == "서울특별시 중구 세종대로 110"
+            sources.append(result["cache"])
+        now[0] = 61.0
+        sources.append((await geocoder.reverse(lat + 0.001, lon))["cache"])
+        return sources
+
+    # ~2 m away is the same cell, a third cell evicts the least recently used
+    # one, and the cached cell misses again once its TTL has passed.
+    assert _run(geocoder, scenario) == ["miss", "hit", "miss", "hit", "miss", "miss", "miss"]
+    stats = geocoder.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 5, 2)
+    assert len(stub.requests) == 5
+
+
+def test_concurrent_lookups_share_one_upstream_request(stub: StubNaver) -> None:
+    stub.delay = 0.2
+    geocoder = ReverseGeocoder("id", "secret", [stub.url])
+
+    async def scenario() -> list[dict]:
+        return await asyncio.gather(*(geocoder.reverse(*SEOUL) for _ in range(20)))
+
+    results = _run(geocoder, scenario)
+    assert len(stub.requests) == 1
+    assert sorted(result["cache"] for result in results) == ["coalesced"] * 19 + ["miss"]
+    assert geocoder.stats()["coalesced"] == 19
+
+
+def test_errors_are_shared_but_not_cached(stub: StubNaver) -> None:
+    stub.status = 401
+    geocoder = ReverseGeocoder("id", "secret", [stub.url])
+
+    async def scenario() -> list[object]:
+        failed = await asyncio.gather(*(geocoder.reverse(*SEOUL) for _ in range(3)), return_exceptions=True)
+        stub.status = 200
+        return [*failed, await geocoder.reverse(*SEOUL)]
+
+    *failed, result = _run(geocoder, scenario)
+    assert all(isinstance(exc, GeocodeError) and exc.status_code == 401 for exc in failed)
+    assert result["cache"] == "miss"
+    assert len(stub.requests) == 2
+
+
+def _stubs(count: int) -> Iterator[list[StubNaver]]:
+    servers = [StubNaver() for _ in range(count)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def two_stubs() -> Iterator[list[StubNaver]]:
+    yield from _stubs(2)
+
+
+def test_slow_host_is_hedged_and_demoted(two_stubs: list[StubNaver]) -> None:
+    slow, fast = two_stubs
+    slow.delay = 1.0
+    geocoder = ReverseGeocoder("id", "secret", [slow.url, fast.url], hedge_after=0.1)
+    lat, lon = SEOUL
+
+    async def scenario() -> list[float]:
+        elapsed = []
+        for step in range(3):
+            started = time.perf_counter()
+            await geocoder.reverse(lat + step * 0.001, lon)
+            elapsed.append(time.perf_counter() - started)
+        return elapsed
+
+    elapsed = _run(geocoder, scenario)
+    # Only the first lookup waits for the hedge; then the fast host goes first.
+    assert 0.1 <= elapsed[0] < 0.6 and max(elapsed[1:]) < 0.5
+    assert (len(slow.requests), len(fast.requests)) == (1, 3)
+    stats = geocoder.stats()
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    assert [host["cancelled"] for host in stats["hosts"]] == [1, 0]
+
+
+def test_breaker_fails_fast_until_cooldown(two_stubs: list[StubNaver]) -> None:
+    for server in two_stubs:
+        server.status = 500
+    now = [0.0]
+    geocoder = ReverseGeocoder(
+        "id", "secret", [server.url for server in two_stubs], breaker_cooldown=30.0, clock=lambda: now[0]
+    )
+    lat, lon = SEOUL
+
+    async def lookup(step: int) -> int:
+        try:
+            await geocoder.reverse(lat + step * 0.001, lon)
+        except GeocodeError as exc:
+            return exc.status_code
+        return 200
+
+    async def scenario() -> list[int]:
+        statuses = [await lookup(step) for step in range(4)]
+        # Half-open after the cooldown: one success closes the breaker again.
+        now[0] = 31.0
+        for server in two_stubs:
+            server.status = 200
+        statuses.append(await lookup(4))
+        return statuses
+
+    # Three failures per host open both circuits; the fourth lookup does not
+    # reach the upstream at all.
+    assert _run(geocoder, scenario) == [502, 502, 502, 503, 200]
+    assert sum(len(server.requests) for server in two_stubs) == 7
+    hosts = geocoder.stats()["hosts"]
+    assert sorted(host["state"] for host in hosts) == ["closed", "half_open"]
+    assert [host["trips"] for host in hosts] == [1, 1]
+
+
+def test_auth_and_quota_errors_do_not_open_the_breaker(two_stubs: list[StubNaver]) -> None:
+    for server in two_stubs:
+        server.status = 401
+    geocoder = ReverseGeocoder("id", "secret", [server.url for server in two_stubs])
+    lat, lon = SEOUL
+
+    async def scenario() -> list[int]:
+        statuses = []
+        for step in range(5):
+            if step == 4:
+                for server in two_stubs:
+                    server.status = 429
+            try:
+                await geocoder.reverse(lat + step * 0.001, lon)
+            except GeocodeError as exc:
+                statuses.append(exc.status_code)
+        return statuses
+
+    # A bad key stays visible instead of turning into "every circuit is open".
+    assert _run(geocoder, scenario) == [401, 401, 401, 401, 429]
+    hosts = geocoder.stats()["hosts"]
+    assert [(host["state"], host["trips"]) for host in hosts] == [("closed", 0), ("closed", 0)]
+
+
+def test_small_moves_are_suppressed(stub: StubNaver) -> None:
+    geocoder = ReverseGeocoder("id", "secret", [stub.url], cell_m=15.0, min_move_m=30.0)
+    lat, lon = SEOUL
+
+    async def scenario() -> list[tuple[str, float | None]]:
+        results = []
+        for north_m in (0.0, 20.0, 25.0, 45.0, 60.0):
+            result = await geocoder.reverse(lat + north_m / METERS_PER_DEGREE, lon)
+            results.append((result["cache"], result.get("distance_m")))
+        return results
+
+    # 20 m and 25 m are new cells but within 30 m of the last resolved fix;
+    # 60 m is only 15 m past the fix resolved at 45 m.
+    assert _run(geocoder, scenario) == [
+        ("miss", None),
+        ("suppressed", 20.0),
+        ("suppressed", 25.0),
+        ("miss", None),
+        ("suppressed", 15.0),
+    ]
+    assert len(stub.requests) == 2
+
+
+def test_throttled_lookups_get_the_nearest_cached_address(stub: StubNaver) -> None:
+    now = [0.0]
+    geocoder = ReverseGeocoder(
+        "id", "secret", [stub.url], min_move_m=0.0, rate=1.0, burst=2.0, clock=lambda: now[0]
+    )
+    lat, lon = SEOUL
+
+    async def lookup(north_m: float) -> tuple[str, float | None]:
+        result = await geocoder.reverse(lat + north_m / METERS_PER_DEGREE, lon)
+        return result["cache"], result.get("distance_m")
+
+    async def scenario() -> list[tuple[str, float | None]]:
+        results = [await lookup(north_m) for north_m in (0.0, 500.0, 800.0, 100.0)]
+        now[0] = 1.0
+        results.append(await lookup(800.0))
+        return results
+
+    assert _run(geocoder, scenario) == [
+        ("miss", None),
+        ("miss", None),
+        ("throttled", 300.0),
+        ("throttled", 100.0),
+        ("miss", None),
+    ]
+    assert len(stub.requests) == 3
+    assert geocoder.stats()["throttled"] == 2
+
+
+def test_throttled_with_empty_cache_is_429(stub: StubNaver) -> None:
+    geocoder = ReverseGeocoder("id", "secret", [stub.url], rate=1.0, burst=1.0, clock=lambda: 0.0)
+    stub.status = 500
+
+    async def scenario() -> list[int]:
+        statuses = []
+        for north_m in (0.0, 500.0):
+            try:
+                await geocoder.reverse(SEOUL[0] + north_m / METERS_PER_DEGREE, SEOUL[1])
+            except GeocodeError as exc:
+                statuses.append(exc.status_code)
+        return statuses
+
+    assert _run(geocoder, scenario) == [502, 429]
+    assert len(stub.requests) == 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from dedupe import UplinkIndex
+from gps_sink import MAX_BATCH_ITEMS, extract_gps_row, parse_batch
+from logger import SessionCsvLogger
+
+
+def _fix(t: float, lat: object = 37.5, lon: object = 127.0) -> dict:
+    return {"v": 1, "t": t, "gps": {"lat": lat, "lon": lon, "spd": 8.2}, "meta": {"device": "ipad"}, "queued_at": t + 5}
+
+
+def test_batch_results_line_up_with_items() -> None:
+    items = [
+        _fix(1.0),
+        {"v": 1, "t": 2.0, "type": "MARK", "note": "tunnel"},
+        _fix(3.0, lat="37.5"),
+        _fix(4.0, lat=91.0),
+        _fix(5.0, lon=float("nan")),
+        {"v": 1, "type": "ping"},
+        "garbage",
+        _fix(6.0),
+    ]
+    gps_rows, event_rows, results = parse_batch(items)
+
+    assert [row["t"] for row in gps_rows] == [1.0, 6.0]
+    assert [row["note"] for row in event_rows] == ["tunnel"]
+    assert [result["ok"] for result in results] == [True, True, False, False, False, False, False, True]
+    assert results[1] == {"ok": True, "kind": "event"}
+    assert results[3] == {"ok": False, "error": "gps.lat/gps.lon out of range"}
+
+    with pytest.raises(ValueError):
+        parse_batch({"items": []})
+    with pytest.raises(ValueError):
+        parse_batch([_fix(0.0)] * (MAX_BATCH_ITEMS + 1))
+
+
+def test_batch_is_logged_in_order_with_one_enqueue(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="b1", flush_interval=60.0)
+    logger.log_gps({"t": 0.5, "lat": 37.0, "lon": 126.0})
+    gps_rows, event_rows, _ = parse_batch([_fix(float(t)) for t in range(1, 1001)] + [{"t": 9.0, "type": "mark"}])
+    logger.log_batch(gps_rows, event_rows)
+    logger.close()
+
+    with (tmp_path / "gps_b1.csv").open(newline="", encoding="utf-8") as fh:
+        rows = list(csv.reader(fh))[1:]
+    assert [row[0] for row in rows] == ["0.5"] + [str(float(t)) for t in range(1, 1001)]
+    assert rows[1][11] == "ipad"
+    with (tmp_path / "events_b1.csv").open(newline="", encoding="utf-8") as fh:
+        assert list(csv.reader(fh))[1] == ["9.0", "MARK", ""]
+    assert logger.stats()["rows"] == 1002
+
+
+def test_replayed_fixes_are_deduplicated_and_flagged() -> None:
+    index = UplinkIndex()
+    live = [{**_fix(t), "seq": seq} for seq, t in enumerate((10.0, 11.0, 12.0), start=1)]
+    for payload in live[:2]:
+        row = extract_gps_row(payload)
+        assert row is not None and index.admit(row) and row["out_of_order"] == 0
+
+    # Reconnect: the queue replays fixes 1-3 although 1 and 2 made it live,
+    # then the phone keeps sending live fixes.
+    gps_rows, _, results = parse_batch(live + [{**_fix(13.0), "seq": 4}], index)
+    assert [result.get("duplicate", False) for result in results] == [True, True, False, False]
+    assert [row["seq"] for row in gps_rows] == [3, 4]
+    # Same t and seq from another device is a different fix.
+    other = extract_gps_row({**live[0], "meta": {"device": "iphone"}})
+    assert other is not None and index.admit(other)
+    # A fix older than what the device already sent is logged but flagged.
+    late = extract_gps_row({**_fix(9.0), "seq": 0})
+    assert late is not None and index.admit(late) and late["out_of_order"] == 1
+    assert index.stats()["duplicates"] == 2 and index.stats()["out_of_order"] == 1
+
+
+def test_index_forgets_keys_beyond_window_and_capacity() -> None:
+    now = [0.0]
+    index = UplinkIndex(window=60.0, max_keys=3, clock=lambda: now[0])
+    rows = [extract_gps_row({**_fix(float(t)), "seq": t}) for t in range(5)]
+    assert all(row is not None and index.admit(dict(row)) for row in rows)
+    assert len(index) == 3
+    # The two oldest keys were evicted for capacity: they count as new again.
+    assert index.admit(dict(rows[0])) and not index.admit(dict(rows[4]))
+    now[0] = 61.0
+    assert index.admit(dict(rows[4])) and len(index) == 1
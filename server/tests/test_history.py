@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from history import query_can
+from logger import SessionCsvLogger
+
+
+def _session(tmp_path: Path) -> Path:
+    # ~20 rows per chunk, like a 100 Hz stream committed every 200 ms.
+    logger = SessionCsvLogger(tmp_path, session_id="h", flush_bytes=20 * 32)
+    logger.set_can_schema((("speed", "km/h", 1), ("ay", "g", 2)))
+    for seq in range(20_000):
+        speed = 250.5 if seq == 12_345 else 50.0 + (seq % 100) * 0.1
+        logger.log_can({"t": 1000.0 + seq * 0.01, "sig": {"speed": speed, "ay": 0.25}, "status": {"seq": seq}})
+    logger.close()
+    return logger.can_manifest_path
+
+
+def test_wide_window_uses_rollup_and_keeps_peaks(tmp_path: Path) -> None:
+    manifest = _session(tmp_path)
+    result = query_can(manifest, ["speed"], None, None, 200, "minmax")
+    assert result["source"] == "rollup"
+    assert result["rows"] == 20_000
+    speed = result["signals"]["speed"]
+    assert len(speed["v"]) <= 200
+    assert max(speed["v"]) == 250.5
+    assert min(speed["v"]) == 50.0
+    assert speed["t"] == sorted(speed["t"])
+
+    lttb = query_can(manifest, ["speed", "missing"], None, None, 200, "lttb")
+    assert list(lttb["signals"]) == ["speed"]
+    assert len(lttb["signals"]["speed"]["v"]) == 200
+
+
+def test_narrow_window_reads_raw_rows(tmp_path: Path) -> None:
+    manifest = _session(tmp_path)
+    result = query_can(manifest, None, 1123.40, 1123.50, 1000, "minmax")
+    assert result["source"] == "raw"
+    assert result["rows"] == 11
+    assert result["signals"]["speed"]["v"][5] == 250.5
+    assert result["signals"]["ay"]["v"] == [0.25] * 11
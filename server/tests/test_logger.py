@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from pathlib import Path
+
+from binlog import ColumnarLogReader, SessionLogReader
+from logger import SessionCsvLogger
+
+
+def _rows(path: Path) -> list[list[str]]:
+    with path.open(newline="", encoding="utf-8") as fh:
+        return list(csv.reader(fh))
+
+
+def _frame(seq: int) -> dict:
+    return {"t": 100.0 + seq, "sig": {"ws_fl": 1.5, "ay": -0.25}, "status": {"seq": seq, "drop": 0}}
+
+
+def test_close_drains_all_queued_rows(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s1", flush_interval=60.0)
+    for seq in range(500):
+        logger.log_can(_frame(seq))
+    logger.log_gps({"t": 1.0, "lat": 37.5, "lon": 127.0, "device": "ipad"})
+    logger.log_event({"t": 2.0, "type": "MARK", "note": "hello, world"})
+    logger.close()
+
+    with SessionLogReader(tmp_path / "can_s1.manifest.json") as reader:
+        can = reader.read()
+    assert len(can["seq"]) == 500
+    assert can["t"][0] == 100.0
+    assert can["ws_fl"][0] == 1.5
+    assert can["ay"][499] == -0.25
+    assert _rows(tmp_path / "gps_s1.csv")[1][:3] == ["1.0", "37.5", "127.0"]
+    assert _rows(tmp_path / "events_s1.csv")[1] == ["2.0", "MARK", "hello, world"]
+
+    stats = logger.stats()
+    assert stats["rows"] == 502
+    assert stats["queue_depth"] == 0
+
+
+def _can_rows(manifest: Path) -> int:
+    # Reads the open gzip segment as it is being written.
+    with SessionLogReader(manifest) as reader:
+        return len(reader.read([])["seq"])
+
+
+def test_can_columns_follow_schema_changes(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s5")
+    logger.set_can_schema((("ws_fl", "km/h", 1),))
+    logger.log_can(_frame(0))
+    logger.set_can_schema((("ws_fl", "km/h", 1), ("ay", "g", 2), ("temp", "C", 0)))
+    logger.log_can({"t": 101.0, "sig": {"ws_fl": 2.0, "ay": 0.5, "temp": 40.0}, "status": {"seq": 1}})
+    logger.close()
+
+    with SessionLogReader(tmp_path / "can_s5.manifest.json") as reader:
+        assert reader.signals == ["ws_fl", "ay", "temp"]
+        can = reader.read()
+    assert can["ws_fl"].tolist() == [1.5, 2.0]
+    # "ay" was outside the first schema, so the logger extended it instead of dropping it.
+    assert can["ay"].tolist() == [-0.25, 0.5]
+    assert can["temp"][1] == 40.0
+
+
+def test_can_log_rotates_into_compressed_segments(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s6", flush_bytes=2048, rotate_bytes=4096)
+    logger.set_can_schema((("ws_fl", "km/h", 1), ("ay", "g", 2)))
+    for seq in range(3000):
+        logger.log_can({"t": 100.0 + seq, "sig": {"ws_fl": seq * 0.1, "ay": 0.5}, "status": {"seq": seq}})
+    logger.close()
+
+    manifest = json.loads((tmp_path / "can_s6.manifest.json").read_text())
+    segments = manifest["segments"]
+    assert len(segments) > 2
+    assert all(segment["closed"] for segment in segments)
+    assert sum(segment["rows"] for segment in segments) == 3000
+    assert all(segment["file"].endswith(".tlog.gz") for segment in segments)
+
+    # Every segment is self-contained: magic + schema, then chunks.
+    with ColumnarLogReader(tmp_path / segments[1]["file"]) as reader:
+        assert reader.signals == ["ws_fl", "ay"]
+        assert reader.rows == segments[1]["rows"]
+
+    with SessionLogReader(tmp_path / "can_s6.manifest.json") as reader:
+        assert len(reader.segments_for(1500.0, 1510.0)) == 1
+        window = reader.read(["ws_fl"], t_from=1500.0, t_to=1510.0)
+    assert window["seq"].tolist() == list(range(1400, 1411))
+
+
+def test_gzip_seek_points_bound_window_reads(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s7", flush_bytes=1024)
+    logger._streams["can"].seek_bytes = 4096
+    logger.set_can_schema((("ws_fl", "km/h", 1),))
+    for seq in range(5000):
+        logger.log_can({"t": float(seq), "sig": {"ws_fl": seq * 0.5}, "status": {"seq": seq}})
+    logger.close()
+
+    manifest = json.loads((tmp_path / "can_s7.manifest.json").read_text())
+    (segment,) = manifest["segments"]
+    assert len(segment["seek"]) > 10
+
+    with SessionLogReader(tmp_path / "can_s7.manifest.json") as reader:
+        window = reader.read(["ws_fl"], t_from=4000.0, t_to=4010.0)
+        assert window["seq"].tolist() == list(range(4000, 4011))
+        assert window["ws_fl"].tolist() == [seq * 0.5 for seq in range(4000, 4011)]
+        assert len(reader.read([], t_from=2500.0)["t"]) == 2500
+
+    offset = max(offset for offset, t_before in segment["seek"] if t_before <= 4000.0)
+    with ColumnarLogReader(tmp_path / segment["file"], start=offset, t_to=4010.0) as reader:
+        # Inflating started at the seek point, which begins with the schema.
+        assert 3900.0 < reader.chunks[0].t_min <= 4000.0
+        assert reader.signals == ["ws_fl"]
+
+
+def test_rows_are_group_committed_on_time_budget(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s2", flush_interval=0.05)
+    try:
+        for seq in range(20):
+            logger.log_can(_frame(seq))
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline and _can_rows(tmp_path / "can_s2.manifest.json") < 20:
+            time.sleep(0.01)
+        assert _can_rows(tmp_path / "can_s2.manifest.json") == 20
+        # 3 header commits + the batch (possibly split by the timer), not one per row.
+        assert logger.stats()["commits"] < 3 + 20
+    finally:
+        logger.close()
+
+
+def test_size_budget_forces_commit_before_interval(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s3", flush_interval=60.0, flush_bytes=256)
+    try:
+        for seq in range(50):
+            logger.log_can(_frame(seq))
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline and _can_rows(tmp_path / "can_s3.manifest.json") < 40:
+            time.sleep(0.01)
+        assert _can_rows(tmp_path / "can_s3.manifest.json") >= 40
+    finally:
+        logger.close()
+
+
+def test_log_calls_do_not_block_on_disk(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s4")
+    try:
+        started = time.perf_counter()
+        for seq in range(2000):
+            logger.log_can(_frame(seq))
+        assert time.perf_counter() - started < 0.5
+    finally:
+        logger.close()
+
+
+class _FailingFile:
+    """Wraps a stream's file; the first `failures` writes raise like a full disk."""
+
+    def __init__(self, file, failures: int) -> None:
+        self.file = file
+        self.failures = failures
+
+    def write(self, data):
+        if self.failures:
+            self.failures -= 1
+            raise OSError(28, "No space left on device")
+        return self.file.write(data)
+
+    def __getattr__(self, name: str):
+        return getattr(self.file, name)
+
+
+def test_failed_write_drops_the_batch_and_keeps_writing(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s6", flush_interval=0.01)
+    gps = logger._streams["gps"]
+    gps.file = _FailingFile(gps.file, failures=1)
+    logger.log_gps({"t": 1.0, "lat": 37.5, "lon": 127.0})
+    time.sleep(0.2)
+    logger.log_gps({"t": 2.0, "lat": 37.6, "lon": 127.1})
+    logger.close()
+
+    assert [row[0] for row in _rows(tmp_path / "gps_s6.csv")[1:]] == ["2.0"]
+    stats = logger.stats()
+    assert (stats["errors"], stats["dropped_rows"], stats["failed"]) == (1, 1, False)
+    assert "No space left" in stats["last_error"]
+
+
+def test_dead_writer_drops_rows_instead_of_queueing(tmp_path: Path) -> None:
+    logger = SessionCsvLogger(tmp_path, session_id="s7", flush_interval=0.01)
+
+    def broken() -> float:
+        raise RuntimeError("writer bug")
+
+    logger._next_deadline = broken  # type: ignore[method-assign]
+    logger.log_event({"t": 1.0, "type": "MARK"})
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline and not logger.stats()["failed"]:
+        time.sleep(0.01)
+    for seq in range(100):
+        logger.log_can(_frame(seq))
+    logger.close()
+
+    stats = logger.stats()
+    assert stats["failed"] and stats["queue_depth"] == 0
+    assert stats["dropped_rows"] >= 100
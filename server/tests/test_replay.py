@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from can_source import ReplayCANSource
+from logger import SessionCsvLogger
+
+
+def _session(log_dir: Path, rows: int = 3000) -> Path:
+    logger = SessionCsvLogger(log_dir, session_id="r1", flush_bytes=1024, rotate_bytes=8192)
+    logger._streams["can"].seek_bytes = 2048
+    logger.set_can_schema((("ws_fl", "km/h", 1), ("ay", "g", 2)))
+    for seq in range(rows):
+        # 100 Hz log; "ay" only on even rows.
+        sig = {"ws_fl": seq * 0.5, **({"ay": 0.25} if seq % 2 == 0 else {})}
+        logger.log_can({"t": 1000.0 + seq / 100.0, "sig": sig, "status": {"seq": seq}})
+    logger.close()
+    return logger.can_manifest_path
+
+
+def test_max_speed_streams_every_row_and_loops(tmp_path: Path) -> None:
+    source = ReplayCANSource(_session(tmp_path), speed=0)
+    frames = [source.next_frame() for _ in range(3001)]
+    assert [frame["ws_fl"] for frame in frames[:3000]] == [seq * 0.5 for seq in range(3000)]
+    assert frames[0] == {"ws_fl": 0.0, "ay": 0.25}
+    assert frames[1] == {"ws_fl": 0.5}
+    assert frames[3000]["ws_fl"] == 0.0
+    assert source.loops == 1
+
+
+def test_speed_follows_the_clock_and_holds_at_end(tmp_path: Path) -> None:
+    now = [0.0]
+    source = ReplayCANSource(_session(tmp_path), speed=10.0, loop=False, clock=lambda: now[0])
+    assert source.next_frame()["ws_fl"] == 0.0
+    now[0] = 0.0005
+    assert source.next_frame()["ws_fl"] == 0.0  # held between logged rows
+    now[0] = 1.0
+    assert source.next_frame()["ws_fl"] == 1000 * 0.5  # 10 s of log in 1 s
+    assert source.position == 1010.0
+    now[0] = 100.0
+    assert source.next_frame()["ws_fl"] == 2999 * 0.5
+    assert source.next_frame()["ws_fl"] == 2999 * 0.5
+    assert source.loops == 0
+
+
+def test_seek_jumps_through_segments(tmp_path: Path) -> None:
+    manifest = _session(tmp_path)
+    source = ReplayCANSource(manifest, speed=0)
+    source.next_frame()
+    source.seek(1022.005)
+    assert source.next_frame()["ws_fl"] == 2201 * 0.5
+    assert source.next_frame()["ws_fl"] == 2202 * 0.5
+    source.seek(1005.0)
+    assert source.next_frame()["ws_fl"] == 500 * 0.5
+    assert source.stats()["t"] == 1005.0
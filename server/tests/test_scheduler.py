@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from scheduler import LatencyHistogram, TickScheduler
+
+
+class FakeTime:
+    """Clock that only moves when the scheduler sleeps or the test 'works'."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.now += delay
+
+
+def _run(policy: str, work: dict[int, float]) -> tuple[TickScheduler, list[tuple[int, float, float]]]:
+    """Fire 8 ticks of 100 ms; after tick n the loop body takes work[n] seconds."""
+    fake = FakeTime()
+    scheduler = TickScheduler(0.1, policy, clock=fake.clock, sleep=fake.sleep)
+
+    async def main() -> list[tuple[int, float, float]]:
+        fired = []
+        for _ in range(8):
+            late = await scheduler.wait()
+            fired.append((scheduler.tick, round(fake.now, 3), round(late, 3)))
+            fake.now += work.get(scheduler.tick, 0.01)
+        return fired
+
+    return scheduler, asyncio.run(main())
+
+
+def test_on_time_ticks_stay_on_the_grid() -> None:
+    scheduler, fired = _run("skip", {})
+    assert fired == [(tick, round(tick * 0.1, 3), 0.0) for tick in range(8)]
+    assert (scheduler.missed, scheduler.overruns) == (0, 0)
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected", "missed"),
+    [
+        # Burst: ticks 2-4 fire late back to back, then the grid is caught up.
+        ("catchup", [(0, 0.0), (1, 0.1), (2, 0.45), (3, 0.46), (4, 0.47), (5, 0.5), (6, 0.6), (7, 0.7)], 2),
+        # Ticks 2 and 3 are dropped; tick 4 fires late, the grid is kept.
+        ("skip", [(0, 0.0), (1, 0.1), (4, 0.45), (5, 0.5), (6, 0.6), (7, 0.7), (8, 0.8), (9, 0.9)], 2),
+        # The grid moves to the late tick: every later tick is 0.05 s later.
+        ("stretch", [(0, 0.0), (1, 0.1), (2, 0.45), (3, 0.55), (4, 0.65), (5, 0.75), (6, 0.85), (7, 0.95)], 2),
+    ],
+)
+def test_overrun_policies(policy: str, expected: list[tuple[int, float]], missed: int) -> None:
+    # The body after tick 1 blocks for 350 ms (3.5 periods).
+    scheduler, fired = _run(policy, {1: 0.35})
+    assert [(tick, at) for tick, at, _ in fired] == expected
+    assert scheduler.missed == missed
+    # Lateness is against the deadline of the tick that fired.
+    assert scheduler.lateness.max == pytest.approx(0.05 if policy == "skip" else 0.25)
+
+
+def test_histogram_percentiles_within_a_bucket() -> None:
+    histogram = LatencyHistogram()
+    # 1..1000 ms, one sample each.
+    for ms in range(1, 1001):
+        histogram.add(ms / 1000.0)
+    summary = histogram.summary_ms()
+    assert summary["count"] == 1000 and summary["max"] == 1000.0
+    for key, exact in (("p50", 500.0), ("p90", 900.0), ("p99", 990.0)):
+        assert exact <= summary[key] <= exact * 1.045
+    assert summary["mean"] == pytest.approx(500.5)
+
+    empty = LatencyHistogram().summary_ms()
+    assert empty["p99"] is None and empty["count"] == 0
+    histogram.add(0.0)
+    assert histogram.percentile(0.0) == 0.0
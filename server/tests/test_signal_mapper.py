@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from signal_mapper import SignalMapper, SignalsConfigError
+
+
+def _write(path: Path, signals: dict) -> Path:
+    path.write_text(json.dumps({"version": 1, "signals": signals}), encoding="utf-8")
+    return path
+
+
+def test_apply_scales_clamps_and_rounds(tmp_path: Path) -> None:
+    config = _write(
+        tmp_path / "signals.json",
+        {
+            "speed": {"source": "ws_fl", "scale": 2.0, "offset": 1.0, "max": 100.0, "decimals": 1},
+            "yaw": {"min": -5.0},
+            "off": {"enabled": False},
+        },
+    )
+    mapper = SignalMapper(config)
+    assert mapper.apply({"ws_fl": 10.04, "yaw": -9.0, "off": 1.0}) == {"speed": 21.1, "yaw": -5.0}
+    assert mapper.apply({"ws_fl": 80.0}) == {"speed": 100.0}
+
+
+def test_missing_config_passes_numeric_values_through(tmp_path: Path) -> None:
+    mapper = SignalMapper(tmp_path / "missing.json")
+    assert mapper.apply({"a": 1, "b": "2.5", "c": "x", "d": True}) == {"a": 1.0, "b": 2.5}
+    assert mapper.fields == ()
+
+
+def test_fields_list_enabled_outputs_and_keep_identity_when_unchanged(tmp_path: Path) -> None:
+    signals = {
+        "ws_fl": {"unit": "km/h", "decimals": 1},
+        "yaw": {"unit": "deg/s", "decimals": 2},
+        "off": {"enabled": False, "unit": "x"},
+    }
+    config = _write(tmp_path / "signals.json", signals)
+    mapper = SignalMapper(config)
+    assert mapper.fields == (("ws_fl", "km/h", 1), ("yaw", "deg/s", 2))
+
+    before = mapper.fields
+    mapper.reload()
+    assert mapper.fields is before
+
+    signals["yaw"]["decimals"] = 3
+    _write(config, signals)
+    mapper.reload()
+    assert mapper.fields == (("ws_fl", "km/h", 1), ("yaw", "deg/s", 3))
+
+
+def test_apply_batch_matches_apply(tmp_path: Path) -> None:
+    config = _write(
+        tmp_path / "signals.json",
+        {
+            "speed": {"source": "ws_fl", "scale": 0.5, "offset": -1.0, "min": 0.0, "max": 40.0, "decimals": 1},
+            "yaw": {"scale": 2.0, "decimals": 3},
+            "ax": {},
+            "off": {"source": "ws_fl", "enabled": False},
+            "absent": {"source": "not_a_column"},
+        },
+    )
+    mapper = SignalMapper(config)
+    rng = np.random.default_rng(3)
+    sources = ("yaw", "ws_fl", "ax")
+    block = rng.uniform(-100.0, 100.0, size=(200, 3))
+    block[5, 2] = np.nan
+
+    names, out = mapper.apply_batch(block, sources)
+    assert names == ("speed", "yaw", "ax", "absent")
+    assert np.isnan(out[:, 3]).all()
+    assert np.isnan(out[5, 2])
+    for row, values in zip(out, block):
+        expected = mapper.apply(dict(zip(sources, values.tolist())))
+        for column, name in enumerate(names[:3]):
+            if name == "ax" and np.isnan(row[column]):
+                continue
+            assert row[column] == pytest.approx(expected[name], abs=1e-9)
+
+
+def test_build_leaves_live_rules_until_install(tmp_path: Path) -> None:
+    config = _write(tmp_path / "signals.json", {"ws_fl": {"scale": 2.0}})
+    mapper = SignalMapper(config)
+    stamp = mapper.config_stamp()
+    assert mapper._compiled.stamp == stamp
+
+    _write(config, {"ws_fl": {"scale": 3.0}, "yaw": {"unit": "deg/s"}})
+    compiled = mapper.build()
+    assert compiled.fields == (("ws_fl", None, None), ("yaw", "deg/s", None))
+    assert mapper.apply({"ws_fl": 1.0, "yaw": 1.0}) == {"ws_fl": 2.0}
+
+    mapper.install(compiled)
+    assert mapper.fields is compiled.fields
+    assert mapper.apply({"ws_fl": 1.0, "yaw": 1.0}) == {"ws_fl": 3.0, "yaw": 1.0}
+    assert mapper.config_stamp() == compiled.stamp
+
+
+@pytest.mark.parametrize("text", ['{"version": 1, "signals": {"speed": {"sou', "[]", '{"version": 1}'])
+def test_strict_build_rejects_bad_config_and_keeps_installed_rules(tmp_path: Path, text: str) -> None:
+    config = _write(tmp_path / "signals.json", {"speed": {"source": "ws_fl", "scale": 2.0}})
+    mapper = SignalMapper(config)
+    fields = mapper.fields
+    assert mapper.apply({"ws_fl": 1.0, "raw_x": 5.0}) == {"speed": 2.0}
+
+    config.write_text(text, encoding="utf-8")
+    with pytest.raises(SignalsConfigError):
+        mapper.build(strict=True)
+    assert mapper.fields is fields == (("speed", None, None),)
+    assert mapper.apply({"ws_fl": 1.0, "raw_x": 5.0}) == {"speed": 2.0}
+    # Startup (non-strict) still falls back to passthrough.
+    assert mapper.build().fields == ()
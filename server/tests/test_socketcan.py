@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import struct
+from pathlib import Path
+
+import pytest
+
+from can_source import SocketCANSource
+from can_source.dbc import EXTENDED_FLAG, compile_dbc, parse_dbc
+from can_source.socketcan import FRAME_HEADER
+from signal_mapper import SignalMapper
+
+EXAMPLE_DBC = Path(__file__).resolve().parents[1] / "can_source" / "example.dbc"
+SIGNALS_CONFIG = Path(__file__).resolve().parents[1] / "signals.json"
+
+MUX_DBC = """
+BO_ 2566844926 DIAG: 8 ECU
+ SG_ page M : 0|8@1+ (1,0) [0|255] "" VCU
+ SG_ temp m0 : 8|16@1+ (0.1,-40) [0|0] "C" VCU
+ SG_ volt m1 : 8|16@1- (0.5,0) [0|0] "V" VCU
+ SG_ gain : 32|32@1- (1,0) [0|0] "" VCU
+
+SIG_VALTYPE_ 2566844926 gain : 1;
+"""
+
+
+def _frame(can_id: int, data: bytes) -> bytes:
+    return FRAME_HEADER.pack(can_id, len(data)) + data.ljust(8, b"\0")
+
+
+def test_intel_and_motorola_signals_decode() -> None:
+    source = SocketCANSource("vcan0", EXAMPLE_DBC)
+    source.feed(_frame(0x1A0, bytes.fromhex("d20400001027ffff")))
+    source.feed(_frame(0x1B0, bytes.fromhex("ff9c01f4ffff0000")))
+    source.feed(_frame(0x123, b"\x01"))
+    source.feed(_frame(0x1A0 | 0x40000000, b""))  # RTR
+
+    frame = source.next_frame()
+    assert frame["ws_fl"] == pytest.approx(12.34)
+    assert frame["ws_fr"] == 0.0
+    assert frame["ws_rl"] == pytest.approx(100.0)
+    assert frame["ws_rr"] == pytest.approx(655.35)
+    assert frame["yaw"] == pytest.approx(-1.0)
+    assert frame["ax"] == pytest.approx(0.5)
+    assert frame["ay"] == pytest.approx(-0.001)
+
+    stats = source.stats()
+    assert (stats["frames"], stats["decoded"], stats["unknown"]) == (4, 2, 1)
+    assert stats["messages"] == {"WHEEL_SPEEDS": 1, "CHASSIS_DYNAMICS": 1}
+    # Decoded names are the SignalMapper `source` keys.
+    assert set(SignalMapper(SIGNALS_CONFIG).apply(frame)) == set(frame)
+
+
+class _QueuedSocket:
+    """Non-blocking socket stand-in: hands out queued frames, then would block."""
+
+    def __init__(self, frames: list[bytes]) -> None:
+        self.frames = frames
+
+    def recvmsg(self, bufsize: int, ancbufsize: int) -> tuple[bytes, list, int, None]:
+        if not self.frames:
+            raise BlockingIOError
+        return self.frames.pop(0), [], 0, None
+
+
+def test_spurious_wake_does_not_refresh_frame_age() -> None:
+    source = SocketCANSource("vcan0", EXAMPLE_DBC)
+    source._sock = _QueuedSocket([])  # type: ignore[assignment]
+    source._drain()
+    assert source.last_frame is None
+
+    source._sock = _QueuedSocket([_frame(0x1A0, bytes(8))])  # type: ignore[assignment]
+    source._drain()
+    stamp = source.last_frame
+    assert stamp is not None and source.frames == 1
+    source._drain()
+    assert source.last_frame == stamp
+
+
+def test_multiplexed_float_and_extended_ids() -> None:
+    decoders = compile_dbc(parse_dbc(MUX_DBC))
+    (frame_id,) = decoders
+    assert frame_id == 0x18FEF1FE | EXTENDED_FLAG
+    decoder = decoders[frame_id]
+
+    out: dict[str, float] = {}
+    decoder.decode(b"\x00" + (650).to_bytes(2, "little") + b"\x00" + struct.pack("<f", 1.5), out)
+    assert out == {"page": 0.0, "temp": pytest.approx(25.0), "gain": 1.5}
+
+    out = {}
+    decoder.decode(b"\x01" + (-6).to_bytes(2, "little", signed=True) + b"\x00" + struct.pack("<f", 2.0), out)
+    assert out == {"page": 1.0, "volt": -3.0, "gain": 2.0}
+
+
+def _vcan_available() -> bool:
+    if not hasattr(socket, "AF_CAN"):
+        return False
+    try:
+        with socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW) as sock:
+            sock.bind(("vcan0",))
+    except OSError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _vcan_available(), reason="needs a vcan0 interface (ip link add vcan0 type vcan)")
+def test_vcan_end_to_end() -> None:
+    async def run() -> SocketCANSource:
+        source = SocketCANSource("vcan0", EXAMPLE_DBC)
+        await source.start()
+        try:
+            with socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW) as tx:
+                tx.bind(("vcan0",))
+                for seq in range(2000):
+                    tx.send(_frame(0x1A0, seq.to_bytes(2, "little") * 4))
+                    tx.send(_frame(0x7FF, b"\xff"))
+                    if seq % 200 == 0:
+                        await asyncio.sleep(0)
+            for _ in range(100):
+                if source.decoded >= 2000:
+                    break
+                await asyncio.sleep(0.01)
+            return source
+        finally:
+            await source.stop()
+
+    source = asyncio.run(run())
+    assert source.decoded == 2000
+    # 0x7FF is filtered in the kernel, never reaching the decoder.
+    assert source.unknown == 0
+    assert source.latest["ws_fl"] == pytest.approx(19.99)
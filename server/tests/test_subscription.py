@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import pytest
+
+from subscription import (
+    DEFAULT_SUBSCRIPTION,
+    Subscription,
+    SubscriptionGroup,
+    SubscriptionRegistry,
+    parse_subscription,
+)
+
+FIELDS = (("ws_fl", "km/h", 1), ("yaw", "deg/s", 2), ("ax", "m/s^2", 3))
+
+
+def _frames(count: int, hz: float = 100.0) -> list[dict]:
+    return [
+        {
+            "v": 1,
+            "t": 1000.0 + i / hz,
+            "sig": {"ws_fl": float(i), "yaw": float(-i), "ax": 0.5},
+            "status": {"seq": i, "drop": 0},
+        }
+        for i in range(count)
+    ]
+
+
+def test_parse_subscription_normalizes_and_validates() -> None:
+    sub = parse_subscription({"type": "subscribe", "signals": ["yaw", "ws_fl", "yaw"], "hz": 5, "reduce": "MEAN"})
+    assert sub == Subscription(signals=("yaw", "ws_fl"), hz=5.0, reduce="mean")
+    assert parse_subscription({"type": "subscribe"}) == DEFAULT_SUBSCRIPTION
+
+    for bad in ({"signals": "yaw"}, {"hz": 0}, {"hz": "fast"}, {"reduce": "median"}):
+        with pytest.raises(ValueError):
+            parse_subscription(bad)
+
+
+def test_group_schema_follows_subscription_order_and_skips_unknown() -> None:
+    group = SubscriptionGroup(Subscription(signals=("yaw", "nope", "ws_fl")))
+    assert group.update_schema(FIELDS)
+    assert group.schema.names == ("yaw", "ws_fl")
+    assert not group.update_schema(FIELDS)
+
+
+def test_full_rate_group_filters_signals_only() -> None:
+    group = SubscriptionGroup(Subscription(signals=("yaw",)))
+    out = group.feed(_frames(3))
+    assert [frame["sig"] for frame in out] == [{"yaw": 0.0}, {"yaw": -1.0}, {"yaw": -2.0}]
+
+
+def test_last_reducer_decimates_to_target_rate() -> None:
+    group = SubscriptionGroup(Subscription(hz=10.0, reduce="last"))
+    out = group.feed(_frames(35))
+    # 100 Hz -> 10 Hz: windows [0..9], [10..19], [20..29] closed; [30..] still open.
+    assert [frame["status"]["seq"] for frame in out] == [9, 19, 29]
+
+
+def test_mean_reducer_averages_each_signal() -> None:
+    group = SubscriptionGroup(Subscription(signals=("ws_fl", "yaw"), hz=10.0, reduce="mean"))
+    group.update_schema((("ws_fl", "km/h", 0), ("yaw", "deg/s", None)))
+    out = group.feed(_frames(11))
+    assert len(out) == 1
+    # Means are rounded to the signal's configured decimals.
+    assert out[0]["sig"] == {"ws_fl": 4.0, "yaw": -4.5}
+    assert out[0]["status"]["seq"] == 9
+
+
+def test_minmax_reducer_emits_envelope_pair() -> None:
+    group = SubscriptionGroup(Subscription(hz=10.0, reduce="minmax"))
+    out = group.feed(_frames(11))
+    assert [frame["sig"]["ws_fl"] for frame in out] == [0.0, 9.0]
+    assert [frame["sig"]["yaw"] for frame in out] == [-9.0, 0.0]
+    assert [frame["status"]["seq"] for frame in out] == [0, 9]
+
+
+def test_windows_carry_over_between_ticks() -> None:
+    group = SubscriptionGroup(Subscription(hz=10.0))
+    frames = _frames(25)
+    out = group.feed(frames[:7]) + group.feed(frames[7:15]) + group.feed(frames[15:])
+    assert [frame["status"]["seq"] for frame in out] == [9, 19]
+
+
+def test_registry_shares_groups_and_drops_empty_ones() -> None:
+    registry = SubscriptionRegistry()
+    slow = Subscription(signals=("ws_fl", "yaw"), hz=5.0)
+    first = registry.assign("a", slow, FIELDS)
+    second = registry.assign("b", slow, FIELDS)
+    registry.assign("c", DEFAULT_SUBSCRIPTION, FIELDS)
+    assert first is second
+    assert len(registry.groups) == 2
+
+    registry.assign("a", DEFAULT_SUBSCRIPTION, FIELDS)
+    assert registry.group_of("b") is first
+    registry.remove("b")
+    assert slow not in registry.groups
+    assert registry.group_of("a") is registry.group_of("c")
+
+
+def test_registry_reports_groups_whose_schema_changed() -> None:
+    registry = SubscriptionRegistry()
+    registry.assign("a", Subscription(signals=("yaw",)), FIELDS)
+    registry.assign("b", DEFAULT_SUBSCRIPTION, FIELDS)
+    changed = registry.update_schema(FIELDS[:2] + (("ax", "g", 3),))
+    assert [group.subscription for group in changed] == [DEFAULT_SUBSCRIPTION]